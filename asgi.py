@@ -0,0 +1,204 @@
+import asyncio
+import json
+import logging
+
+from logging_pipeline import configure_logging, log_webhook_call, stop_logging
+
+# Before importing services, whose startup (catalogue load, outbox and reminder
+# threads) already logs.
+configure_logging()
+
+from handlers import WebhookRequest, dispatch_async, handler_timings  # noqa: E402
+from metrics import CONTENT_TYPE, registry  # noqa: E402
+from services import outbox, reminders, response_cache, uploads  # noqa: E402
+from uploads import UploadError, bearer_token  # noqa: E402
+
+# --- ASGI entry point ---
+# Serves the same routes as the Flask app in main.py on an event loop. Webhook
+# handlers that do blocking I/O are dispatched to worker threads (see
+# handlers.registry), and notification delivery already happens off the request
+# path in the outbox workers. Run it with the launcher config:
+#
+#   gunicorn -c gunicorn.conf.py
+
+JSON_HEADERS = [(b"content-type", b"application/json")]
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def send_json(send, payload, status=200):
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": JSON_HEADERS + [(b"content-length", str(len(body)).encode())]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def webhook(scope, receive, send):
+    try:
+        req = json.loads(await read_body(receive) or b"null")
+    except ValueError:
+        req = None
+    webhook_request = WebhookRequest.from_json(req)
+    log_webhook_call(webhook_request.tag, webhook_request.params)
+    response = await dispatch_async(webhook_request)
+    await send_json(send, response.to_dict())
+
+
+async def booking_notifications(scope, receive, send, booking_id):
+    notifications = await asyncio.to_thread(outbox.status, booking_id)
+    if not notifications:
+        await send_json(send, {"error": "Booking not found"}, 404)
+        return
+    await send_json(send, {"booking_id": booking_id, "notifications": notifications})
+
+
+def upload_session(scope):
+    # The session named by the request's upload token.
+    header = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+    return uploads.authorize(bearer_token(header))
+
+
+async def create_upload(scope, receive, send):
+    try:
+        body = json.loads(await read_body(receive) or b"null") or {}
+    except ValueError:
+        body = {}
+    try:
+        session = await asyncio.to_thread(upload_session, scope)
+        upload = await asyncio.to_thread(
+            uploads.create, session, body.get("filename"), body.get("content_type"), body.get("size")
+        )
+    except UploadError as e:
+        await send_json(send, e.to_dict(), e.status)
+        return
+    await send_json(send, upload, 201)
+
+
+async def upload_chunk(scope, receive, send, upload_id):
+    # Each body message is written to the part file as it arrives.
+    headers = dict(scope["headers"])
+    content_range = headers.get(b"content-range", b"").decode() or None
+    try:
+        session = await asyncio.to_thread(upload_session, scope)
+        writer = await asyncio.to_thread(uploads.open_chunk, upload_id, content_range, session)
+        try:
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    await asyncio.to_thread(writer.abort)
+                    return
+                if message.get("body"):
+                    await asyncio.to_thread(writer.write, message["body"])
+                if not message.get("more_body"):
+                    break
+        except Exception as e:
+            await asyncio.to_thread(writer.abort)
+            if isinstance(e, UploadError):
+                e.received = writer.position
+            raise
+        upload = await asyncio.to_thread(writer.finish)
+    except UploadError as e:
+        await send_json(send, e.to_dict(), e.status)
+        return
+    await send_json(send, upload)
+
+
+async def upload_status(scope, receive, send, upload_id):
+    try:
+        session = await asyncio.to_thread(upload_session, scope)
+    except UploadError as e:
+        await send_json(send, e.to_dict(), e.status)
+        return
+    upload = await asyncio.to_thread(uploads.get, upload_id, session)
+    if upload is None:
+        await send_json(send, {"error": "Upload not found"}, 404)
+        return
+    await send_json(send, upload)
+
+
+async def session_reports(scope, receive, send):
+    try:
+        session = await asyncio.to_thread(upload_session, scope)
+    except UploadError as e:
+        await send_json(send, e.to_dict(), e.status)
+        return
+    reports = await asyncio.to_thread(uploads.attachments, session)
+    await send_json(send, {"session": session, "reports": reports})
+
+
+async def cache_stats(scope, receive, send):
+    await send_json(send, response_cache.stats())
+
+
+async def metrics(scope, receive, send):
+    body = registry.render().encode()
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", CONTENT_TYPE.encode()), (b"content-length", str(len(body)).encode())]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def handler_timing_stats(scope, receive, send):
+    await send_json(send, handler_timings())
+
+
+ROUTES = {
+    ("POST", "/webhook"): webhook,
+    ("POST", "/uploads"): create_upload,
+    ("GET", "/reports"): session_reports,
+    ("GET", "/cache/stats"): cache_stats,
+    ("GET", "/metrics"): metrics,
+    ("GET", "/handlers/timings"): handler_timing_stats
+}
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await asyncio.to_thread(outbox.stop)
+            await asyncio.to_thread(reminders.stop)
+            stop_logging()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        # The ASGI spec's way to refuse a protocol (e.g. websocket): the server
+        # closes the connection.
+        raise RuntimeError(f"Unsupported ASGI scope type {scope['type']}")
+    method, path = scope["method"], scope["path"].rstrip("/") or "/"
+    route = ROUTES.get((method, path))
+    parts = path.split("/")
+    try:
+        if route is not None:
+            await route(scope, receive, send)
+        elif method == "GET" and len(parts) == 4 and parts[1] == "bookings" and parts[3] == "notifications":
+            await booking_notifications(scope, receive, send, parts[2])
+        elif method == "PUT" and len(parts) == 3 and parts[1] == "uploads":
+            await upload_chunk(scope, receive, send, parts[2])
+        elif method == "GET" and len(parts) == 3 and parts[1] == "uploads":
+            await upload_status(scope, receive, send, parts[2])
+        else:
+            await send_json(send, {"error": "Not found"}, 404)
+    except Exception:
+        logging.exception(f"Unhandled error serving {method} {path}")
+        await send_json(send, {"error": "Internal server error"}, 500)
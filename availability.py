@@ -0,0 +1,234 @@
+import heapq
+import threading
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+
+# --- Slot availability store ---
+# Slots are held per doctor and hospital as sorted arrays of integer minutes since
+# the Unix epoch, parsed once when a doctor is loaded. Queries bisect into those
+# arrays instead of re-parsing date and time strings on every request.
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+MINUTES_PER_DAY = 24 * 60
+
+
+def to_minute(dt):
+    return (dt.toordinal() - EPOCH_ORDINAL) * MINUTES_PER_DAY + dt.hour * 60 + dt.minute
+
+
+def from_minute(minute):
+    return EPOCH + timedelta(minutes=minute)
+
+
+def parse_slot(date_str, time_str):
+    hours, minutes = time_str.split(":")
+    day = date.fromisoformat(date_str).toordinal() - EPOCH_ORDINAL
+    return day * MINUTES_PER_DAY + int(hours) * 60 + int(minutes)
+
+
+def day_of(minute):
+    return date.fromordinal(EPOCH_ORDINAL + minute // MINUTES_PER_DAY)
+
+
+def time_of(minute):
+    hours, minutes = divmod(minute % MINUTES_PER_DAY, 60)
+    return f"{hours:02d}:{minutes:02d}"
+
+
+def _writable(minutes):
+    # Tables restored from a snapshot are read-only views of the mapped file;
+    # they are copied into an array the first time they change.
+    return minutes if isinstance(minutes, array) else array("l", minutes)
+
+
+def _tagged(minutes, hospital):
+    for minute in minutes:
+        yield minute, hospital
+
+
+class AvailabilityStore:
+    def __init__(self, doctors, tables=None):
+        # tables: prepared {doctor: {hospital: minutes}}, e.g. from a snapshot.
+        self.doctors = doctors
+        self._lock = threading.Lock()
+        # Called with a doctor name (or None for everything) whenever slots change.
+        self.listeners = []
+        if tables is None:
+            self.rebuild()
+        else:
+            self._slots = tables
+
+    def _changed(self, doctor):
+        for listener in self.listeners:
+            listener(doctor)
+
+    def rebuild(self):
+        slots = {}
+        for name, details in self.doctors.items():
+            slots[name] = self._compile(details.get("available_dates", {}))
+        with self._lock:
+            self._slots = slots
+        self._changed(None)
+
+    def _compile(self, available_dates):
+        compiled = {}
+        for hospital, days in available_dates.items():
+            minutes = sorted({parse_slot(day["date"], t) for day in days for t in day["times"]})
+            compiled[hospital] = array("l", minutes)
+        return compiled
+
+    def update_doctor(self, name):
+        details = self.doctors.get(name)
+        compiled = self._compile(details.get("available_dates", {})) if details else None
+        with self._lock:
+            if compiled is None:
+                self._slots.pop(name, None)
+            else:
+                self._slots[name] = compiled
+        self._changed(name)
+
+    def set_slots(self, doctor, hospital, minutes):
+        # Replaces one doctor/hospital slot table wholesale, e.g. from a bulk import.
+        compiled = array("l", sorted(set(minutes)))
+        with self._lock:
+            # Copy-on-write so readers iterating the old table are unaffected.
+            tables = dict(self._slots.get(doctor, {}))
+            tables[hospital] = compiled
+            self._slots[doctor] = tables
+        self._changed(doctor)
+
+    def set_many(self, tables):
+        # Bulk form of set_slots for {doctor: {hospital: minutes}} with a single
+        # change notification; minutes must already be sorted and unique.
+        with self._lock:
+            for doctor, hospitals in tables.items():
+                merged = dict(self._slots.get(doctor, {}))
+                for hospital, minutes in hospitals.items():
+                    merged[hospital] = array("l", minutes)
+                self._slots[doctor] = merged
+        self._changed(None)
+
+    def replace_range(self, doctor, hospital, start, end, minutes):
+        # Replaces the slots in [start, end) with the given sorted minutes and
+        # leaves the rest of the table alone, e.g. when one day is recomputed.
+        with self._lock:
+            tables = dict(self._slots.get(doctor, {}))
+            current = _writable(tables.get(hospital, array("l")))
+            lo, hi = bisect_left(current, start), bisect_left(current, end)
+            tables[hospital] = current[:lo] + array("l", minutes) + current[hi:]
+            self._slots[doctor] = tables
+        self._changed(doctor)
+
+    def remove_slot(self, doctor, hospital, minute):
+        with self._lock:
+            tables = self._slots.get(doctor, {})
+            minutes = tables.get(hospital)
+            if minutes is None:
+                return False
+            i = bisect_left(minutes, minute)
+            if i >= len(minutes) or minutes[i] != minute:
+                return False
+            tables = dict(tables)
+            minutes = _writable(minutes)
+            tables[hospital] = minutes[:i] + minutes[i + 1:]
+            self._slots[doctor] = tables
+        self._changed(doctor)
+        return True
+
+    def add_slot(self, doctor, hospital, minute):
+        with self._lock:
+            tables = dict(self._slots.get(doctor, {}))
+            minutes = _writable(tables.get(hospital, array("l")))
+            i = bisect_left(minutes, minute)
+            if i < len(minutes) and minutes[i] == minute:
+                return False
+            tables[hospital] = minutes[:i] + array("l", [minute]) + minutes[i:]
+            self._slots[doctor] = tables
+        self._changed(doctor)
+        return True
+
+    def tables(self):
+        return dict(self._slots)
+
+    def has_slot(self, doctor, hospital, minute):
+        minutes = self._slots.get(doctor, {}).get(hospital)
+        if not minutes:
+            return False
+        i = bisect_left(minutes, minute)
+        return i < len(minutes) and minutes[i] == minute
+
+    def hospitals_with_slot(self, doctor, minute):
+        return [hospital for hospital in self._slots.get(doctor, {}) if self.has_slot(doctor, hospital, minute)]
+
+    def hospitals(self, doctor):
+        return list(self._slots.get(doctor, {}))
+
+    def _tables(self, doctor, hospital=None):
+        tables = self._slots.get(doctor, {})
+        if hospital is not None:
+            return {hospital: tables[hospital]} if hospital in tables else {}
+        return tables
+
+    def schedule(self, doctor, after=None):
+        # [(hospital, [(date, ["HH:MM", ...]), ...])] grouped by calendar day.
+        # Days the catalogue lists with no times are included with an empty list.
+        start = to_minute(after) if after else None
+        listed = (self.doctors.get(doctor) or {}).get("available_dates", {})
+        result = []
+        for hospital, minutes in self._tables(doctor).items():
+            i = bisect_left(minutes, start) if start is not None else 0
+            days = []
+            current_day = None
+            for minute in minutes[i:]:
+                day = minute // MINUTES_PER_DAY
+                if day != current_day:
+                    current_day = day
+                    days.append((day_of(minute), []))
+                days[-1][1].append(time_of(minute))
+            closed = {date.fromisoformat(day["date"]) for day in listed.get(hospital, ()) if not day["times"]}
+            closed -= {day for day, _ in days}
+            if after:
+                closed = {day for day in closed if day >= after.date()}
+            if closed:
+                days = sorted(days + [(day, []) for day in closed])
+            result.append((hospital, days))
+        return result
+
+    def between(self, doctor, start, end, hospital=None):
+        # Free slots in [start, end) as time-ordered (hospital, datetime) pairs.
+        lo, hi = to_minute(start), to_minute(end)
+        runs = []
+        for name, minutes in self._tables(doctor, hospital).items():
+            runs.append(_tagged(minutes[bisect_left(minutes, lo):bisect_left(minutes, hi)], name))
+        return [(name, from_minute(m)) for m, name in heapq.merge(*runs)]
+
+    def next_free(self, doctor, n=5, after=None, hospital=None):
+        start = to_minute(after or datetime.now())
+        runs = []
+        for name, minutes in self._tables(doctor, hospital).items():
+            runs.append(_tagged(minutes[bisect_left(minutes, start):], name))
+        result = []
+        for m, name in heapq.merge(*runs):
+            result.append((name, from_minute(m)))
+            if len(result) >= n:
+                break
+        return result
+
+    def earliest(self, candidates, after=None):
+        # candidates: [(doctor, locations)] as returned by DoctorIndex.search.
+        start = to_minute(after or datetime.now())
+        best = None
+        for doctor, locations in candidates:
+            tables = self._slots.get(doctor, {})
+            for hospital in locations:
+                minutes = tables.get(hospital)
+                if not minutes:
+                    continue
+                i = bisect_left(minutes, start)
+                if i < len(minutes) and (best is None or minutes[i] < best[2]):
+                    best = (doctor, hospital, minutes[i])
+        if best is None:
+            return None
+        return best[0], best[1], from_minute(best[2])
@@ -0,0 +1,88 @@
+import argparse
+import importlib
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Cold-start cost of the service: each run imports main in a fresh interpreter
+# against a synthetic catalogue, once building the derived structures and once
+# from a catalogue snapshot, and reports the median import time. It also lists
+# which of the lazily imported dependencies (Twilio, smtplib, NumPy) were loaded
+# by startup, which should be none.
+#
+#   python benchmarks/import_time.py --doctors 10000 --hospitals 500 --runs 5
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import isolate_state, scale_seed_data  # noqa: E402
+
+LAZY_MODULES = ("twilio.rest", "smtplib", "numpy", "pricing")
+
+
+def child(args):
+    doctors, hospitals = scale_seed_data(args.doctors, args.hospitals)
+    if args.build:
+        from snapshot import write_snapshot
+        start = time.perf_counter()
+        size = write_snapshot(args.build, doctors, hospitals)
+        print(json.dumps({"seconds": time.perf_counter() - start, "bytes": size}))
+        return
+    start = time.perf_counter()
+    importlib.import_module("main")
+    import services
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "seconds": elapsed,
+        "snapshot": services.snapshot is not None,
+        "loaded": [name for name in LAZY_MODULES if name in sys.modules]
+    }))
+
+
+def run_child(args, env, *extra):
+    command = [sys.executable, os.path.abspath(__file__), "--child",
+               "--doctors", str(args.doctors), "--hospitals", str(args.hospitals), *extra]
+    out = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--doctors", type=int, default=10000)
+    parser.add_argument("--hospitals", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--build", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="import-time-")
+    env = isolate_state(workdir, dict(os.environ))
+    env["WHATSAPP_TRANSPORT"] = "fake"
+    env.pop("CATALOGUE_SNAPSHOT", None)
+    snapshot_path = os.path.join(workdir, "catalogue.snap")
+    try:
+        built = run_child(args, env, "--build", snapshot_path)
+        print(f"{args.doctors} doctors, {args.hospitals} hospitals; snapshot "
+              f"{built['bytes'] / 1024 / 1024:.1f} MB written in {built['seconds'] * 1000:.0f} ms")
+
+        for label, extra_env in (("rebuild", {}), ("snapshot", {"CATALOGUE_SNAPSHOT": snapshot_path})):
+            results = [run_child(args, {**env, **extra_env}) for _ in range(args.runs)]
+            assert all(r["snapshot"] == bool(extra_env) for r in results), f"{label}: snapshot not used as expected"
+            median = statistics.median(r["seconds"] for r in results)
+            loaded = sorted({name for r in results for name in r["loaded"]})
+            print(f"{label:9s} import main  median {median * 1000:7.1f} ms  "
+                  f"lazy modules loaded: {', '.join(loaded) or 'none'}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
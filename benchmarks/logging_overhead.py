@@ -0,0 +1,119 @@
+import argparse
+import contextlib
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Compares webhook latency with the old synchronous logging (full raw body at
+# INFO plus a print per parameter) against the queue-based pipeline with sampling
+# and PII redaction. Log output goes to a real file in both modes.
+#
+#   python benchmarks/logging_overhead.py --requests 2000 --concurrency 8 --sample-rate 0.1
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import isolate_state  # noqa: E402
+
+BODY = {
+    "fulfillmentInfo": {"tag": "get_doctor_details"},
+    "sessionInfo": {
+        "session": "projects/bench/sessions/logging",
+        "parameters": {
+            "doctor_name": "Dr. Alice Smith",
+            "person_name": "Jane Doe",
+            "email": "jane@example.com",
+            "phone_number": "07700 900123",
+            "policy_number": "AXA-123456",
+            "authorisation_code": "AUTH-42",
+            "patient_summary": "Chest pain on exertion for two weeks. " * 20
+        }
+    },
+    "text": "I'd like to see Dr. Alice Smith"
+}
+
+
+def legacy_log(req):
+    # What webhook() did on every call before the logging pipeline.
+    tag = req["fulfillmentInfo"]["tag"]
+    params = req["sessionInfo"]["parameters"]
+    logging.info(f"Webhook called. Tag: {tag}, Params: {params}, Raw Body: {req}")
+    print("=== Incoming Webhook Call ===")
+    print(f"Tag: {tag}")
+    print("Parameters received:")
+    for k, v in params.items():
+        print(f"  {k}: {v}")
+
+
+def run(client, requests, concurrency):
+    def call(_):
+        start = time.perf_counter()
+        client.post("/webhook", json=BODY)
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(call, range(requests)))
+    elapsed = time.perf_counter() - start
+    return latencies, elapsed
+
+
+def report(label, latencies, elapsed):
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:10s} mean {statistics.mean(latencies):7.3f} ms  p50 {statistics.median(latencies):7.3f} ms  "
+          f"p95 {p95:7.3f} ms  {len(latencies) / elapsed:8.0f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="logging-overhead-")
+    isolate_state(workdir)
+    os.environ["RESPONSE_CACHE_SIZE"] = "0"
+    log_file = open(os.path.join(workdir, "webhook.log"), "w")
+
+    import logging_pipeline
+    logging_pipeline.configure_logging(sample_rate=args.sample_rate, stream=log_file)
+    import main as app_module
+
+    app = app_module.app
+    client = app.test_client()
+    legacy = {"enabled": False}
+
+    @app.before_request
+    def legacy_hook():
+        if legacy["enabled"]:
+            from flask import request
+            legacy_log(request.get_json(silent=True, force=True))
+
+    client.post("/webhook", json=BODY)
+    pipeline_result = run(client, args.requests, args.concurrency)
+    logging_pipeline.stop_logging()
+
+    # Legacy: synchronous handler on the root logger, stdout to the same file.
+    handler = logging.StreamHandler(log_file)
+    handler.setFormatter(logging.Formatter(logging_pipeline.LOG_FORMAT))
+    logging.getLogger().handlers = [handler]
+    logging_pipeline.webhook_logger.filters = []
+    logging_pipeline.webhook_logger.disabled = True
+    legacy["enabled"] = True
+    with contextlib.redirect_stdout(log_file):
+        legacy_result = run(client, args.requests, args.concurrency)
+
+    print(f"{args.requests} get_doctor_details requests, concurrency {args.concurrency}, "
+          f"sample rate {args.sample_rate}")
+    report("legacy", *legacy_result)
+    report("pipeline", *pipeline_result)
+    log_file.close()
+
+
+if __name__ == "__main__":
+    main()
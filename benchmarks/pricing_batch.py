@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Re-prices a synthetic booking set under a rule table of insurers and plans,
+# once booking by booking through PricingEngine.quote (the per-request path) and
+# once with quote_many, and checks both give the same totals.
+#
+#   python benchmarks/pricing_batch.py --bookings 100000 --insurers 40
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pricing import PricingEngine, RuleTable  # noqa: E402
+
+PLANS = ["", "bronze", "silver", "gold"]
+
+
+def build_rules(insurers, rng):
+    rows = []
+    for i in range(insurers):
+        rows.append({"insurer": f"insurer {i}", "discount": rng.choice([0.1, 0.2, 0.5]), "excess": rng.choice([0, 50, 100])})
+        for plan in PLANS[1:]:
+            if rng.random() < 0.5:
+                rows.append({
+                    "insurer": f"insurer {i}", "plan": plan, "discount": rng.choice([0.5, 0.8, 1.0]),
+                    "cap": rng.choice(["", 150, 250]), "excess": rng.choice([0, 25])
+                })
+    return RuleTable(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bookings", type=int, default=100000)
+    parser.add_argument("--insurers", type=int, default=40)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(22)
+    engine = PricingEngine()
+    engine.rules = build_rules(args.insurers, rng)
+    fees = rng.choice([180.0, 250.0, 280.0, 300.0, 320.0, 350.0, 400.0], args.bookings)
+    # A share of bookings are self-pay or with insurers the table does not know.
+    insurers = [f"Insurer {i}" if i < args.insurers else ("" if i % 2 else "Unknown Health")
+                for i in rng.integers(0, int(args.insurers * 1.25), args.bookings)]
+    plans = list(rng.choice(PLANS, args.bookings))
+
+    start = time.perf_counter()
+    looped = [engine.quote(fee, insurer, plan).total for fee, insurer, plan in zip(fees, insurers, plans)]
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = engine.quote_many(fees, insurers, plans)
+    batch_s = time.perf_counter() - start
+
+    assert np.array_equal(np.array(looped), batch["total"]), "batch and per-booking totals differ"
+    print(f"{args.bookings} bookings, {len(engine.rules.discount) - 1} rules")
+    print(f"per booking  {loop_s * 1000:9.1f} ms  ({loop_s / args.bookings * 1e6:.2f} us/booking)")
+    print(f"batch        {batch_s * 1000:9.1f} ms  ({loop_s / batch_s:.0f}x)")
+    print(f"total billed £{batch['total'].sum():,.2f}, discounts £{batch['reduction'].sum():,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import time
+
+# Times radius queries against the hospital grid and the distance-ranked doctor
+# lookup, in full and for one page of results, on a synthetic catalogue with
+# thousands of sites spread around the postcode-area centroids.
+#
+#   python benchmarks/proximity_search.py --doctors 10000 --hospitals 5000 --radius 20
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doctor_index import DoctorIndex  # noqa: E402
+from geo import KM_PER_MILE, HospitalLocator, PostcodeLookup  # noqa: E402
+from synthetic import build_catalogue  # noqa: E402
+
+PAGE_SIZE = 5
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--doctors", type=int, default=10000)
+    parser.add_argument("--hospitals", type=int, default=5000)
+    parser.add_argument("--radius", type=float, default=20.0, help="miles")
+    parser.add_argument("--queries", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    postcodes = PostcodeLookup()
+    centroids = [point for code, point in postcodes.coordinates.items() if code.isalpha()]
+    doctors, hospitals = build_catalogue(args.doctors, args.hospitals, days=1)
+    for details in hospitals.values():
+        lat, lon = rng.choice(centroids)
+        details["latitude"] = lat + rng.gauss(0, 0.08)
+        details["longitude"] = lon + rng.gauss(0, 0.12)
+
+    start = time.perf_counter()
+    locator = HospitalLocator(hospitals, postcodes)
+    index = DoctorIndex(doctors, hospitals)
+    print(f"{len(doctors)} doctors, {len(hospitals)} hospitals, indexed in {time.perf_counter() - start:.2f}s")
+
+    # Outward codes, some with an inward part that is not in the table.
+    outward = [code for code in postcodes.coordinates if not code.isalpha()]
+    places = [code + (f" {rng.randint(1, 9)}AB" if rng.random() < 0.5 else "")
+              for code in rng.choices(outward, k=args.queries)]
+    radius_km = args.radius * KM_PER_MILE
+    grid_times, ranked_times, page_times, sizes = [], [], [], []
+    for place in places:
+        start = time.perf_counter()
+        distances = locator.near(place, radius_km)
+        grid_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        sizes.append(len(index.nearby("Cardiology", distances)))
+        ranked_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        list(itertools.islice(index.iter_nearby("Cardiology", distances), PAGE_SIZE + 1))
+        page_times.append(time.perf_counter() - start)
+
+    for label, times in (("hospitals in radius", grid_times), ("all ranked doctors", ranked_times),
+                         ("first page", page_times)):
+        times.sort()
+        print(f"{label:20s} mean {statistics.mean(times) * 1000:.3f} ms  p50 {times[len(times) // 2] * 1000:.3f} ms  "
+              f"p99 {times[int(len(times) * 0.99)] * 1000:.3f} ms")
+    print(f"mean cardiologists returned: {statistics.mean(sizes):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# Schedules a day's worth of reminders compressed into a few seconds and lets
+# the scheduler deliver them through a pooled fake SMTP server and a fake
+# WhatsApp transport. Reports scheduling throughput, how late reminders went out
+# relative to their send time (negative when pulled forward into an earlier
+# batch), batch sizes and how many SMTP sessions were used.
+#
+#   python benchmarks/reminder_throughput.py --bookings 30000 --spread 10
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mailer import SMTPConnectionPool, build_message  # noqa: E402
+from reminders import ReminderScheduler  # noqa: E402
+from synthetic import FakeSMTP  # noqa: E402
+from whatsapp import FakeTransport, WhatsAppDispatcher  # noqa: E402
+
+
+class CountingSMTP(FakeSMTP):
+    opened = 0
+
+    def __init__(self, host, port, timeout=None):
+        super().__init__(host, port, timeout)
+        CountingSMTP.opened += 1
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bookings", type=int, default=30000)
+    parser.add_argument("--spread", type=float, default=10.0, help="seconds the send times are spread over")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--batch-window", type=float, default=1.0)
+    args = parser.parse_args()
+
+    pool = SMTPConnectionPool("smtp.bench", 25, starttls=False, size=2, transport=CountingSMTP)
+    dispatcher = WhatsAppDispatcher(FakeTransport(), "+440000000000", max_workers=8, messages_per_second=1e9)
+    lateness = []
+    batches = []
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def record(payloads):
+        now = time.time()
+        with lock:
+            lateness.extend(now - p["due"] for p in payloads)
+            batches.append(len(payloads))
+            if len(lateness) >= args.bookings * 2:
+                done.set()
+
+    def send_emails(payloads):
+        messages = [build_message("bench@example.com", p["to_email"], p["subject"], p["plain_body"], p["html_body"])
+                    for p in payloads]
+        results = pool.send_messages(messages)
+        record(payloads)
+        return results
+
+    def send_whatsapp(payloads):
+        sids = dispatcher.send_many([(p["to_number"], p["body"]) for p in payloads])
+        record(payloads)
+        return [sid is not None for sid in sids]
+
+    workdir = tempfile.mkdtemp(prefix="reminders-")
+    try:
+        scheduler = ReminderScheduler(
+            os.path.join(workdir, "reminders.db"),
+            senders={"email": send_emails, "whatsapp": send_whatsapp},
+            batch_size=args.batch_size,
+            batch_window=args.batch_window
+        )
+        # Leave time to schedule everything before the first send is due.
+        first = time.time() + 1.0 + args.bookings / 3000
+        start = time.perf_counter()
+        for i in range(args.bookings):
+            due = first + args.spread * i / args.bookings
+            scheduler.schedule(f"booking-{i}", [
+                ("email", {"to_email": f"patient{i}@example.com", "subject": "Reminder",
+                           "plain_body": "See you tomorrow.", "html_body": "<p>See you tomorrow.</p>", "due": due}),
+                ("whatsapp", {"to_number": f"+4477009{i:05d}", "body": "See you tomorrow.", "due": due})
+            ], due)
+        schedule_s = time.perf_counter() - start
+        done.wait(max(first - time.time(), 0) + args.spread + 60)
+        scheduler.stop()
+    finally:
+        shutil.rmtree(workdir)
+        dispatcher.close()
+        pool.close()
+
+    lateness.sort()
+    reminders = len(lateness)
+    print(f"{args.bookings} bookings, {reminders} reminders sent over {args.spread:.0f}s")
+    print(f"schedule     {args.bookings / schedule_s:9.0f} bookings/s")
+    print(f"lateness     min {lateness[0] * 1000:7.1f} ms  p50 {statistics.median(lateness) * 1000:7.1f} ms  "
+          f"p99 {lateness[int(reminders * 0.99) - 1] * 1000:7.1f} ms  max {lateness[-1] * 1000:7.1f} ms")
+    print(f"batches      {len(batches)} (mean {statistics.mean(batches):.1f} reminders)")
+    print(f"SMTP opens   {CountingSMTP.opened}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import contextlib
+import io
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# Fires hundreds of concurrent send_final_confirmation webhook calls at a handful
+# of slots and checks that every slot is booked at most once.
+#
+#   python benchmarks/reservation_load.py --requests 500 --concurrency 64
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import isolate_state  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--doctor", default="Dr. Alice Smith")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="reservation-load-")
+    isolate_state(workdir)
+    logging.disable(logging.CRITICAL)
+
+    import main as app_module
+    import services
+    services.outbox.handlers = {"email": lambda **kwargs: True, "whatsapp": lambda **kwargs: True}
+    client = app_module.app.test_client()
+
+    slots = [
+        f"{day['date']}T{t}:00"
+        for days in services.DOCTORS[args.doctor]["available_dates"].values()
+        for day in days
+        for t in day["times"]
+    ]
+
+    def book(i):
+        slot = random.choice(slots)
+        response = client.post("/webhook", json={
+            "fulfillmentInfo": {"tag": "send_final_confirmation"},
+            "sessionInfo": {
+                "session": f"projects/load/sessions/{i}",
+                "parameters": {
+                    "person_name": f"Patient {i}",
+                    "email": f"patient{i}@example.com",
+                    "phone_number": "07700900000",
+                    "doctor_name": args.doctor,
+                    "appointment_datetime": slot
+                }
+            }
+        }).get_json()
+        return slot, "booking_id" in response.get("sessionInfo", {}).get("parameters", {})
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(book, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    booked = Counter(slot for slot, ok in results if ok)
+    rows = services.reservations.db.connect().execute(
+        "SELECT hospital, slot, COUNT(*) FROM slot_bookings WHERE doctor = ? GROUP BY hospital, slot",
+        (args.doctor,)
+    ).fetchall()
+    double_booked = [slot for slot, count in booked.items() if count > 1] + [row for row in rows if row[2] > 1]
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {elapsed:.2f}s "
+          f"({args.requests / elapsed:.0f} req/s)")
+    print(f"distinct slots: {len(set(slots))}, bookings confirmed: {sum(booked.values())}, "
+          f"rejected: {args.requests - sum(booked.values())}")
+    if double_booked:
+        print(f"DOUBLE BOOKED: {double_booked}")
+        return 1
+    print("no double bookings")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
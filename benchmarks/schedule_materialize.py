@@ -0,0 +1,101 @@
+import argparse
+import csv
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# Writes synthetic schedule rules (weekly templates for every doctor at one to
+# three hospitals, a sprinkling of exceptions and some hospital holidays) as CSV,
+# then times loading them, materializing the rolling window and the incremental
+# paths: one exception, one holiday and a daily roll.
+#
+#   python benchmarks/schedule_materialize.py --doctors 10000 --hospitals 500 --window 28
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from availability import AvailabilityStore  # noqa: E402
+from schedules import ScheduleEngine, day_number  # noqa: E402
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def write_rules(workdir, doctors, hospitals, window, rng):
+    today = date.today()
+    with open(os.path.join(workdir, "templates.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["doctor", "hospital", "weekday", "start", "end", "every"])
+        for d in range(doctors):
+            for h in rng.sample(range(hospitals), rng.randint(1, 3)):
+                for weekday in rng.sample(WEEKDAYS[:5], rng.randint(1, 3)):
+                    start = rng.choice(["08:00", "09:00", "13:00"])
+                    end = {"08:00": "12:00", "09:00": "17:00", "13:00": "18:00"}[start]
+                    writer.writerow([f"Dr. Bench {d}", f"Hospital {h}", weekday, start, end, rng.choice([15, 20, 30])])
+    with open(os.path.join(workdir, "exceptions.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["doctor", "hospital", "date", "start", "end", "every"])
+        for d in rng.sample(range(doctors), doctors // 10):
+            day = today + timedelta(days=rng.randrange(window))
+            writer.writerow([f"Dr. Bench {d}", f"Hospital {rng.randrange(hospitals)}", day.isoformat(), "", "", ""])
+    with open(os.path.join(workdir, "holidays.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["hospital", "date"])
+        for h in range(0, hospitals, 7):
+            writer.writerow([f"Hospital {h}", (today + timedelta(days=rng.randrange(window))).isoformat()])
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--doctors", type=int, default=10000)
+    parser.add_argument("--hospitals", type=int, default=500)
+    parser.add_argument("--window", type=int, default=28)
+    parser.add_argument("--changes", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(19)
+    workdir = tempfile.mkdtemp(prefix="schedules-")
+    try:
+        write_rules(workdir, args.doctors, args.hospitals, args.window, rng)
+        availability = AvailabilityStore({})
+        engine = ScheduleEngine(availability, window_days=args.window)
+
+        load_ms = timed(engine.load, workdir)
+        materialize_ms = timed(engine.materialize)
+        keys = sorted(engine.keys())
+        slots = sum(len(t) for tables in availability._slots.values() for t in tables.values())
+
+        today = day_number(date.today())
+        exception_ms = [
+            timed(engine.set_exception, *rng.choice(keys), today + rng.randrange(args.window), ())
+            for _ in range(args.changes)
+        ]
+        holiday_ms = [
+            timed(engine.set_holiday, f"Hospital {rng.randrange(args.hospitals)}", today + rng.randrange(args.window))
+            for _ in range(args.changes)
+        ]
+        roll_ms = timed(engine.roll, date.today() + timedelta(days=1))
+        rebuild_ms = timed(engine.materialize)
+    finally:
+        shutil.rmtree(workdir)
+
+    print(f"{args.doctors} doctors, {len(keys)} doctor/hospital schedules, {slots} slots over {args.window} days")
+    print(f"load CSV        {load_ms:9.1f} ms")
+    print(f"materialize     {materialize_ms:9.1f} ms")
+    print(f"exception       {statistics.median(exception_ms):9.3f} ms median")
+    print(f"holiday         {statistics.median(holiday_ms):9.3f} ms median")
+    print(f"roll one day    {roll_ms:9.1f} ms")
+    print(f"full rebuild    {rebuild_ms:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
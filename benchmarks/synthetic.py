@@ -0,0 +1,224 @@
+import itertools
+import os
+import random
+from datetime import date, timedelta
+
+# Synthetic catalogue, Dialogflow CX payloads and offline SMTP stand-in shared by
+# the benchmark scripts. Everything is seeded so runs are reproducible.
+
+SPECIALTIES = [
+    "Cardiology", "Neurology", "Dermatology", "Orthopaedics", "Gastroenterology", "Urology",
+    "Ophthalmology", "General Surgery, Breast Surgery", "Rheumatology", "Endocrinology",
+    "ENT", "Gynaecology", "Oncology", "Respiratory Medicine", "Paediatrics", "Psychiatry"
+]
+CITIES = [
+    ("London", ["E", "N", "SE", "SW", "W", "NW", "IG", "RM"]),
+    ("Brentwood", ["CM"]),
+    ("Chelmsford", ["CM"]),
+    ("Manchester", ["M"]),
+    ("Birmingham", ["B"]),
+    ("Leeds", ["LS"]),
+    ("Bristol", ["BS"]),
+    ("Liverpool", ["L"]),
+    ("Sheffield", ["S"]),
+    ("Nottingham", ["NG"]),
+    ("Cambridge", ["CB"]),
+    ("Oxford", ["OX"]),
+    ("Brighton", ["BN"]),
+    ("Reading", ["RG"]),
+    ("Norwich", ["NR"]),
+    ("Southampton", ["SO"])
+]
+FIRST_NAMES = [
+    "Alice", "Ben", "Emily", "Farah", "George", "Hannah", "Imran", "Julia", "Kwame", "Laura",
+    "Mohammed", "Nadia", "Oliver", "Priya", "Quentin", "Rachel", "Samuel", "Tasha", "Umar", "Victoria",
+    "William", "Xin", "Yusuf", "Zara", "Adam", "Beatrice", "Callum", "Deepa", "Edward", "Fiona",
+    "Gareth", "Helen", "Isaac", "Jasmine", "Kieran", "Leah", "Marcus", "Niamh", "Owen", "Phoebe",
+    "Rahul", "Sophie", "Thomas", "Uma", "Vikram", "Wendy", "Amir", "Bethany", "Chen", "Daniel"
+]
+SYLLABLES = ["ab", "ber", "car", "dan", "el", "for", "gan", "har", "ing", "jon", "kel", "lam", "mor",
+             "nash", "ol", "pem", "quin", "ros", "sel", "ton", "ul", "ver", "wick", "yar", "zo"]
+TITLES = ["Dr.", "Mr", "Miss", "Mrs", "Prof."]
+TIMES = [f"{h:02d}:{m:02d}" for h in range(9, 18) for m in (0, 15, 30, 45)]
+INSURERS = ["AXA Health", "Bupa", "Aviva", "Vitality", "WPA", None]
+
+
+def _surnames(count):
+    for n in itertools.count(2):
+        for parts in itertools.product(SYLLABLES, repeat=n):
+            yield "".join(parts).capitalize()
+            count -= 1
+            if count <= 0:
+                return
+
+
+def _postcode(rng, area):
+    return f"{area}{rng.randint(1, 20)} {rng.randint(1, 9)}{rng.choice('ABDEFGHJLNPQRSTUWXYZ')}{rng.choice('ABDEFGHJLNPQRSTUWXYZ')}"
+
+
+def build_catalogue(doctor_count=10000, hospital_count=500, days=14, seed=7, start=None):
+    rng = random.Random(seed)
+    start = start or date.today() + timedelta(days=1)
+    hospitals = {}
+    for i in range(hospital_count):
+        city, areas = CITIES[i % len(CITIES)]
+        hospitals[f"{city} Clinic {i}"] = {
+            "city": city,
+            "postcode": _postcode(rng, rng.choice(areas)),
+            "address": f"{rng.randint(1, 300)} High Street, {city}",
+            "phone": f"0{rng.randint(1000, 9999)} {rng.randint(100000, 999999)}"
+        }
+    hospital_names = list(hospitals)
+    surnames = list(_surnames(doctor_count // len(FIRST_NAMES) + 1))
+    doctors = {}
+    for i, (last, first) in enumerate(itertools.product(surnames, FIRST_NAMES)):
+        if i >= doctor_count:
+            break
+        locations = rng.sample(hospital_names, rng.randint(1, 3))
+        available = {}
+        for hospital in locations:
+            available[hospital] = [
+                {"date": (start + timedelta(days=d)).isoformat(), "times": sorted(rng.sample(TIMES, rng.randint(1, 6)))}
+                for d in sorted(rng.sample(range(days), rng.randint(1, min(days, 5))))
+            ]
+        doctors[f"{rng.choice(TITLES)} {first} {last}"] = {
+            "specialty": rng.choice(SPECIALTIES),
+            "qualifications": "MBBS, FRCP",
+            "gmcNumber": str(1000000 + i),
+            "practisingSince": rng.randint(1980, 2018),
+            "locations": locations,
+            "fees": {"Initial consultation": rng.choice([200, 250, 280, 300, 320, 350])},
+            "available_dates": available,
+            "services": ["Consultation", "Follow-up"]
+        }
+    return doctors, hospitals
+
+
+STATE_DATABASES = ("OUTBOX", "RESERVATIONS", "IDEMPOTENCY", "REMINDERS", "UPLOADS")
+
+
+def isolate_state(workdir, env=None):
+    # Points every SQLite store and the upload directory that services creates
+    # at import into workdir, so a benchmark never writes into the working tree.
+    # Updates env (os.environ by default) and returns it.
+    env = os.environ if env is None else env
+    for name in STATE_DATABASES:
+        env[f"{name}_DB_PATH"] = os.path.join(workdir, f"{name.lower()}.db")
+    env["UPLOADS_DIR"] = os.path.join(workdir, "uploads")
+    return env
+
+
+def scale_seed_data(doctor_count, hospital_count, seed=7):
+    # Adds synthetic entries to data.DOCTORS / data.HOSPITALS. Must run before
+    # services is imported, since the catalogue is loaded from them at import.
+    import data
+    doctors, hospitals = build_catalogue(doctor_count, hospital_count, seed=seed)
+    data.DOCTORS.update(doctors)
+    data.HOSPITALS.update(hospitals)
+    return data.DOCTORS, data.HOSPITALS
+
+
+class PayloadGenerator:
+    def __init__(self, doctors, hospitals, seed=11):
+        self.rng = random.Random(seed)
+        self.doctors = doctors
+        self.doctor_names = list(doctors)
+        self.hospitals = hospitals
+        self.hospital_names = list(hospitals)
+        self.sessions = itertools.count(1)
+
+    def _body(self, tag, parameters, text=""):
+        return {
+            "detectIntentResponseId": f"bench-{self.rng.getrandbits(64):016x}",
+            "fulfillmentInfo": {"tag": tag},
+            "sessionInfo": {
+                "session": f"projects/bench/locations/global/agents/bench/sessions/{next(self.sessions)}",
+                "parameters": parameters
+            },
+            "text": text,
+            "languageCode": "en"
+        }
+
+    def get_doctor_list(self):
+        rng = self.rng
+        hospital = self.hospitals[rng.choice(self.hospital_names)]
+        parameters = {"specialty": rng.choice(SPECIALTIES)}
+        shape = rng.random()
+        if shape < 0.4:
+            parameters["location"] = hospital["city"]
+        elif shape < 0.7:
+            parameters["city"] = hospital["city"]
+        elif shape < 0.9:
+            parameters["postcode"] = hospital["postcode"]
+        return self._body("get_doctor_list", parameters, f"I need a {parameters['specialty']} specialist")
+
+    def _spoken_name(self, name):
+        # Mix exact keys with the looser forms people actually say or type.
+        rng = self.rng
+        parts = name.split(" ")
+        shape = rng.random()
+        if shape < 0.5:
+            return name
+        if shape < 0.8:
+            return " ".join(parts[1:])
+        return " ".join(parts[1:]).lower()
+
+    def get_doctor_details(self):
+        name = self.rng.choice(self.doctor_names)
+        spoken = self._spoken_name(name)
+        return self._body("get_doctor_details", {"doctor_name": spoken}, f"Tell me about {spoken}")
+
+    def prompt_upload_reports(self):
+        return self._body("prompt_upload_reports", {}, "I have some reports")
+
+    def send_final_confirmation(self):
+        rng = self.rng
+        name = rng.choice(self.doctor_names)
+        hospital, days = rng.choice(list(self.doctors[name].get("available_dates", {}).items()) or [(None, [])])
+        if days:
+            day = rng.choice(days)
+            slot = f"{day['date']}T{rng.choice(day['times'])}:00"
+        else:
+            slot = "2030-01-01T09:00:00"
+        n = rng.randint(1, 10 ** 6)
+        parameters = {
+            "person_name": {"name": f"Patient {n}"},
+            "email": f"patient{n}@example.com",
+            "phone_number": f"07700 {n % 1000000:06d}",
+            "doctor_name": name,
+            "appointment_datetime": slot
+        }
+        insurer = rng.choice(INSURERS)
+        if insurer:
+            parameters.update(insurance_provider=insurer, policy_number=f"POL-{n}", authorisation_code=f"AUTH-{n % 997}")
+        return self._body("send_final_confirmation", parameters, "Yes, please book it")
+
+    def generate(self, tag):
+        return getattr(self, tag)()
+
+
+class FakeSMTP:
+    # Offline smtplib.SMTP stand-in for SMTPConnectionPool(transport=...).
+    sent = []
+
+    def __init__(self, host, port, timeout=None):
+        self.host = host
+
+    def starttls(self):
+        return 220, b"ready"
+
+    def login(self, username, password):
+        return 235, b"ok"
+
+    def noop(self):
+        return 250, b"ok"
+
+    def send_message(self, msg):
+        FakeSMTP.sent.append(msg["To"])
+        return {}
+
+    def quit(self):
+        return 221, b"bye"
+
+    def close(self):
+        pass
@@ -0,0 +1,203 @@
+import argparse
+import html
+import os
+import sys
+import timeit
+
+# Compares rendering the booking confirmation (plain text + HTML email) with the
+# precompiled templates against the per-request f-string assembly they replaced.
+#
+#   python benchmarks/template_render.py --number 20000
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from confirmation_templates import Booking, render_confirmation_html, render_confirmation_text  # noqa: E402
+
+BOOKING = Booking(
+    booking_id="bench",
+    first_name="Jane Doe",
+    email="jane@example.com",
+    mobile="07700 900123",
+    doctor_name="Dr. Alice Smith",
+    specialty="Cardiology",
+    qualifications="MD, FACC",
+    gmc_number="7890123",
+    practising_since=2001,
+    hospital_name="Nuffield Health Brentwood Hospital",
+    hospital_address="Shenfield Road, Brentwood",
+    hospital_city="Brentwood",
+    hospital_postcode="CM15 8EH",
+    hospital_phone="01277 695695",
+    formatted_date_time="Monday, 29 September 2025 at 10:00 AM",
+    base_fee=350,
+    total_bill=175.0,
+    insurer="AXA Health",
+    policy_number="AXA-123456",
+    authorisation_code="AUTH-42",
+    discount_label="50% insurance discount"
+)
+
+
+def legacy_render(b):
+    # The f-string assembly send_final_confirmation used before the templates.
+    plain = (
+        f"Booking Confirmed!\n\n"
+        f"Doctor: {b.doctor_name}\n"
+        f"Specialty: {b.specialty}\n"
+        f"Location: {b.hospital_name}\n"
+        f"Address: {b.hospital_address}\n"
+        f"Phone: {b.hospital_phone}\n"
+        f"Date & Time: {b.formatted_date_time}\n"
+    )
+    if b.insurer:
+        plain += (
+            f"Insurer: {b.insurer}\n"
+            f"Policy Number: {b.policy_number}\n"
+            f"Authorisation Code: {b.authorisation_code}\n"
+        )
+    plain += (
+        f"Total Bill: £{b.total_bill:.2f}\n"
+        f"\nA confirmation has been sent to your email ✉️ ({b.email}) and WhatsApp 📞 ({b.mobile}).\n"
+    )
+    html = f"""
+        <html>
+        <head>
+            <style>
+                body {{
+                    font-family: Arial, sans-serif;
+                    color: #222;
+                    background-color: #f7f7f7;
+                    margin: 0;
+                    padding: 0;
+                }}
+                .container {{
+                    background: #fff;
+                    margin: 30px auto;
+                    padding: 24px;
+                    border-radius: 10px;
+                    max-width: 600px;
+                    box-shadow: 0 2px 12px rgba(0,0,0,0.08);
+                }}
+                .header {{
+                    background-color: #1d7cab;
+                    color: #fff;
+                    padding: 16px;
+                    border-radius: 10px 10px 0 0;
+                    text-align: center;
+                }}
+                .section-title {{
+                    margin-top: 24px;
+                    font-size: 18px;
+                    color: #1d7cab;
+                    border-bottom: 1px solid #eee;
+                }}
+                .info-list {{
+                    list-style: none;
+                    padding: 0;
+                    margin: 0;
+                }}
+                .info-list li {{
+                    margin-bottom: 10px;
+                    font-size: 16px;
+                }}
+                .footer {{
+                    margin-top: 32px;
+                    font-size: 15px;
+                    color: #666;
+                    text-align: center;
+                }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h2>✅ Your Consultation is Confirmed!</h2>
+                </div>
+                <p>Dear {b.first_name},</p>
+                <p>
+                    Thank you for booking your consultation. Here are your appointment details:
+                </p>
+                <div class="section-title">Doctor Details</div>
+                <ul class="info-list">
+                    <li><strong>Name:</strong> {b.doctor_name}</li>
+                    <li><strong>Specialty:</strong> {b.specialty}</li>
+                    <li><strong>Qualifications:</strong> {b.qualifications}</li>
+                    <li><strong>GMC Number:</strong> {b.gmc_number}</li>
+                    <li><strong>Practising Since:</strong> {b.practising_since}</li>
+                </ul>
+                <div class="section-title">Hospital Details</div>
+                <ul class="info-list">
+                    <li><strong>Hospital:</strong> {b.hospital_name}</li>
+                    <li><strong>Address:</strong> {b.hospital_address}</li>
+                    <li><strong>City:</strong> {b.hospital_city}</li>
+                    <li><strong>Postcode:</strong> {b.hospital_postcode}</li>
+                    <li><strong>Phone:</strong> {b.hospital_phone}</li>
+                </ul>
+                <div class="section-title">Appointment Details</div>
+                <ul class="info-list">
+                    <li><strong>Date & Time:</strong> {b.formatted_date_time}</li>
+                    <li><strong>Consultation Fee:</strong> £{b.base_fee:.2f}</li>
+                </ul>
+        """
+    if b.insurer:
+        html += f"""
+                <div class="section-title">Insurance Details</div>
+                <ul class="info-list">
+                    <li><strong>Provider:</strong> {b.insurer}</li>
+                    <li><strong>Policy Number:</strong> {b.policy_number}</li>
+                    <li><strong>Discount Applied:</strong> {b.discount_label}</li>
+                </ul>
+            """
+    html += f"""
+                <div class="section-title">Total Bill</div>
+                <ul class="info-list">
+                    <li><strong>Total Amount Due:</strong> £{b.total_bill:.2f}</li>
+                </ul>
+                <div class="section-title">Contact Details</div>
+                <ul class="info-list">
+                    <li><strong>Email:</strong> {b.email}</li>
+                    <li><strong>Phone:</strong> {b.mobile}</li>
+                </ul>
+                <div class="footer">
+                    <p>If you have any questions, please contact us at <a href="mailto:info@yourclinic.com">info@yourclinic.com</a> or call {b.hospital_phone}.</p>
+                    <p>We look forward to seeing you!</p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+    return plain, html
+
+
+def legacy_render_escaped(b):
+    # The legacy assembly with the same HTML escaping the templates apply, i.e.
+    # the cost the f-strings would have had if they had been safe.
+    e = html.escape
+    escaped = Booking(**{k: e(str(v)) if isinstance(v, str) or v is None else v for k, v in vars(b).items()})
+    escaped.first_name = e(str(b.first_name))
+    return legacy_render(escaped)
+
+
+def compiled_render(b):
+    return render_confirmation_text(b), render_confirmation_html(b)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    assert legacy_render(BOOKING) == compiled_render(BOOKING), "renderers disagree on escape-free input"
+
+    for label, fn in (
+        ("f-string, unescaped", legacy_render),
+        ("f-string + escaping", legacy_render_escaped),
+        ("compiled templates", compiled_render)
+    ):
+        best = min(timeit.repeat(lambda: fn(BOOKING), number=args.number, repeat=args.repeat))
+        print(f"{label:22s} {best / args.number * 1e6:8.2f} us/render")
+
+
+if __name__ == "__main__":
+    main()
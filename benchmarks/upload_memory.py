@@ -0,0 +1,196 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Uploads a multi-hundred-MB synthetic report through the Flask and ASGI upload
+# endpoints and reports the tracemalloc peak for each: one request carrying the
+# whole file, and the same file in Content-Range chunks with a dropped chunk
+# that is resumed. Re-uploading the same bytes checks content-hash dedup. With
+# --buffered the same file also goes through a route that reads request.data,
+# for comparison.
+#
+#   python benchmarks/upload_memory.py --size-mb 300 --chunk-mb 32
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import isolate_state  # noqa: E402
+
+BLOCK = 1024 * 1024
+ASGI_MESSAGE = 64 * 1024
+
+
+class SyntheticReport:
+    # File-like source of `size` deterministic bytes, generated block by block.
+    def __init__(self, size, start=0, end=None, seed=21):
+        # Every block carries a DICOM preamble so the whole file passes the
+        # store's signature check; block 0's 8-byte index prefix is all zeros.
+        self.base = bytes(128) + b"DICM" + random.Random(seed).randbytes(BLOCK - 132)
+        self.position = start
+        self.end = size if end is None else end
+
+    def _block(self, index):
+        return index.to_bytes(8, "big") + self.base[8:]
+
+    def read(self, n=-1):
+        if n is None or n < 0:
+            n = self.end - self.position
+        n = min(n, self.end - self.position)
+        out = []
+        while n > 0:
+            index, offset = divmod(self.position, BLOCK)
+            piece = self._block(index)[offset:offset + n]
+            out.append(piece)
+            self.position += len(piece)
+            n -= len(piece)
+        return b"".join(out)
+
+    # tell/seek let the werkzeug test client work out the Content-Length.
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=0):
+        self.position = self.end + offset if whence == 2 else offset
+        return self.position
+
+
+def expected_sha256(size):
+    hasher = hashlib.sha256()
+    source = SyntheticReport(size)
+    while True:
+        data = source.read(BLOCK)
+        if not data:
+            return hasher.hexdigest()
+        hasher.update(data)
+
+
+def measure(label, fn, size):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:28s} peak {peak / 1024 / 1024:8.2f} MB  {size / 1024 / 1024 / elapsed:7.0f} MB/s")
+    return result
+
+
+def flask_upload(client, token, size, chunk, drop_at=None):
+    auth = {"Authorization": f"Bearer {token}"}
+    upload = client.post("/uploads", headers=auth, json={
+        "filename": "scan.dcm", "content_type": "application/dicom", "size": size
+    }).get_json()
+    start = 0
+    while start < size:
+        end = min(start + chunk, size)
+        body_end = end
+        if drop_at is not None and start <= drop_at < end:
+            # The connection drops partway: the server keeps what arrived.
+            body_end, drop_at = drop_at, None
+        response = client.put(
+            f"/uploads/{upload['id']}",
+            input_stream=SyntheticReport(size, start, body_end),
+            headers={**auth, "Content-Range": f"bytes {start}-{end - 1}/{size}"}
+        )
+        if response.status_code != 200:
+            start = client.get(f"/uploads/{upload['id']}", headers=auth).get_json()["received"]
+        else:
+            start = end
+    return response.get_json()
+
+
+def asgi_upload(app, token, size):
+    auth = (b"authorization", f"Bearer {token}".encode())
+
+    async def request(method, path, body_source=None, headers=(), json_body=None):
+        messages = []
+        if json_body is not None:
+            messages.append(json.dumps(json_body).encode())
+        sent = {}
+
+        async def receive():
+            if messages:
+                return {"type": "http.request", "body": messages.pop(), "more_body": False}
+            if body_source is None:
+                return {"type": "http.request", "body": b"", "more_body": False}
+            data = body_source.read(ASGI_MESSAGE)
+            return {"type": "http.request", "body": data, "more_body": body_source.position < body_source.end}
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                sent["body"] = message["body"]
+
+        scope = {"type": "http", "method": method, "path": path, "query_string": b"", "headers": [auth, *headers]}
+        await app(scope, receive, send)
+        return json.loads(sent["body"])
+
+    async def run():
+        upload = await request("POST", "/uploads", json_body={
+            "filename": "scan.dcm", "content_type": "application/dicom", "size": size
+        })
+        return await request(
+            "PUT", f"/uploads/{upload['id']}", body_source=SyntheticReport(size),
+            headers=[(b"content-range", f"bytes 0-{size - 1}/{size}".encode())]
+        )
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=300)
+    parser.add_argument("--chunk-mb", type=int, default=32)
+    parser.add_argument("--buffered", action="store_true")
+    args = parser.parse_args()
+    size, chunk = args.size_mb * 1024 * 1024, args.chunk_mb * 1024 * 1024
+
+    workdir = tempfile.mkdtemp(prefix="upload-memory-")
+    isolate_state(workdir)
+    os.environ["UPLOAD_MAX_BYTES"] = str(size)
+    try:
+        import asgi
+        import main as app_module
+        import services
+        from flask import request
+
+        app = app_module.app
+
+        @app.route("/buffered", methods=["PUT"])
+        def buffered():
+            return {"sha256": hashlib.sha256(request.get_data()).hexdigest()}
+
+        client = app.test_client()
+        digest = expected_sha256(size)
+        print(f"{args.size_mb} MB report, {args.chunk_mb} MB chunks")
+
+        token = services.uploads.issue_token
+        whole = measure("flask, one request", lambda: flask_upload(client, token("s-whole"), size, size), size)
+        chunked = measure("flask, chunked + resume",
+                          lambda: flask_upload(client, token("s-chunked"), size, chunk, drop_at=size // 2 + 12345),
+                          size)
+        streamed = measure("asgi, one request", lambda: asgi_upload(asgi.app, token("s-asgi"), size), size)
+        for label, result in (("whole", whole), ("chunked", chunked), ("asgi", streamed)):
+            assert result["sha256"] == digest, f"{label} upload hash mismatch"
+        print(f"dedup: first upload stored={not whole['deduplicated']}, "
+              f"later uploads deduplicated={chunked['deduplicated'] and streamed['deduplicated']}")
+        blobs = sum(len(files) for _, _, files in os.walk(os.path.join(workdir, "uploads", "blobs")))
+        print(f"blobs on disk: {blobs}")
+
+        if args.buffered:
+            measure("flask, request.data", lambda: client.put(
+                "/buffered", input_stream=SyntheticReport(size)
+            ), size)
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
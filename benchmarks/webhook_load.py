@@ -0,0 +1,228 @@
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# Load test for /webhook: realistic Dialogflow CX payloads for every tag against
+# a synthetic catalogue, with SMTP and Twilio replaced by local stand-ins.
+# Reports p50/p95/p99 latency and throughput per tag, and can fail the run when
+# p95 regresses against a saved baseline.
+#
+#   python benchmarks/webhook_load.py --mode client --doctors 10000 --requests 5000
+#   python benchmarks/webhook_load.py --mode http --concurrency 32 --save baseline.json
+#   python benchmarks/webhook_load.py --baseline baseline.json --max-regression 0.2
+#
+# --mode http serves the app from a threaded server in this process; pass --url
+# to target an already running server instead (no stubbing or scaling applies).
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import FakeSMTP, PayloadGenerator, isolate_state, scale_seed_data  # noqa: E402
+
+DEFAULT_MIX = "get_doctor_list=4,get_doctor_details=4,prompt_upload_reports=1,send_final_confirmation=1"
+
+
+def parse_mix(spec):
+    mix = []
+    for part in spec.split(","):
+        tag, _, weight = part.partition("=")
+        mix.append((tag.strip(), int(weight or 1)))
+    return mix
+
+
+def prepare_app(args):
+    workdir = tempfile.mkdtemp(prefix="webhook-load-")
+    isolate_state(workdir)
+    os.environ["WHATSAPP_TRANSPORT"] = "fake"
+    os.environ.setdefault("SENDER_EMAIL", "bench@example.com")
+    os.environ.setdefault("SENDER_PASSWORD", "bench")
+    os.environ.setdefault("TWILIO_PHONE_NUMBER", "+15550000000")
+    os.environ.setdefault("TWILIO_MESSAGES_PER_SECOND", "100000")
+    if args.no_cache:
+        os.environ["RESPONSE_CACHE_SIZE"] = "0"
+    scale_seed_data(args.doctors, args.hospitals)
+
+    start = time.perf_counter()
+    import main as app_module
+    import services
+    from mailer import SMTPConnectionPool
+    print(f"catalogue: {len(services.DOCTORS)} doctors, {len(services.HOSPITALS)} hospitals, "
+          f"loaded in {time.perf_counter() - start:.2f}s")
+    services._smtp_pool = SMTPConnectionPool(
+        services.SMTP_HOST, services.SMTP_PORT, username="bench", password="bench", transport=FakeSMTP
+    )
+    logging.disable(logging.CRITICAL)
+    return app_module.app, services
+
+
+def build_requests(generator, mix, count):
+    tags = [tag for tag, weight in mix for _ in range(weight)]
+    return [(tags[i % len(tags)], generator.generate(tags[i % len(tags)])) for i in range(count)]
+
+
+def client_caller(app):
+    client = app.test_client()
+
+    def call(body):
+        response = client.post("/webhook", json=body)
+        return response.status_code
+    return call
+
+
+def http_caller(host, port):
+    local = threading.local()
+
+    def call(body):
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection(host, port, timeout=30)
+        payload = json.dumps(body)
+        try:
+            conn.request("POST", "/webhook", payload, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            local.conn = None
+            conn.close()
+            raise
+        return response.status
+    return call
+
+
+def serve(app):
+    from werkzeug.serving import make_server
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(call, requests, concurrency):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+
+    def one(item):
+        tag, body = item
+        start = time.perf_counter()
+        try:
+            ok = call(body) == 200
+        except Exception:
+            ok = False
+        return tag, time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for tag, elapsed, ok in pool.map(one, requests):
+            latencies[tag].append(elapsed)
+            if not ok:
+                errors[tag] += 1
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentile(sorted_values, p):
+    # Nearest-rank percentile.
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def summarise(latencies, errors, wall):
+    results = {}
+    everything = []
+    for tag, values in sorted(latencies.items()):
+        values.sort()
+        everything.extend(values)
+        results[tag] = {
+            "requests": len(values),
+            "errors": errors.get(tag, 0),
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "throughput_rps": len(values) / wall
+        }
+    everything.sort()
+    results["all"] = {
+        "requests": len(everything),
+        "errors": sum(errors.values()),
+        "p50_ms": percentile(everything, 50) * 1000,
+        "p95_ms": percentile(everything, 95) * 1000,
+        "p99_ms": percentile(everything, 99) * 1000,
+        "throughput_rps": len(everything) / wall
+    }
+    return results
+
+
+def report(results):
+    print(f"{'tag':26s} {'requests':>8s} {'errors':>6s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'req/s':>8s}")
+    for tag, row in results.items():
+        print(f"{tag:26s} {row['requests']:8d} {row['errors']:6d} {row['p50_ms']:8.2f} {row['p95_ms']:8.2f} "
+              f"{row['p99_ms']:8.2f} {row['throughput_rps']:8.0f}")
+
+
+def compare(results, baseline, max_regression):
+    regressions = []
+    for tag, row in results.items():
+        before = baseline.get(tag)
+        if before and row["p95_ms"] > before["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{tag}: p95 {before['p95_ms']:.2f} ms -> {row['p95_ms']:.2f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["client", "http"], default="client")
+    parser.add_argument("--url", help="host:port of a running server (http mode only)")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--doctors", type=int, default=10000)
+    parser.add_argument("--hospitals", type=int, default=500)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="tag=weight,... (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache")
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--baseline", help="compare p95 per tag against saved results")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    if args.url:
+        import data
+        generator = PayloadGenerator(data.DOCTORS, data.HOSPITALS, seed=args.seed)
+        host, _, port = args.url.rpartition(":")
+        call = http_caller(host or "127.0.0.1", int(port))
+    else:
+        app, services = prepare_app(args)
+        generator = PayloadGenerator(services.DOCTORS, services.HOSPITALS, seed=args.seed)
+        if args.mode == "http":
+            server = serve(app)
+            call = http_caller("127.0.0.1", server.server_port)
+        else:
+            call = client_caller(app)
+
+    run(call, build_requests(generator, mix, args.warmup), args.concurrency)
+    latencies, errors, wall = run(call, build_requests(generator, mix, args.requests), args.concurrency)
+    results = summarise(latencies, errors, wall)
+
+    print(f"mode {args.mode}, {args.requests} requests, concurrency {args.concurrency}, {wall:.2f}s")
+    report(results)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+import html
+from dataclasses import dataclass
+from string import Formatter
+
+# --- Confirmation message templates ---
+# Templates are compiled once at import. Fields in HTML templates are
+# HTML-escaped, which matters for user-supplied values such as names and policy
+# numbers.
+
+
+@dataclass
+class Booking:
+    booking_id: str
+    first_name: str
+    email: str
+    mobile: str
+    doctor_name: str
+    specialty: str
+    qualifications: str
+    gmc_number: str
+    practising_since: object
+    hospital_name: str
+    hospital_address: str
+    hospital_city: str
+    hospital_postcode: str
+    hospital_phone: str
+    formatted_date_time: str
+    base_fee: float
+    total_bill: float
+    insurer: str = None
+    policy_number: str = None
+    authorisation_code: str = None
+    discount_label: str = "No discount"
+
+
+class CompiledTemplate:
+    # The template is turned into a single generated function that joins literal
+    # chunks with formatted (and, for HTML, escaped) booking attributes, so a
+    # render does no parsing and no per-field interpretation.
+    def __init__(self, source, escape=None):
+        self.source = source
+        pieces = []
+        for literal, field, spec, conversion in Formatter().parse(source):
+            if literal:
+                pieces.append(repr(literal))
+            if field is not None:
+                if conversion or not field.isidentifier():
+                    raise ValueError(f"Unsupported template field: {field!r}")
+                value = f"format(b.{field}, {spec!r})" if spec else f"str(b.{field})"
+                pieces.append(f"escape({value})" if escape else value)
+        code = f"def render(b):\n    return ''.join(({', '.join(pieces)},))\n"
+        namespace = {"escape": escape}
+        exec(compile(code, f"<template {len(source)} chars>", "exec"), namespace)
+        self.render = namespace["render"]
+
+
+CONFIRMATION_TEXT = (
+    "Booking Confirmed!\n\n"
+    "Doctor: {doctor_name}\n"
+    "Specialty: {specialty}\n"
+    "Location: {hospital_name}\n"
+    "Address: {hospital_address}\n"
+    "Phone: {hospital_phone}\n"
+    "Date & Time: {formatted_date_time}\n"
+)
+CONFIRMATION_TEXT_INSURANCE = (
+    "Insurer: {insurer}\n"
+    "Policy Number: {policy_number}\n"
+    "Authorisation Code: {authorisation_code}\n"
+)
+CONFIRMATION_TEXT_FOOTER = (
+    "Total Bill: £{total_bill:.2f}\n"
+    "\nA confirmation has been sent to your email ✉️ ({email}) and WhatsApp 📞 ({mobile}).\n"
+)
+
+CONFIRMATION_HTML = """
+        <html>
+        <head>
+            <style>
+                body {{
+                    font-family: Arial, sans-serif;
+                    color: #222;
+                    background-color: #f7f7f7;
+                    margin: 0;
+                    padding: 0;
+                }}
+                .container {{
+                    background: #fff;
+                    margin: 30px auto;
+                    padding: 24px;
+                    border-radius: 10px;
+                    max-width: 600px;
+                    box-shadow: 0 2px 12px rgba(0,0,0,0.08);
+                }}
+                .header {{
+                    background-color: #1d7cab;
+                    color: #fff;
+                    padding: 16px;
+                    border-radius: 10px 10px 0 0;
+                    text-align: center;
+                }}
+                .section-title {{
+                    margin-top: 24px;
+                    font-size: 18px;
+                    color: #1d7cab;
+                    border-bottom: 1px solid #eee;
+                }}
+                .info-list {{
+                    list-style: none;
+                    padding: 0;
+                    margin: 0;
+                }}
+                .info-list li {{
+                    margin-bottom: 10px;
+                    font-size: 16px;
+                }}
+                .footer {{
+                    margin-top: 32px;
+                    font-size: 15px;
+                    color: #666;
+                    text-align: center;
+                }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h2>✅ Your Consultation is Confirmed!</h2>
+                </div>
+                <p>Dear {first_name},</p>
+                <p>
+                    Thank you for booking your consultation. Here are your appointment details:
+                </p>
+                <div class="section-title">Doctor Details</div>
+                <ul class="info-list">
+                    <li><strong>Name:</strong> {doctor_name}</li>
+                    <li><strong>Specialty:</strong> {specialty}</li>
+                    <li><strong>Qualifications:</strong> {qualifications}</li>
+                    <li><strong>GMC Number:</strong> {gmc_number}</li>
+                    <li><strong>Practising Since:</strong> {practising_since}</li>
+                </ul>
+                <div class="section-title">Hospital Details</div>
+                <ul class="info-list">
+                    <li><strong>Hospital:</strong> {hospital_name}</li>
+                    <li><strong>Address:</strong> {hospital_address}</li>
+                    <li><strong>City:</strong> {hospital_city}</li>
+                    <li><strong>Postcode:</strong> {hospital_postcode}</li>
+                    <li><strong>Phone:</strong> {hospital_phone}</li>
+                </ul>
+                <div class="section-title">Appointment Details</div>
+                <ul class="info-list">
+                    <li><strong>Date & Time:</strong> {formatted_date_time}</li>
+                    <li><strong>Consultation Fee:</strong> £{base_fee:.2f}</li>
+                </ul>
+        """
+
+CONFIRMATION_HTML_INSURANCE = """
+                <div class="section-title">Insurance Details</div>
+                <ul class="info-list">
+                    <li><strong>Provider:</strong> {insurer}</li>
+                    <li><strong>Policy Number:</strong> {policy_number}</li>
+                    <li><strong>Discount Applied:</strong> {discount_label}</li>
+                </ul>
+            """
+
+CONFIRMATION_HTML_FOOTER = """
+                <div class="section-title">Total Bill</div>
+                <ul class="info-list">
+                    <li><strong>Total Amount Due:</strong> £{total_bill:.2f}</li>
+                </ul>
+                <div class="section-title">Contact Details</div>
+                <ul class="info-list">
+                    <li><strong>Email:</strong> {email}</li>
+                    <li><strong>Phone:</strong> {mobile}</li>
+                </ul>
+                <div class="footer">
+                    <p>If you have any questions, please contact us at <a href="mailto:info@yourclinic.com">info@yourclinic.com</a> or call {hospital_phone}.</p>
+                    <p>We look forward to seeing you!</p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+
+REMINDER_TEXT = (
+    "Appointment Reminder\n\n"
+    "Hi {first_name}, this is a reminder of your consultation with {doctor_name}.\n\n"
+    "Date & Time: {formatted_date_time}\n"
+    "Location: {hospital_name}\n"
+    "Address: {hospital_address}, {hospital_postcode}\n"
+    "\nIf you need to change your appointment, please call {hospital_phone}.\n"
+)
+
+REMINDER_HTML = """
+        <html>
+        <body style="font-family: Arial, sans-serif; color: #222;">
+            <h2>Appointment Reminder</h2>
+            <p>Hi {first_name}, this is a reminder of your consultation with <strong>{doctor_name}</strong>.</p>
+            <ul>
+                <li><strong>Date & Time:</strong> {formatted_date_time}</li>
+                <li><strong>Location:</strong> {hospital_name}</li>
+                <li><strong>Address:</strong> {hospital_address}, {hospital_postcode}</li>
+            </ul>
+            <p>If you need to change your appointment, please call {hospital_phone}.</p>
+        </body>
+        </html>
+        """
+
+_text = CompiledTemplate(CONFIRMATION_TEXT)
+_text_insurance = CompiledTemplate(CONFIRMATION_TEXT_INSURANCE)
+_text_footer = CompiledTemplate(CONFIRMATION_TEXT_FOOTER)
+_html = CompiledTemplate(CONFIRMATION_HTML, escape=html.escape)
+_html_insurance = CompiledTemplate(CONFIRMATION_HTML_INSURANCE, escape=html.escape)
+_html_footer = CompiledTemplate(CONFIRMATION_HTML_FOOTER, escape=html.escape)
+_reminder_text = CompiledTemplate(REMINDER_TEXT)
+_reminder_html = CompiledTemplate(REMINDER_HTML, escape=html.escape)
+
+
+def render_confirmation_text(booking):
+    text = _text.render(booking)
+    if booking.insurer:
+        text += _text_insurance.render(booking)
+    return text + _text_footer.render(booking)
+
+
+def render_confirmation_html(booking):
+    body = _html.render(booking)
+    if booking.insurer:
+        body += _html_insurance.render(booking)
+    return body + _html_footer.render(booking)
+
+
+# WhatsApp and the chat reply currently share the plain-text confirmation.
+render_whatsapp_message = render_confirmation_text
+render_chat_reply = render_confirmation_text
+
+
+def render_reminder_text(booking):
+    return _reminder_text.render(booking)
+
+
+def render_reminder_html(booking):
+    return _reminder_html.render(booking)
@@ -0,0 +1,137 @@
+# --- Dummy Doctor and Hospital Data ---
+DOCTORS = {
+    "Mr Md Zaker Ullah": {
+        "specialty": "General Surgery, Breast Surgery",
+        "qualifications": "FRCS, MBBS, FRCSEd",
+        "gmcNumber": "4368515",
+        "practisingSince": 1987,
+        "locations": ["The Holly Hospital"],
+        "fees": {"Initial consultation": 300},
+        "available_dates": {
+            "The Holly Hospital": [
+                {"date": "2025-09-29", "times": ["15:45"]},
+                {"date": "2025-09-30", "times": ["10:15", "10:45", "11:00"]},
+                {"date": "2025-10-01", "times": ["14:45", "15:15", "15:30"]},
+            ]
+        },
+        "services": ['Breast Cancer Diagnosis', 'Cosmetic Breast Surgery', 'Hernia Repair']
+    },
+    "Miss Tasha Gandamihardja": {
+        "specialty": "General Surgery, Breast Surgery",
+        "qualifications": "MBBS, FRACS, Grad Dip Clin Epi, FRCPSG",
+        "gmcNumber": "1234567",
+        "practisingSince": 2008,
+        "locations": ["Nuffield Health Brentwood Hospital", "The Holly Hospital"],
+        "fees": {"Initial consultation": 300},
+        "available_dates": {
+            "Nuffield Health Brentwood Hospital": [
+                {"date": "2025-09-29", "times": ["16:30", "16:45"]},
+                {"date": "2025-09-30", "times": ["16:30", "16:45"]},
+            ],
+            "The Holly Hospital": [
+                {"date": "2025-09-29", "times": ["17:00", "18:30"]},
+                {"date": "2025-09-30", "times": ["17:00", "18:30"]},
+            ]
+        },
+        "services": ['Breast Reconstruction', 'Breast Cancer Surgery', 'Oncoplastic Surgery']
+    },
+    "Dr. Alice Smith": {
+        "specialty": "Cardiology",
+        "qualifications": "MD, FACC",
+        "gmcNumber": "7890123",
+        "practisingSince": 2001,
+        "locations": ["Nuffield Health Brentwood Hospital"],
+        "fees": {"Initial consultation": 350},
+        "available_dates": {
+            "Nuffield Health Brentwood Hospital": [
+                {"date": "2025-09-29", "times": ["10:00", "10:30", "11:00"]},
+                {"date": "2025-10-02", "times": ["10:00", "10:30", "11:00"]},
+            ]
+        },
+        "services": ['Heart Health Consultation', 'Echocardiograms', 'Blood Pressure Monitoring']
+    },
+    "Dr. Ben Carter": {
+        "specialty": "Neurology",
+        "qualifications": "MD, PhD, FRCP",
+        "gmcNumber": "8901234",
+        "practisingSince": 2012,
+        "locations": ["The Holly Hospital"],
+        "fees": {"Initial consultation": 320},
+        "available_dates": {
+            "The Holly Hospital": [
+                {"date": "2025-09-30", "times": ["14:00", "14:30"]},
+                {"date": "2025-10-03", "times": ["14:00", "14:30"]},
+            ]
+        },
+        "services": ['Stroke Prevention', 'Headache Management', 'Epilepsy Treatment']
+    },
+    "Dr. Emily Davis": {
+        "specialty": "Dermatology",
+        "qualifications": "MBBS, MRCP",
+        "gmcNumber": "9012345",
+        "practisingSince": 2010,
+        "locations": ["Nuffield Health Brentwood Hospital", "The Holly Hospital"],
+        "fees": {"Initial consultation": 280},
+        "available_dates": {
+            "Nuffield Health Brentwood Hospital": [
+                {"date": "2025-09-29", "times": ["09:00", "09:30", "10:00"]},
+                {"date": "2025-09-30", "times": ["09:00", "09:30", "10:00"]},
+                {"date": "2025-10-01", "times": ["09:00", "09:30"]},
+            ],
+            "The Holly Hospital": [
+                {"date": "2025-10-02", "times": ["13:00", "13:30", "14:00"]},
+                {"date": "2025-10-03", "times": ["13:00", "13:30", "14:00"]},
+            ]
+        },
+        "services": ['Acne Treatment', 'Mole Checks', 'Skin Cancer Screening']
+    },
+    "Dr. Frank Green": {
+        "specialty": "Orthopaedic Surgery",
+        "qualifications": "MD, FACS",
+        "gmcNumber": "1234567",
+        "practisingSince": 2005,
+        "locations": ["The Holly Hospital"],
+        "fees": {"Initial consultation": 400},
+        "available_dates": {
+            "The Holly Hospital": [
+                {"date": "2025-09-29", "times": ["11:00", "11:30", "12:00"]},
+                {"date": "2025-09-30", "times": ["11:00", "11:30", "12:00"]},
+                {"date": "2025-10-02", "times": ["11:00", "11:30"]},
+            ]
+        },
+        "services": ['Knee Arthroscopy', 'Hip Replacement', 'Sports Injuries']
+    },
+    "Dr Iffat Azim": {
+        "specialty": "General Practice",
+        "qualifications": "MBBS, MPH",
+        "gmcNumber": "5166467",
+        "practisingSince": 1991,
+        "locations": ["The Holly Hospital", "Nuffield Health Brentwood Hospital"],
+        "fees": {"Initial consultation": 250},
+        "available_dates": {
+            "The Holly Hospital": [
+                {"date": "2025-09-29", "times": ["09:00", "09:30"]},
+                {"date": "2025-09-30", "times": ["10:00", "10:30"]},
+            ],
+            "Nuffield Health Brentwood Hospital": [
+                {"date": "2025-09-29", "times": ["14:00", "14:30"]},
+                {"date": "2025-09-30", "times": ["15:00", "15:30"]},
+            ]
+        },
+        "services": ['General Health Check-up', 'Preventative Medicine', 'Chronic Disease Management']
+    }
+}
+HOSPITALS = {
+    "The Holly Hospital": {
+        "city": "London",
+        "postcode": "IG9 5HX",
+        "address": "High Road, Buckhurst Hill, Essex",
+        "phone": "020 8505 3311"
+    },
+    "Nuffield Health Brentwood Hospital": {
+        "city": "Brentwood",
+        "postcode": "CM15 8EH",
+        "address": "Shenfield Road, Brentwood",
+        "phone": "01277 695695"
+    }
+}
@@ -0,0 +1,218 @@
+import threading
+
+# --- Precomputed doctor search index ---
+# Built once from DOCTORS/HOSPITALS and updated per doctor or hospital, so a
+# doctor-list query no longer lowercases every specialty, city and postcode.
+# Matching follows the original get_doctor_list scan exactly: specialty and city
+# are case-insensitive substring matches, postcode is a case-insensitive exact
+# match (combined with city when both are given, and replaced by the combined
+# city-or-postcode test when location is given), and results keep DOCTORS order.
+
+
+# The prepared structures, as saved and restored by the startup snapshot.
+INDEX_FIELDS = (
+    "_order", "_next_order", "_doctor_specialty", "_doctor_locations", "_by_specialty",
+    "_hospital_doctors", "_hospital_keys", "_by_city", "_by_postcode"
+)
+
+
+class DoctorIndex:
+    def __init__(self, doctors, hospitals, memo_size=1024, state=None):
+        self.doctors = doctors
+        self.hospitals = hospitals
+        self.memo_size = memo_size
+        self._lock = threading.RLock()
+        if state is None:
+            self.rebuild()
+        else:
+            self.restore(state)
+
+    def rebuild(self):
+        with self._lock:
+            self._order = {}
+            self._next_order = 0
+            self._doctor_specialty = {}
+            self._doctor_locations = {}
+            self._by_specialty = {}
+            self._hospital_doctors = {}
+            self._hospital_keys = {}
+            self._by_city = {}
+            self._by_postcode = {}
+            self._memo = {}
+            for name in self.hospitals:
+                self._index_hospital(name)
+            for name in self.doctors:
+                self._index_doctor(name)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: getattr(self, name) for name in INDEX_FIELDS}
+
+    def restore(self, state):
+        with self._lock:
+            for name in INDEX_FIELDS:
+                setattr(self, name, state[name])
+            self._memo = {}
+
+    # Specialty strings and city names repeat heavily across a catalogue, so
+    # substring queries scan the distinct values only and are memoised.
+    def _remember(self, key, value):
+        if len(self._memo) >= self.memo_size:
+            self._memo.pop(next(iter(self._memo)))
+        self._memo[key] = value
+        return value
+
+    def _index_doctor(self, name):
+        details = self.doctors[name]
+        if name not in self._order:
+            self._order[name] = self._next_order
+            self._next_order += 1
+        specialty = details.get("specialty", "").lower()
+        self._doctor_specialty[name] = specialty
+        self._by_specialty.setdefault(specialty, set()).add(name)
+        locations = list(details.get("locations", []))
+        self._doctor_locations[name] = locations
+        for loc in locations:
+            self._hospital_doctors.setdefault(loc, set()).add(name)
+
+    def _unindex_doctor(self, name):
+        specialty = self._doctor_specialty.pop(name, None)
+        if specialty is not None:
+            doctors = self._by_specialty.get(specialty)
+            doctors.discard(name)
+            if not doctors:
+                del self._by_specialty[specialty]
+        for loc in self._doctor_locations.pop(name, []):
+            doctors = self._hospital_doctors.get(loc)
+            if doctors is not None:
+                doctors.discard(name)
+
+    def _index_hospital(self, name):
+        hospital = self.hospitals[name]
+        city = hospital.get("city", "").lower()
+        postcode = hospital.get("postcode", "").lower()
+        self._hospital_keys[name] = (city, postcode)
+        self._by_city.setdefault(city, set()).add(name)
+        self._by_postcode.setdefault(postcode, set()).add(name)
+
+    def _unindex_hospital(self, name):
+        keys = self._hospital_keys.pop(name, None)
+        if keys is None:
+            return
+        city, postcode = keys
+        for index, key in ((self._by_city, city), (self._by_postcode, postcode)):
+            hospitals = index.get(key)
+            hospitals.discard(name)
+            if not hospitals:
+                del index[key]
+
+    def update_doctor(self, name):
+        with self._lock:
+            self._unindex_doctor(name)
+            if name in self.doctors:
+                self._index_doctor(name)
+            else:
+                self._order.pop(name, None)
+            self._memo.clear()
+
+    def update_hospital(self, name):
+        with self._lock:
+            self._unindex_hospital(name)
+            if name in self.hospitals:
+                self._index_hospital(name)
+            self._memo.clear()
+
+    def _specialty_doctors(self, specialty):
+        key = ("specialty", specialty)
+        if key in self._memo:
+            return self._memo[key]
+        matches = set()
+        for value, doctors in self._by_specialty.items():
+            if specialty in value:
+                matches |= doctors
+        return self._remember(key, frozenset(matches))
+
+    def _city_hospitals(self, city):
+        key = ("city", city)
+        if key in self._memo:
+            return self._memo[key]
+        matches = set()
+        for value, hospitals in self._by_city.items():
+            if city in value:
+                matches |= hospitals
+        return self._remember(key, frozenset(matches))
+
+    def _matching_hospitals(self, city, postcode, location):
+        if location:
+            location = location.lower()
+            return self._city_hospitals(location) | self._by_postcode.get(location, set())
+        hospitals = None
+        if city:
+            hospitals = self._city_hospitals(city.lower())
+        if postcode:
+            by_postcode = frozenset(self._by_postcode.get(postcode.lower(), ()))
+            hospitals = by_postcode if hospitals is None else hospitals & by_postcode
+        return hospitals
+
+    def hospitals_in(self, city):
+        with self._lock:
+            return self._city_hospitals(city.lower())
+
+    def search(self, specialty=None, city=None, postcode=None, location=None):
+        # Returns [(doctor_name, matching_locations)] in DOCTORS order.
+        return list(self.iter_search(specialty, city, postcode, location))
+
+    def iter_search(self, specialty=None, city=None, postcode=None, location=None, start=0):
+        # Lazy form of search: candidates are chosen and ordered up front, but
+        # each doctor's matching locations are only built as results are taken.
+        # The first `start` results are skipped without building them.
+        with self._lock:
+            hospitals = self._matching_hospitals(city, postcode, location)
+            if hospitals is None:
+                candidates = self._specialty_doctors(specialty.lower()) if specialty else self._order.keys()
+            else:
+                candidates = set()
+                for hospital in hospitals:
+                    candidates |= self._hospital_doctors.get(hospital, set())
+                if specialty:
+                    candidates &= self._specialty_doctors(specialty.lower())
+            ordered = sorted(candidates, key=self._order.__getitem__)
+            doctor_locations = self._doctor_locations
+        for name in ordered:
+            locations = doctor_locations.get(name)
+            if not locations:
+                continue
+            if start:
+                if hospitals is None or any(loc in hospitals for loc in locations):
+                    start -= 1
+                continue
+            if hospitals is not None:
+                locations = [loc for loc in locations if loc in hospitals]
+            if locations:
+                yield name, locations
+
+    def nearby(self, specialty, distances):
+        # distances: {hospital: km} as returned by HospitalLocator.near. Returns
+        # [(doctor_name, locations)] ranked by each doctor's nearest matching
+        # site, with locations nearest first.
+        return list(self.iter_nearby(specialty, distances))
+
+    def iter_nearby(self, specialty, distances, start=0):
+        # A doctor is yielded once every site nearer than its own nearest one
+        # has been passed, so taking the first page only walks the closest sites.
+        # The first `start` results are skipped without sorting their locations.
+        with self._lock:
+            specialists = self._specialty_doctors(specialty.lower()) if specialty else None
+        seen = set()
+        for hospital in distances:
+            with self._lock:
+                doctors = self._hospital_doctors.get(hospital, frozenset())
+                doctors = doctors & specialists if specialists is not None else set(doctors)
+                doctors = sorted(doctors - seen, key=self._order.__getitem__)
+                doctor_locations = [self._doctor_locations[name] for name in doctors]
+            for name, locations in zip(doctors, doctor_locations):
+                seen.add(name)
+                if start:
+                    start -= 1
+                    continue
+                yield name, sorted((loc for loc in locations if loc in distances), key=distances.__getitem__)
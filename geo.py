@@ -0,0 +1,135 @@
+import csv
+import math
+import os
+import re
+import threading
+
+# --- Postcode geocoding and hospital proximity search ---
+# Postcodes are placed with an offline table of approximate centroids
+# (postcode_districts.csv: outward codes such as "IG9" and whole areas such as
+# "IG"). A full postcode that is not in the table falls back to its outward code
+# and then its area, so "IG9 5HY" lands on the IG9 centroid. Hospitals sit in a
+# fixed-size latitude/longitude grid, so a radius query only measures the sites
+# in the handful of cells that overlap the search circle. Within a search radius
+# of a few dozen miles the equirectangular approximation is well inside the
+# accuracy of a district centroid, so distances use it rather than great circles.
+
+POSTCODE_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "postcode_districts.csv")
+KM_PER_DEGREE = 111.195
+KM_PER_MILE = 1.609344
+
+_POSTCODE = re.compile(r"^([A-Z]{1,2})(\d[A-Z\d]?)\s*(\d[A-Z]{2})?$")
+
+
+def parse_postcode(text):
+    # (area, outward, full) for a UK postcode or outward code, else None.
+    match = _POSTCODE.match(" ".join(str(text).upper().split()))
+    if match is None:
+        return None
+    area, district, inward = match.groups()
+    outward = area + district
+    return area, outward, f"{outward} {inward}" if inward else None
+
+
+class PostcodeLookup:
+    def __init__(self, path=POSTCODE_TABLE_PATH):
+        self.coordinates = {}
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                self.coordinates[row["code"].upper()] = (float(row["latitude"]), float(row["longitude"]))
+
+    def locate(self, text):
+        parsed = parse_postcode(text) if text else None
+        if parsed is None:
+            return None
+        area, outward, full = parsed
+        for code in (full, outward, area):
+            if code is not None and code in self.coordinates:
+                return self.coordinates[code]
+        return None
+
+
+class GeoGrid:
+    def __init__(self, cell_degrees=0.1):
+        self.cell_degrees = cell_degrees
+        self._cells = {}
+        self._points = {}
+        self._lock = threading.Lock()
+
+    def _cell(self, lat, lon):
+        return int(math.floor(lat / self.cell_degrees)), int(math.floor(lon / self.cell_degrees))
+
+    def put(self, key, lat, lon):
+        with self._lock:
+            self._remove(key)
+            cell = self._cell(lat, lon)
+            self._points[key] = (lat, lon, cell)
+            self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        point = self._points.pop(key, None)
+        if point is not None:
+            keys = self._cells[point[2]]
+            keys.discard(key)
+            if not keys:
+                del self._cells[point[2]]
+
+    def within(self, lat, lon, radius_km):
+        # [(distance_km, key)] for every point inside the radius, nearest first.
+        scale = max(math.cos(math.radians(lat)), 0.01)
+        dlat = radius_km / KM_PER_DEGREE
+        dlon = dlat / scale
+        lat_lo, lon_lo = self._cell(lat - dlat, lon - dlon)
+        lat_hi, lon_hi = self._cell(lat + dlat, lon + dlon)
+        limit = dlat * dlat
+        cells = self._cells
+        points = self._points
+        found = []
+        with self._lock:
+            for i in range(lat_lo, lat_hi + 1):
+                for j in range(lon_lo, lon_hi + 1):
+                    for key in cells.get((i, j), ()):
+                        plat, plon, _ = points[key]
+                        y = plat - lat
+                        x = (plon - lon) * scale
+                        d2 = x * x + y * y
+                        if d2 <= limit:
+                            found.append((math.sqrt(d2) * KM_PER_DEGREE, key))
+        found.sort()
+        return found
+
+
+class HospitalLocator:
+    # Keeps a GeoGrid of HOSPITALS in step with the catalogue. A hospital is
+    # placed by explicit "latitude"/"longitude" fields when it has them,
+    # otherwise by its postcode.
+    def __init__(self, hospitals, postcodes, cell_degrees=0.1):
+        self.hospitals = hospitals
+        self.postcodes = postcodes
+        self.grid = GeoGrid(cell_degrees)
+        for name in list(hospitals):
+            self.update_hospital(name)
+
+    def position(self, details):
+        if details.get("latitude") is not None and details.get("longitude") is not None:
+            return float(details["latitude"]), float(details["longitude"])
+        return self.postcodes.locate(details.get("postcode"))
+
+    def update_hospital(self, name):
+        details = self.hospitals.get(name)
+        point = self.position(details) if details else None
+        if point is None:
+            self.grid.remove(name)
+        else:
+            self.grid.put(name, *point)
+
+    def near(self, place, radius_km):
+        # {hospital: distance_km} nearest first, or None if place is not a postcode we can place.
+        point = self.postcodes.locate(place)
+        if point is None:
+            return None
+        return {name: distance for distance, name in self.grid.within(point[0], point[1], radius_km)}
@@ -0,0 +1,25 @@
+import multiprocessing
+import os
+
+# --- Production launcher ---
+# gunicorn -c gunicorn.conf.py
+#
+# Runs the ASGI app under uvicorn workers. Each worker is a separate process with
+# its own catalogue copy and outbox threads; slot reservations and the outbox are
+# shared between them through SQLite. Set WEBHOOK_APP=main:app with
+# WORKER_CLASS=gthread to serve the Flask app instead.
+
+wsgi_app = os.environ.get("WEBHOOK_APP", "asgi:app")
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get("WORKER_CLASS", "uvicorn_worker.UvicornWorker")
+# Only the gthread worker uses a thread pool; uvicorn workers run one event loop
+# and hand blocking handlers to asyncio's default executor instead.
+if worker_class == "gthread":
+    threads = int(os.environ.get("WORKER_THREADS", 4))
+timeout = int(os.environ.get("WORKER_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then to bound memory growth.
+max_requests = int(os.environ.get("MAX_REQUESTS", 10000))
+max_requests_jitter = max_requests // 10
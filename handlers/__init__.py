@@ -0,0 +1,13 @@
+from handlers.models import WebhookRequest, WebhookResponse
+from handlers.registry import HANDLERS, dispatch, dispatch_async, handler, handler_timings
+
+# Importing the handler modules registers their tags.
+from handlers import (  # noqa: E402,F401
+    doctor_details,
+    doctor_list,
+    final_confirmation,
+    hold_slot,
+    upload_reports
+)
+
+__all__ = ["HANDLERS", "WebhookRequest", "WebhookResponse", "dispatch", "dispatch_async", "handler", "handler_timings"]
@@ -0,0 +1,17 @@
+from handlers.models import WebhookResponse
+from services import availability
+
+
+def slot_unavailable_response(doctor_name, dt_obj):
+    chips_options = []
+    for loc, slot_dt in availability.next_free(doctor_name, 4, after=dt_obj):
+        chips_options.append({
+            "text": f"{slot_dt.strftime('%a, %d %b')} {slot_dt.strftime('%H:%M')}",
+            "value": f"Book appointment with {doctor_name} on {slot_dt.date()} at {slot_dt.strftime('%H:%M')}"
+        })
+    response = WebhookResponse.text(
+        f"Sorry, {dt_obj.strftime('%A, %d %B %Y at %I:%M %p')} with {doctor_name} is no longer available. Please choose another time."
+    )
+    if chips_options:
+        response.add_chips(chips_options)
+    return response
@@ -0,0 +1,69 @@
+import logging
+
+from handlers.models import WebhookRequest, WebhookResponse
+from handlers.registry import handler
+from services import DOCTORS, availability, catalogue, find_doctor_key, response_cache
+
+
+def render_doctor_details(match):
+    doctor_details = DOCTORS[match]
+    locations_and_details_text = []
+    for loc_name in doctor_details.get("locations", []):
+        hospital_info = catalogue.get_hospital(loc_name) or {}
+        location_text = (
+            f"🏥 {loc_name}\n"
+            f"      📍 Address: {hospital_info.get('address', 'N/A')}, {hospital_info.get('postcode', 'N/A')}\n"
+            f"      📞 Phone: {hospital_info.get('phone', 'N/A')}"
+        )
+        locations_and_details_text.append(location_text)
+    services_text = ", ".join(doctor_details.get("services", []))
+    schedule_text = []
+    chips_options = []
+    for loc, days in availability.schedule(match):
+        schedule_text.append(f"🏥 {loc}")
+        for day, slot_times in days:
+            date_str = day.strftime("%a, %d %b")
+            schedule_text.append(f"      📅 {date_str}: {', '.join(slot_times) or 'No appointments'}")
+            for t in slot_times:
+                chips_options.append({
+                    "text": f"{date_str} {t}",
+                    "value": f"Book appointment with {match} on {day} at {t}"
+                })
+    detail_text = (
+        f"Here are the details for {match}:\n\n"
+        f"🩺 Specialty: {doctor_details.get('specialty')}\n"
+        f"🎓 Qualifications: {doctor_details.get('qualifications')}\n"
+        f"Practising Since: {doctor_details.get('practisingSince')}\n"
+        f"Initial Consultation Fee: £{doctor_details['fees'].get('Initial consultation')}\n\n"
+        f"🏥 Locations:\n" + "\n".join(locations_and_details_text) + "\n\n"
+        f"Services: {services_text}\n"
+        f"📅 Available Dates & Times:\n" + "\n".join(schedule_text)
+    )
+    return WebhookResponse.text(detail_text).add_chips(
+        chips_options[:8],
+        [{"text": "Go Back", "value": "Go back to doctor list"}]
+    )
+
+
+@handler("get_doctor_details", blocking=True)
+def get_doctor_details(request: WebhookRequest) -> WebhookResponse:
+    doctor_name = request.params.get("doctor_name")
+    if not doctor_name:
+        doctor_name = request.text
+        if doctor_name.lower().startswith("view "):
+            doctor_name = doctor_name[5:]
+        doctor_name = doctor_name.strip()
+    logging.info(f"Doctor name received: '{doctor_name}'")
+    match = find_doctor_key(doctor_name)
+    if not match:
+        logging.error(f"Doctor not found for input: '{doctor_name}'")
+        return WebhookResponse.text("Sorry, I couldn't find details for that doctor.")
+    cache_key = ("get_doctor_details", match)
+    response = response_cache.get(cache_key)
+    if response is None:
+        response = response_cache.put(
+            cache_key,
+            render_doctor_details(match),
+            depends_on=[("doctor", match), ("hospitals", None)]
+        )
+    return response
@@ -0,0 +1,111 @@
+import os
+import zlib
+from itertools import islice
+
+from geo import parse_postcode
+from handlers.models import WebhookRequest, WebhookResponse
+from handlers.registry import handler
+from metrics import DOCTOR_SEARCH_LATENCY
+from services import DOCTORS, find_doctors, response_cache
+
+# Results are produced lazily and only one page is rendered per response. The
+# position in the list is kept in the session as "<search>:<offset>", where
+# <search> fingerprints the search parameters, so a changed search starts again
+# from the top and a "Show more" turn picks up where the last page ended.
+
+DOCTOR_LIST_PAGE_SIZE = int(os.environ.get("DOCTOR_LIST_PAGE_SIZE", 5))
+CURSOR_PARAMETER = "doctor_list_cursor"
+SHOW_MORE_CHIP = {"text": "Show more", "value": "Show more doctors"}
+
+
+def clean_parameter(value, postcode=False):
+    # Trimmed, with empty values as None; postcodes (and locations that parse as
+    # one) in canonical "IG9 5HX" form so spacing and case variants search alike.
+    value = " ".join(str(value).split()) if value is not None else ""
+    if not value:
+        return None
+    parsed = parse_postcode(value) if postcode else None
+    if parsed is None:
+        return value
+    _, outward, full = parsed
+    return full or outward
+
+
+def search_key(specialty, city, postcode, location):
+    # Matching is case-insensitive, so searches differing only in case share
+    # a cursor and a cached page.
+    return tuple(value.casefold() if value else None for value in (specialty, city, postcode, location))
+
+
+def search_fingerprint(specialty, city, postcode, location):
+    return f"{zlib.crc32(repr(search_key(specialty, city, postcode, location)).encode()):08x}"
+
+
+def cursor_offset(cursor, fingerprint):
+    search, _, offset = str(cursor or "").partition(":")
+    if search != fingerprint or not offset.isdigit():
+        return 0
+    return int(offset)
+
+
+def render_doctor_list(specialty, city, postcode, location, offset=0, page_size=DOCTOR_LIST_PAGE_SIZE):
+    with DOCTOR_SEARCH_LATENCY.time():
+        matches, distances = find_doctors(specialty, city, postcode, location, start=offset)
+        # One extra result tells us whether there is another page.
+        page = list(islice(matches, page_size + 1))
+    has_more = len(page) > page_size
+    page = page[:page_size]
+    if page:
+        if offset:
+            doctor_text_lines = ["Here are more doctors who match your search. Which one would you like to know more about?"]
+        elif distances is None:
+            doctor_text_lines = ["Here are some of our doctors who match your search. Which one would you like to know more about?"]
+        else:
+            doctor_text_lines = [f"Here are our nearest doctors to {location or postcode}. Which one would you like to know more about?"]
+        chips_options = []
+        for i, (doctor_name, matching_locations) in enumerate(page, offset + 1):
+            if distances is None:
+                locations = ', '.join(matching_locations)
+            else:
+                locations = ', '.join(f"{loc} ({distances[loc]:.1f} miles)" for loc in matching_locations)
+            text_line = (
+                f"\n{i}. {doctor_name}\n"
+                f"      Specialty: {DOCTORS[doctor_name]['specialty']}\n"
+                f"      Locations: {locations}"
+            )
+            doctor_text_lines.append(text_line)
+            chips_options.append({
+                "text": f"View {doctor_name}",
+                "value": doctor_name
+            })
+        if has_more:
+            cursor = f"{search_fingerprint(specialty, city, postcode, location)}:{offset + page_size}"
+            response = WebhookResponse.text(*doctor_text_lines, session_parameters={CURSOR_PARAMETER: cursor})
+            return response.add_chips(chips_options, [SHOW_MORE_CHIP])
+        return WebhookResponse.text(*doctor_text_lines, session_parameters={CURSOR_PARAMETER: None}).add_chips(chips_options)
+    elif offset:
+        return WebhookResponse.text(
+            "That's everyone who matches your search.", session_parameters={CURSOR_PARAMETER: None}
+        )
+    else:
+        response_text = f"Sorry, no {specialty} doctors found in {location or city or postcode}."
+        return WebhookResponse.text(response_text, session_parameters={CURSOR_PARAMETER: None})
+
+
+@handler("get_doctor_list")
+def get_doctor_list(request: WebhookRequest) -> WebhookResponse:
+    params = request.params
+    city = clean_parameter(params.get("city"))
+    postcode = clean_parameter(params.get("postcode"), postcode=True)
+    location = clean_parameter(params.get("location"), postcode=True)
+    specialty = clean_parameter(params.get("specialty"))
+    offset = cursor_offset(params.get(CURSOR_PARAMETER), search_fingerprint(specialty, city, postcode, location))
+    cache_key = ("get_doctor_list", *search_key(specialty, city, postcode, location), offset)
+    response = response_cache.get(cache_key)
+    if response is None:
+        response = response_cache.put(
+            cache_key,
+            render_doctor_list(specialty, city, postcode, location, offset),
+            depends_on=[("doctors", None), ("hospitals", None)]
+        )
+    return response
@@ -0,0 +1,181 @@
+import logging
+import time
+
+from availability import to_minute
+from confirmation_templates import (
+    Booking,
+    render_chat_reply,
+    render_confirmation_html,
+    render_confirmation_text,
+    render_reminder_html,
+    render_reminder_text,
+    render_whatsapp_message
+)
+from handlers.common import slot_unavailable_response
+from handlers.models import WebhookRequest, WebhookResponse
+from handlers.registry import handler
+from idempotency import ABANDONED, PENDING, fingerprint
+from services import (
+    CLINIC_TIMEZONE,
+    IDEMPOTENCY_RETRY_WAIT_SECONDS,
+    REMINDER_LEAD_HOURS,
+    catalogue,
+    find_doctor_key,
+    get_pricing_engine,
+    idempotency,
+    outbox,
+    parse_appointment_datetime,
+    reminders,
+    reservations,
+    slot_hospital
+)
+
+# Parameters that make two confirmation requests the same booking.
+BOOKING_PARAMETERS = (
+    "person_name",
+    "email",
+    "phone_number",
+    "appointment_datetime",
+    "hospital",
+    "insurance_provider",
+    "insurance_plan",
+    "policy_number",
+    "authorisation_code"
+)
+
+
+@handler("send_final_confirmation", blocking=True)
+def send_final_confirmation(request: WebhookRequest) -> WebhookResponse:
+    params = request.params
+    match = find_doctor_key(params.get("doctor_name") or "")
+    if not match:
+        return WebhookResponse.text("Doctor not found.")
+
+    key = fingerprint(request.session, match, [params.get(name) for name in BOOKING_PARAMETERS])
+    state, cached = idempotency.begin(key)
+    if state == PENDING:
+        # The first attempt is still running; give it a moment to finish.
+        state, cached = idempotency.wait(key, IDEMPOTENCY_RETRY_WAIT_SECONDS)
+        if state == ABANDONED:
+            # It gave up without booking (e.g. the slot was taken), so this
+            # retry runs afresh.
+            state, cached = idempotency.begin(key)
+        if state == PENDING:
+            return WebhookResponse.text("We're still confirming your booking. One moment, please.")
+    if cached is not None:
+        logging.info(f"Replaying stored confirmation for retried booking request {key[:12]}")
+        return WebhookResponse.from_dict(cached)
+
+    try:
+        response, booking_id = confirm_booking(request, match, booking_id=key[:32])
+    except Exception:
+        idempotency.abandon(key)
+        raise
+    if booking_id is None:
+        idempotency.abandon(key)
+    else:
+        idempotency.complete(key, response.to_dict())
+    return response
+
+
+def confirm_booking(request, match, booking_id):
+    # Returns (response, booking_id), with booking_id None if nothing was booked.
+    params = request.params
+    name = params.get("person_name", {})
+    first_name = name.get("name") if isinstance(name, dict) else name
+    mobile = params.get("phone_number")
+    email = params.get("email")
+    appointment_datetime = params.get("appointment_datetime")
+    insurer = params.get("insurance_provider")
+    policy_number = params.get("policy_number")
+    authorisation_code = params.get("authorisation_code")
+
+    doctor = catalogue.get_doctor(match)
+    session_id = request.session
+    location_name = doctor["locations"][0]
+    formatted_date_time = "your selected date and time"
+    dt_obj = parse_appointment_datetime(appointment_datetime)
+    if dt_obj:
+        slot = to_minute(dt_obj)
+        booked = reservations.booking(booking_id)
+        if booked is not None and booked[0] == match and booked[2] == slot:
+            # An earlier attempt of this request already booked it.
+            location_name = booked[1]
+        else:
+            location_name = slot_hospital(match, slot, session_id, params.get("hospital"))
+            if not location_name or not reservations.confirm(match, location_name, slot, session_id, booking_id):
+                return slot_unavailable_response(match, dt_obj), None
+        formatted_date_time = dt_obj.strftime("%A, %d %B %Y at %I:%M %p")
+    hospital_info = catalogue.get_hospital(location_name) or {}
+
+    base_fee = doctor['fees'].get('Initial consultation', 0)
+    quote = get_pricing_engine().quote(base_fee, insurer if isinstance(insurer, str) else None, params.get("insurance_plan"))
+
+    booking = Booking(
+        booking_id=booking_id,
+        first_name=first_name,
+        email=email,
+        mobile=mobile,
+        doctor_name=match,
+        specialty=doctor['specialty'],
+        qualifications=doctor['qualifications'],
+        gmc_number=doctor['gmcNumber'],
+        practising_since=doctor['practisingSince'],
+        hospital_name=location_name,
+        hospital_address=hospital_info.get('address', 'N/A'),
+        hospital_city=hospital_info.get('city', 'N/A'),
+        hospital_postcode=hospital_info.get('postcode', 'N/A'),
+        hospital_phone=hospital_info.get('phone', 'N/A'),
+        formatted_date_time=formatted_date_time,
+        base_fee=base_fee,
+        total_bill=quote.total,
+        insurer=insurer,
+        policy_number=policy_number,
+        authorisation_code=authorisation_code,
+        discount_label=quote.label
+    )
+
+    notifications = []
+    if email:
+        notifications.append(("email", {
+            "to_email": email,
+            "subject": "✅ Consultation Confirmed",
+            "plain_body": render_confirmation_text(booking),
+            "html_body": render_confirmation_html(booking)
+        }))
+    if mobile:
+        notifications.append(("whatsapp", {"to_number": mobile, "body": render_whatsapp_message(booking)}))
+    try:
+        outbox.enqueue_many(booking_id, notifications, dedupe=True)
+    except Exception as e:
+        logging.error(f"Failed to queue notifications for booking {booking_id}: {e}")
+    if dt_obj:
+        try:
+            schedule_reminders(booking, dt_obj)
+        except Exception as e:
+            logging.error(f"Failed to schedule reminders for booking {booking_id}: {e}")
+
+    return WebhookResponse.text(render_chat_reply(booking), session_parameters={"booking_id": booking_id}), booking_id
+
+
+def schedule_reminders(booking, appointment):
+    # One reminder per configured lead time that is still in the future.
+    now = time.time()
+    if appointment.tzinfo is None:
+        appointment = appointment.replace(tzinfo=CLINIC_TIMEZONE)
+    send_times = [appointment.timestamp() - hours * 3600 for hours in REMINDER_LEAD_HOURS]
+    send_times = [send_at for send_at in send_times if send_at > now]
+    if not send_times:
+        return
+    items = []
+    if booking.email:
+        items.append(("email", {
+            "to_email": booking.email,
+            "subject": "⏰ Appointment Reminder",
+            "plain_body": render_reminder_text(booking),
+            "html_body": render_reminder_html(booking)
+        }))
+    if booking.mobile:
+        items.append(("whatsapp", {"to_number": booking.mobile, "body": render_reminder_text(booking)}))
+    for send_at in send_times:
+        reminders.schedule(booking.booking_id, items, send_at)
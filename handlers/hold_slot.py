@@ -0,0 +1,23 @@
+from availability import to_minute
+from handlers.common import slot_unavailable_response
+from handlers.models import WebhookRequest, WebhookResponse
+from handlers.registry import handler
+from services import SLOT_HOLD_SECONDS, find_doctor_key, parse_appointment_datetime, reservations, slot_hospital
+
+
+@handler("hold_appointment_slot", blocking=True)
+def hold_appointment_slot(request: WebhookRequest) -> WebhookResponse:
+    params = request.params
+    match = find_doctor_key(params.get("doctor_name") or "")
+    dt_obj = parse_appointment_datetime(params.get("appointment_datetime"))
+    if not match or not dt_obj:
+        return WebhookResponse.text("Sorry, I couldn't work out which appointment you'd like.")
+    slot = to_minute(dt_obj)
+    location_name = slot_hospital(match, slot, request.session, params.get("hospital"))
+    if not location_name or not reservations.hold(match, location_name, slot, request.session):
+        return slot_unavailable_response(match, dt_obj)
+    return WebhookResponse.text(
+        f"I've held {dt_obj.strftime('%A, %d %B %Y at %I:%M %p')} with {match} at {location_name} "
+        f"for {int(SLOT_HOLD_SECONDS // 60)} minutes while you complete your booking.",
+        session_parameters={"hospital": location_name}
+    )
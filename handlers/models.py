@@ -0,0 +1,58 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# --- Typed webhook request and response models ---
+# A thin layer over the Dialogflow CX WebhookRequest / WebhookResponse JSON.
+
+
+@dataclass
+class WebhookRequest:
+    tag: Optional[str]
+    params: Dict[str, Any]
+    session: str
+    text: str
+    raw: Dict[str, Any]
+
+    @classmethod
+    def from_json(cls, body):
+        body = body or {}
+        session_info = body.get("sessionInfo", {})
+        return cls(
+            tag=body.get("fulfillmentInfo", {}).get("tag"),
+            params=session_info.get("parameters", {}) or {},
+            session=session_info.get("session", ""),
+            text=body.get("text", "") or body.get("query_result", {}).get("query_text", ""),
+            raw=body
+        )
+
+
+@dataclass
+class WebhookResponse:
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    session_parameters: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def text(cls, *lines, session_parameters=None):
+        return cls([{"text": {"text": list(lines)}}], session_parameters)
+
+    @classmethod
+    def from_dict(cls, body):
+        return cls(
+            list(body.get("fulfillment_response", {}).get("messages", [])),
+            body.get("sessionInfo", {}).get("parameters")
+        )
+
+    def add_text(self, *lines):
+        self.messages.append({"text": {"text": list(lines)}})
+        return self
+
+    def add_chips(self, *groups):
+        # Each group is a list of chip options rendered as its own chips row.
+        self.messages.append({"payload": {"richContent": [[{"type": "chips", "options": options} for options in groups]]}})
+        return self
+
+    def to_dict(self):
+        body = {"fulfillment_response": {"messages": self.messages}}
+        if self.session_parameters:
+            body["sessionInfo"] = {"parameters": self.session_parameters}
+        return body
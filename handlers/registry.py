@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import threading
+import time
+
+from handlers.models import WebhookResponse
+from metrics import WEBHOOK_ERRORS, WEBHOOK_LATENCY, WEBHOOK_REQUESTS
+
+# --- Tag dispatch ---
+# Handlers register under their Dialogflow fulfillment tag and are looked up in
+# a dict, so dispatch cost does not grow with the number of tags. Every call is
+# timed per tag. Handlers registered as blocking (SQLite, Firestore reads) run
+# on a worker thread when dispatched from the ASGI app, so they never stall
+# the event loop; the rest are pure in-memory work and run inline.
+
+HANDLERS = {}
+BLOCKING = set()
+FALLBACK_TAG = "fallback"
+
+_timings = {}
+_timings_lock = threading.Lock()
+
+
+def handler(tag, blocking=False):
+    def register(fn):
+        if tag in HANDLERS:
+            raise ValueError(f"Duplicate webhook handler for tag: {tag}")
+        HANDLERS[tag] = fn
+        if blocking:
+            BLOCKING.add(tag)
+        return fn
+    return register
+
+
+def fallback(request):
+    return WebhookResponse.text("Sorry, I couldn’t process that.")
+
+
+def _record(tag, elapsed):
+    WEBHOOK_REQUESTS.inc(tag)
+    WEBHOOK_LATENCY.observe(elapsed, tag)
+    with _timings_lock:
+        stats = _timings.get(tag)
+        if stats is None:
+            stats = _timings[tag] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed > stats[2]:
+            stats[2] = elapsed
+
+
+def dispatch(request):
+    fn = HANDLERS.get(request.tag)
+    tag = request.tag if fn is not None else FALLBACK_TAG
+    fn = fn or fallback
+    start = time.perf_counter()
+    try:
+        return fn(request)
+    except Exception:
+        WEBHOOK_ERRORS.inc(tag)
+        logging.exception(f"Webhook handler for tag {tag} failed")
+        raise
+    finally:
+        _record(tag, time.perf_counter() - start)
+
+
+async def dispatch_async(request):
+    fn = HANDLERS.get(request.tag)
+    tag = request.tag if fn is not None else FALLBACK_TAG
+    fn = fn or fallback
+    start = time.perf_counter()
+    try:
+        if tag in BLOCKING:
+            return await asyncio.to_thread(fn, request)
+        return fn(request)
+    except Exception:
+        WEBHOOK_ERRORS.inc(tag)
+        logging.exception(f"Webhook handler for tag {tag} failed")
+        raise
+    finally:
+        _record(tag, time.perf_counter() - start)
+
+
+def handler_timings():
+    with _timings_lock:
+        return {
+            tag: {
+                "count": count,
+                "total_ms": total * 1000,
+                "mean_ms": total / count * 1000,
+                "max_ms": worst * 1000
+            }
+            for tag, (count, total, worst) in _timings.items()
+        }
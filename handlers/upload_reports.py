@@ -0,0 +1,13 @@
+from handlers.models import WebhookRequest, WebhookResponse
+from handlers.registry import handler
+from services import uploads
+
+
+@handler("prompt_upload_reports", blocking=True)
+def prompt_upload_reports(request: WebhookRequest) -> WebhookResponse:
+    # The token in the session parameters is what the chat front end sends to
+    # the upload and report routes; it only grants access to this conversation.
+    response = WebhookResponse()
+    if request.session:
+        response.session_parameters = {"upload_token": uploads.issue_token(request.session)}
+    return response.add_chips([{"text": "Upload Reports"}])
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import time
+
+from sqlite_store import Database
+
+# --- Idempotent webhook responses ---
+# Dialogflow retries a webhook call that times out, so a slow booking can arrive
+# two or three times. The first call for a key claims it with a short lease and
+# stores its response when done; retries within the TTL get that response back
+# instead of running the handler again. A claim whose lease runs out (the worker
+# died mid-request) can be taken over by the next retry.
+
+NEW = "new"
+PENDING = "pending"
+DONE = "done"
+ABANDONED = "abandoned"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotent_responses (
+    key TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    response TEXT,
+    lease_expires_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_idempotent_responses_expiry ON idempotent_responses (expires_at);
+"""
+
+
+def fingerprint(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self, path, ttl=86400.0, lease=30.0, purge_interval=60.0):
+        self.path = path
+        self.ttl = ttl
+        self.lease = lease
+        self.purge_interval = purge_interval
+        self.db = Database(path, SCHEMA)
+        self._last_purge = 0.0
+
+    def begin(self, key):
+        # Returns (NEW, None) if the caller now owns the key, (DONE, response) for
+        # a finished request, or (PENDING, None) while another call is running.
+        now = time.time()
+        if now - self._last_purge > self.purge_interval:
+            self._last_purge = now
+            self.purge_expired()
+        with self.db.transaction() as conn:
+            row = conn.execute(
+                "SELECT state, response, lease_expires_at, expires_at FROM idempotent_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[3] > now:
+                if row[0] == DONE:
+                    return DONE, json.loads(row[1])
+                if row[2] > now:
+                    return PENDING, None
+            conn.execute(
+                "INSERT OR REPLACE INTO idempotent_responses (key, state, response, lease_expires_at, expires_at) "
+                "VALUES (?, ?, NULL, ?, ?)",
+                (key, PENDING, now + self.lease, now + self.ttl)
+            )
+        return NEW, None
+
+    def complete(self, key, response):
+        now = time.time()
+        self.db.connect().execute(
+            "UPDATE idempotent_responses SET state = ?, response = ?, expires_at = ? WHERE key = ?",
+            (DONE, json.dumps(response), now + self.ttl, key)
+        )
+
+    def abandon(self, key):
+        # Drops a claim without a stored response, so the next retry runs afresh.
+        self.db.connect().execute(
+            "DELETE FROM idempotent_responses WHERE key = ? AND state = ?", (key, PENDING)
+        )
+
+    def wait(self, key, timeout, interval=0.05):
+        # Polls for the outcome of a call that is still running elsewhere: (DONE,
+        # response) once it finishes, (ABANDONED, None) if it dropped its claim
+        # without a response, or (PENDING, None) if it is still running at the
+        # timeout.
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(interval)
+            row = self.db.connect().execute(
+                "SELECT state, response FROM idempotent_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return ABANDONED, None
+            if row[0] == DONE:
+                return DONE, json.loads(row[1])
+        return PENDING, None
+
+    def purge_expired(self):
+        return self.db.connect().execute(
+            "DELETE FROM idempotent_responses WHERE expires_at <= ?", (time.time(),)
+        ).rowcount
@@ -0,0 +1,114 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+
+# --- Non-blocking, PII-safe logging ---
+# Request threads only put records on an in-memory queue; a QueueListener thread
+# formats and writes them. Webhook parameter logging is sampled, and known PII
+# parameters are redacted before they are logged, with a pattern-based scrub of
+# emails and phone numbers as a backstop for free-text messages.
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+REDACTED = "[REDACTED]"
+
+PII_PARAMETERS = {
+    "person_name",
+    "phone_number",
+    "email",
+    "policy_number",
+    "authorisation_code",
+    "patient_summary",
+    "doctor_summary",
+    "date_of_birth",
+    "address"
+}
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+# Phone-shaped tokens only: +country code, a 0 trunk prefix or a bracketed area
+# code, or 3-3-4 digits with separators. Digit groups may be split by spaces,
+# dots or dashes. Other digit runs (key prefixes, booking ids) are left alone.
+_PHONE = re.compile(
+    r"(?<![\w+])(?:"
+    r"\+\d{1,3}(?:[ .-]?\(0\))?(?:[ .-]?\d){6,12}"
+    r"|\(0?\d{2,4}\)[ .-]?\d(?:[ .-]?\d){5,7}"
+    r"|0\d(?:[ .-]?\d){8,9}"
+    r"|\d{3}[ .-]\d{3}[ .-]\d{4}"
+    r")(?!\w)"
+)
+
+webhook_logger = logging.getLogger("webhook")
+
+_listener = None
+
+
+def redact_params(params, fields=PII_PARAMETERS):
+    return {k: (REDACTED if k in fields and v not in (None, "") else v) for k, v in params.items()}
+
+
+def mask_phone_number(number):
+    # For log lines that name a recipient: enough to tell numbers apart, not
+    # enough to identify the patient. Call sites mask; scrub is only a backstop.
+    digits = "".join(ch for ch in str(number) if ch.isdigit())
+    return f"***{digits[-3:]}"
+
+
+def scrub(text):
+    return _PHONE.sub(REDACTED, _EMAIL.sub(REDACTED, text))
+
+
+class ScrubFilter(logging.Filter):
+    # Runs on the listener thread, after QueueHandler has merged msg and args.
+    def filter(self, record):
+        record.msg = scrub(record.getMessage())
+        record.args = None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    # Keeps a fraction of records below WARNING; warnings and errors always pass.
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+def configure_logging(level=None, sample_rate=None, stream=None):
+    global _listener
+    if _listener is not None:
+        return _listener
+    level = level or os.environ.get("LOG_LEVEL", "INFO")
+    if sample_rate is None:
+        sample_rate = float(os.environ.get("WEBHOOK_LOG_SAMPLE_RATE", 0.1))
+
+    output = logging.StreamHandler(stream)
+    output.setFormatter(logging.Formatter(LOG_FORMAT))
+    output.addFilter(ScrubFilter())
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level)
+    webhook_logger.filters = [SamplingFilter(sample_rate)]
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def log_webhook_call(tag, params):
+    if webhook_logger.isEnabledFor(logging.INFO):
+        webhook_logger.info("Webhook called. Tag: %s, Params: %s", tag, redact_params(params))
@@ -0,0 +1,158 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from metrics import SMTP_SEND_LATENCY
+
+# --- Pooled SMTP sessions ---
+# Authenticated SMTP sessions are kept open and reused across messages instead of
+# paying for a TCP connect, STARTTLS and AUTH on every email. smtplib (and ssl
+# with it) is imported on first use rather than at process start.
+
+
+def build_message(sender, to_email, subject, plain_body, html_body):
+    msg = MIMEMultipart('alternative')
+    msg['From'] = sender
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(plain_body, 'plain'))
+    msg.attach(MIMEText(html_body, 'html'))
+    return msg
+
+
+class SMTPConnectionPool:
+    def __init__(self, host, port, username=None, password=None, starttls=True, size=2,
+                 max_idle=120.0, noop_after=15.0, timeout=30.0, transport=None):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.max_idle = max_idle
+        self.noop_after = noop_after
+        self.timeout = timeout
+        self.transport = transport
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def _open(self):
+        if self.transport is None:
+            import smtplib
+            self.transport = smtplib.SMTP
+        server = self.transport(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.username and self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            self._discard(server)
+            raise
+        logging.info(f"Opened SMTP session to {self.host}:{self.port}")
+        return server
+
+    def _discard(self, server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _healthy(self, server, last_used):
+        idle_for = time.monotonic() - last_used
+        if idle_for > self.max_idle:
+            return False
+        if idle_for < self.noop_after:
+            return True
+        try:
+            return server.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _acquire(self):
+        while True:
+            try:
+                server, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+            if self._healthy(server, last_used):
+                return server
+            self._discard(server)
+
+    @contextmanager
+    def connection(self):
+        if self._closed:
+            raise RuntimeError("SMTP pool is closed")
+        self._slots.acquire()
+        server = None
+        try:
+            server = self._acquire()
+            yield server
+        except Exception:
+            if server is not None:
+                self._discard(server)
+                server = None
+            raise
+        finally:
+            if server is not None:
+                if self._closed:
+                    self._discard(server)
+                else:
+                    self._idle.put((server, time.monotonic()))
+            self._slots.release()
+
+    def send_message(self, msg):
+        return self.send_messages([msg])[0]
+
+    def send_messages(self, messages):
+        # Sends a batch over a single session and returns one success flag per
+        # message. A message the server rejects (refused recipient, 5xx on DATA)
+        # is marked failed and the batch carries on. A dropped session is
+        # reopened once and the remaining messages are retried on the fresh
+        # connection; if that drops too they are reported as not sent.
+        import smtplib
+        results = [False] * len(messages)
+        pending = list(range(len(messages)))
+        for attempt in range(2):
+            try:
+                with self.connection() as server:
+                    while pending:
+                        i = pending[0]
+                        start = time.perf_counter()
+                        try:
+                            server.send_message(messages[i])
+                            results[i] = True
+                            SMTP_SEND_LATENCY.observe(time.perf_counter() - start, "sent")
+                        except smtplib.SMTPRecipientsRefused as e:
+                            SMTP_SEND_LATENCY.observe(time.perf_counter() - start, "refused")
+                            logging.error(f"SMTP recipient refused: {e}")
+                        except smtplib.SMTPResponseException as e:
+                            SMTP_SEND_LATENCY.observe(time.perf_counter() - start, "rejected")
+                            logging.error(f"SMTP rejected message: {e.smtp_code} {e.smtp_error!r}")
+                        except Exception:
+                            SMTP_SEND_LATENCY.observe(time.perf_counter() - start, "failed")
+                            raise
+                        pending.pop(0)
+                return results
+            except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError) as e:
+                if attempt:
+                    logging.error(f"SMTP session dropped again, {len(pending)} messages not sent: {e}")
+                    break
+                logging.warning(f"SMTP session dropped, reconnecting: {e}")
+        return results
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(server)
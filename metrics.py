@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# --- Prometheus-style metrics ---
+# Counters and histograms kept in process memory and rendered in the Prometheus
+# text exposition format by the /metrics route. Recording is a dict lookup, a
+# bisect and a few additions under an uncontended lock, so it is cheap enough
+# for the hot path. Each gunicorn worker keeps its own values, and a scrape
+# reaches whichever worker accepts it, so every series carries a worker="<pid>"
+# label: each worker's counters then only ever go up, and queries aggregate
+# across workers, e.g. sum without (worker) (rate(webhook_requests_total[5m])).
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self, const=()):
+        # const: (name, value) label pairs put in front of every series.
+        with self._lock:
+            values = dict(self._values)
+        names = tuple(name for name, _ in const) + self.label_names
+        prefix = tuple(value for _, value in const)
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(names, prefix + labels)} {value}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, description, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, then count and sum.
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0, 0.0]
+            series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def timed(self, *labels):
+        def decorate(fn):
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - start, *labels)
+            wrapper.__name__ = fn.__name__
+            wrapper.__wrapped__ = fn
+            return wrapper
+        return decorate
+
+    def samples(self, const=()):
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        names = tuple(name for name, _ in const) + self.label_names
+        prefix = tuple(value for _, value in const)
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(names + ('le',), prefix + labels + (bound,))} {cumulative}"
+            yield f"{self.name}_count{_labels(names, prefix + labels)} {values[-2]}"
+            yield f"{self.name}_sum{_labels(names, prefix + labels)} {values[-1]}"
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, description, labels=()):
+        return self.register(Counter(name, description, labels))
+
+    def histogram(self, name, description, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, description, labels, buckets))
+
+    def render(self):
+        # The pid is read per scrape, not at import, so workers forked from a
+        # preloaded app still report their own.
+        const = (("worker", os.getpid()),)
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples(const))
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry = Registry()
+
+WEBHOOK_REQUESTS = registry.counter(
+    "webhook_requests_total", "Webhook calls by fulfillment tag.", labels=("tag",))
+WEBHOOK_ERRORS = registry.counter(
+    "webhook_errors_total", "Webhook calls whose handler raised, by fulfillment tag.", labels=("tag",))
+WEBHOOK_LATENCY = registry.histogram(
+    "webhook_handler_duration_seconds", "Time spent in the webhook handler, by fulfillment tag.", labels=("tag",))
+FIND_DOCTOR_LATENCY = registry.histogram(
+    "find_doctor_key_duration_seconds", "Time to resolve a spoken doctor name to a catalogue key.")
+DOCTOR_SEARCH_LATENCY = registry.histogram(
+    "doctor_search_duration_seconds", "Time to scan the doctor index for a doctor-list search.")
+SMTP_SEND_LATENCY = registry.histogram(
+    "smtp_send_duration_seconds", "Time for one SMTP send on a pooled session, by outcome.", labels=("outcome",))
+TWILIO_SEND_LATENCY = registry.histogram(
+    "twilio_send_duration_seconds", "Time for one Twilio WhatsApp send, excluding rate-limit waits, by outcome.", labels=("outcome",))
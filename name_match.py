@@ -0,0 +1,129 @@
+import heapq
+import re
+import threading
+from collections import OrderedDict
+from difflib import SequenceMatcher
+
+# --- Doctor name resolution ---
+# Names are normalised once when the roster is loaded. Lookups try an exact hit,
+# then a normalised exact hit, and only then fall back to fuzzy scoring over a
+# shortlist drawn from a trigram index rather than the whole roster.
+
+TITLES = {"dr", "mr", "mrs", "ms", "miss", "mx", "prof", "professor", "sir", "dame"}
+_PUNCTUATION = re.compile(r"[^\w\s'-]")
+
+
+def normalize_name(name):
+    words = _PUNCTUATION.sub(" ", name.lower()).split()
+    while words and words[0] in TITLES:
+        words.pop(0)
+    return " ".join(words)
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# The prepared lookup tables, as saved and restored by the startup snapshot.
+RESOLVER_FIELDS = ("_exact", "_normalized", "_forms", "_grams")
+
+
+class NameResolver:
+    def __init__(self, doctors, cutoff=0.7, shortlist_size=25, cache_size=2048, state=None):
+        self.doctors = doctors
+        self.cutoff = cutoff
+        self.shortlist_size = shortlist_size
+        self.cache_size = cache_size
+        self._lock = threading.RLock()
+        if state is None:
+            self.rebuild()
+        else:
+            self.restore(state)
+
+    def rebuild(self):
+        with self._lock:
+            self._exact = {}
+            self._normalized = {}
+            self._forms = {}
+            self._grams = {}
+            self._cache = OrderedDict()
+            for name in self.doctors:
+                self._add(name)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: getattr(self, name) for name in RESOLVER_FIELDS}
+
+    def restore(self, state):
+        with self._lock:
+            for name in RESOLVER_FIELDS:
+                setattr(self, name, state[name])
+            self._cache = OrderedDict()
+
+    def _add(self, name):
+        lowered = name.strip().lower()
+        normalized = normalize_name(name)
+        self._forms[name] = (lowered, normalized)
+        self._exact.setdefault(lowered, name)
+        self._normalized.setdefault(normalized, name)
+        for gram in trigrams(normalized):
+            self._grams.setdefault(gram, set()).add(name)
+
+    def _remove(self, name):
+        forms = self._forms.pop(name, None)
+        if forms is None:
+            return
+        lowered, normalized = forms
+        for position, index, key in ((0, self._exact, lowered), (1, self._normalized, normalized)):
+            if index.get(key) == name:
+                del index[key]
+                # Another doctor may share this form; let it take over the slot.
+                for other, other_forms in self._forms.items():
+                    if other_forms[position] == key:
+                        index[key] = other
+                        break
+        for gram in trigrams(normalized):
+            names = self._grams.get(gram)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._grams[gram]
+
+    def update_doctor(self, name):
+        with self._lock:
+            self._remove(name)
+            if name in self.doctors:
+                self._add(name)
+            self._cache.clear()
+
+    def _fuzzy(self, normalized):
+        # Scores title-stripped forms only, like the original close-match lookup,
+        # so a shared title cannot lift a surname-only input over the cutoff.
+        counts = {}
+        for gram in trigrams(normalized):
+            for name in self._grams.get(gram, ()):
+                counts[name] = counts.get(name, 0) + 1
+        shortlist = heapq.nlargest(self.shortlist_size, counts, key=counts.__getitem__)
+        best, best_score = None, 0.0
+        for name in shortlist:
+            score = SequenceMatcher(None, normalized, self._forms[name][1]).ratio()
+            if score >= self.cutoff and score > best_score:
+                best, best_score = name, score
+        return best
+
+    def resolve(self, user_input):
+        lowered = user_input.strip().lower()
+        with self._lock:
+            if lowered in self._cache:
+                self._cache.move_to_end(lowered)
+                return self._cache[lowered]
+            match = self._exact.get(lowered)
+            if match is None:
+                normalized = normalize_name(user_input)
+                if normalized:
+                    match = self._normalized.get(normalized) or self._fuzzy(normalized)
+            self._cache[lowered] = match
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return match
@@ -0,0 +1,198 @@
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+
+from sqlite_store import Database
+
+# --- Durable notification outbox ---
+# Notifications are written to a local SQLite table and delivered by a pool of
+# background worker threads, so the webhook never waits on SMTP or Twilio.
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    booking_id TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_notifications_due ON notifications (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_notifications_booking ON notifications (booking_id);
+"""
+
+
+class Outbox:
+    def __init__(self, path, handlers, workers=2, max_attempts=5, base_backoff=2.0,
+                 max_backoff=300.0, poll_interval=1.0, stale_after=600.0):
+        self.path = path
+        self.handlers = handlers
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.db = Database(path, SCHEMA, row_factory=sqlite3.Row)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._last_requeue = 0.0
+
+    def enqueue(self, booking_id, channel, payload):
+        return self.enqueue_many(booking_id, [(channel, payload)])[0]
+
+    def enqueue_many(self, booking_id, items, dedupe=False):
+        # With dedupe, channels that already have a notification for this booking
+        # are skipped (their ids are not returned), so a retried request cannot
+        # queue the same confirmation twice.
+        if not items:
+            return []
+        for channel, _ in items:
+            if channel not in self.handlers:
+                raise ValueError(f"Unknown notification channel: {channel}")
+        now = time.time()
+        ids = []
+        with self.db.transaction() as conn:
+            if dedupe:
+                queued = {row[0] for row in conn.execute(
+                    "SELECT channel FROM notifications WHERE booking_id = ?", (booking_id,)
+                )}
+                items = [(channel, payload) for channel, payload in items if channel not in queued]
+            for channel, payload in items:
+                cur = conn.execute(
+                    "INSERT INTO notifications (booking_id, channel, payload, status, attempts, next_attempt_at, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, 0, ?, ?, ?)",
+                    (booking_id, channel, json.dumps(payload), PENDING, now, now, now)
+                )
+                ids.append(cur.lastrowid)
+        if ids:
+            self.start()
+            self._wake.set()
+        return ids
+
+    def status(self, booking_id):
+        rows = self.db.connect().execute(
+            "SELECT id, channel, status, attempts, last_error, created_at, updated_at "
+            "FROM notifications WHERE booking_id = ? ORDER BY id",
+            (booking_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def pending(self):
+        # Notifications still to be delivered, including claims a crashed process
+        # left in "sending".
+        return self.db.connect().execute(
+            "SELECT COUNT(*) FROM notifications WHERE status IN (?, ?)", (PENDING, SENDING)
+        ).fetchone()[0]
+
+    def start(self):
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            self._requeue_stale()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"outbox-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def drain(self):
+        # Deliver everything that is currently due on the calling thread.
+        while self._process_one():
+            pass
+
+    def _requeue_stale(self):
+        # Rows left in "sending" by a crashed process are handed back to the queue.
+        # Runs on start and then from idle workers, so claims that were not yet
+        # stale when this process started are picked up once they are.
+        now = time.time()
+        self._last_requeue = now
+        self.db.connect().execute(
+            "UPDATE notifications SET status = ?, updated_at = ? WHERE status = ? AND updated_at < ?",
+            (PENDING, now, SENDING, now - self.stale_after)
+        )
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self._process_one():
+                    continue
+                if time.time() - self._last_requeue > self.stale_after / 2:
+                    self._requeue_stale()
+            except Exception as e:
+                logging.error(f"Outbox worker error: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _claim(self):
+        now = time.time()
+        with self.db.transaction() as conn:
+            row = conn.execute(
+                "SELECT id, booking_id, channel, payload, attempts FROM notifications "
+                "WHERE status = ? AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT 1",
+                (PENDING, now)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE notifications SET status = ?, updated_at = ? WHERE id = ?",
+                    (SENDING, now, row["id"])
+                )
+        return row
+
+    def _process_one(self):
+        row = self._claim()
+        if row is None:
+            return False
+        attempts = row["attempts"] + 1
+        error = None
+        try:
+            result = self.handlers[row["channel"]](**json.loads(row["payload"]))
+            if not result:
+                error = "handler reported failure"
+        except Exception as e:
+            error = str(e)
+        now = time.time()
+        conn = self.db.connect()
+        if error is None:
+            conn.execute(
+                "UPDATE notifications SET status = ?, attempts = ?, last_error = NULL, updated_at = ? WHERE id = ?",
+                (SENT, attempts, now, row["id"])
+            )
+            logging.info(f"Outbox delivered {row['channel']} notification {row['id']} for booking {row['booking_id']}")
+        elif attempts >= self.max_attempts:
+            conn.execute(
+                "UPDATE notifications SET status = ?, attempts = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                (FAILED, attempts, error, now, row["id"])
+            )
+            logging.error(f"Outbox gave up on {row['channel']} notification {row['id']} after {attempts} attempts: {error}")
+        else:
+            delay = min(self.max_backoff, self.base_backoff * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+            conn.execute(
+                "UPDATE notifications SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ?, updated_at = ? WHERE id = ?",
+                (PENDING, attempts, error, now + delay, now, row["id"])
+            )
+            logging.warning(f"Outbox retrying {row['channel']} notification {row['id']} in {delay:.1f}s: {error}")
+        return True
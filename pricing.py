@@ -0,0 +1,121 @@
+import csv
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+# --- Consultation pricing ---
+# Insurer terms live in a rule table (insurer_rules.csv): per insurer, and
+# optionally per plan, a discount fraction, a cap on the discount amount and an
+# excess the patient pays before the discount applies. price() is the single
+# pricing rule. It is written with NumPy operations so the same code prices one
+# booking during a conversation and a whole booking set in one vectorized pass
+# when finance re-prices after a contract change.
+#
+#   insurer,plan,discount,cap,excess
+#   axa health,,0.5,,0
+
+PRICING_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "insurer_rules.csv")
+
+NO_RULE = 0
+
+
+def normalize_insurer(name):
+    return " ".join(str(name).lower().split()) if name else ""
+
+
+def price(fees, discount, cap, excess):
+    # (reduction, total) for scalars or equally shaped arrays; cap is inf when
+    # the insurer sets none.
+    eligible = np.maximum(fees - excess, 0.0)
+    reduction = np.round(np.minimum(eligible * discount, cap), 2)
+    return reduction, np.round(fees - reduction, 2)
+
+
+@dataclass(frozen=True)
+class Quote:
+    base_fee: float
+    reduction: float
+    total: float
+    discount: float
+    cap: float
+    excess: float
+
+    @property
+    def label(self):
+        if not self.reduction:
+            return "No discount"
+        label = f"{self.discount * 100:g}% insurance discount"
+        if self.reduction == self.cap:
+            label += f", capped at £{self.cap:.2f}"
+        if self.excess:
+            label += f", after £{self.excess:.2f} excess"
+        return label
+
+
+class RuleTable:
+    # Rules as parallel arrays; index NO_RULE is the "no insurer terms" row.
+    def __init__(self, rows):
+        self.index = {}
+        discount, cap, excess = [0.0], [np.inf], [0.0]
+        for row in rows:
+            key = (normalize_insurer(row["insurer"]), normalize_insurer(row.get("plan")))
+            self.index[key] = len(discount)
+            discount.append(float(row.get("discount") or 0))
+            cap.append(float(row["cap"]) if row.get("cap") not in (None, "") else np.inf)
+            excess.append(float(row.get("excess") or 0))
+        self.discount = np.array(discount)
+        self.cap = np.array(cap)
+        self.excess = np.array(excess)
+
+    @classmethod
+    def from_csv(cls, path):
+        with open(path, newline="") as f:
+            return cls(list(csv.DictReader(f)))
+
+    def lookup(self, insurer, plan=None):
+        # A plan without its own row falls back to the insurer's general terms.
+        insurer = normalize_insurer(insurer)
+        if not insurer:
+            return NO_RULE
+        plan = normalize_insurer(plan)
+        if plan and (insurer, plan) in self.index:
+            return self.index[(insurer, plan)]
+        return self.index.get((insurer, ""), NO_RULE)
+
+    def lookup_many(self, insurers, plans=None):
+        # Resolves each distinct (insurer, plan) once and scatters the result.
+        if plans is None:
+            plans = [""] * len(insurers)
+        keys = np.array([f"{i or ''}\x00{p or ''}" for i, p in zip(insurers, plans)])
+        unique, inverse = np.unique(keys, return_inverse=True)
+        resolved = np.array([self.lookup(*key.split("\x00")) for key in unique], dtype=np.intp)
+        return resolved[inverse]
+
+
+class PricingEngine:
+    def __init__(self, path=PRICING_RULES_PATH):
+        self.path = path
+        self.rules = RuleTable.from_csv(path)
+
+    def reload(self, path=None):
+        # The table is swapped in one assignment, so quotes in flight use either
+        # the old or the new terms, never a mix.
+        self.path = path or self.path
+        self.rules = RuleTable.from_csv(self.path)
+
+    def quote(self, fee, insurer=None, plan=None):
+        rules = self.rules
+        i = rules.lookup(insurer, plan)
+        reduction, total = price(float(fee), rules.discount[i], rules.cap[i], rules.excess[i])
+        return Quote(float(fee), float(reduction), float(total), float(rules.discount[i]),
+                     float(rules.cap[i]), float(rules.excess[i]))
+
+    def quote_many(self, fees, insurers, plans=None):
+        # Prices a booking set in one pass; returns the rule index, reduction
+        # and total per booking as arrays.
+        rules = self.rules
+        fees = np.asarray(fees, dtype=np.float64)
+        idx = rules.lookup_many(insurers, plans)
+        reduction, total = price(fees, rules.discount[idx], rules.cap[idx], rules.excess[idx])
+        return {"rule": idx, "reduction": reduction, "total": total}
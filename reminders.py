@@ -0,0 +1,260 @@
+import heapq
+import json
+import logging
+import threading
+import time
+
+from sqlite_store import Database
+
+# --- Appointment reminders ---
+# Reminders are stored in SQLite with their send time and indexed in memory by a
+# min-heap of (send_at, id), so the scheduler thread sleeps until the earliest
+# one is due (or until an earlier one is added) instead of polling the table.
+# Due reminders are sent in batches per channel, so a batch of emails shares one
+# pooled SMTP session and WhatsApp messages go through the dispatcher together.
+# The heap only holds times and ids; payloads are read when a batch is due.
+# Every worker process loads the pending reminders into its own heap, so a due
+# batch is first claimed (pending -> sending in one transaction) and each process
+# sends only the rows it claimed.
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    booking_id TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    send_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    updated_at REAL NOT NULL,
+    UNIQUE (booking_id, channel, send_at)
+);
+CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders (status, send_at);
+"""
+
+
+class ReminderScheduler:
+    def __init__(self, path, senders, batch_size=200, batch_window=1.0, max_attempts=3, retry_delay=300.0,
+                 is_active=None, stale_after=600.0):
+        # senders maps a channel to a function taking a list of payloads and
+        # returning one success flag per payload. Reminders due within
+        # batch_window seconds of the one that woke the thread go out with it.
+        # is_active(booking_id) lets a cancelled booking's reminders be dropped
+        # when they come due. Claims older than stale_after (the process died
+        # mid-send) are handed back to the queue on start and every
+        # stale_after / 2 after that.
+        self.path = path
+        self.senders = senders
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.is_active = is_active
+        self.stale_after = stale_after
+        self.db = Database(path, SCHEMA)
+        self._heap = []
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread = None
+        self._last_requeue = 0.0
+
+    def schedule(self, booking_id, items, send_at):
+        # Adds (channel, payload) reminders for one send time. A reminder that is
+        # already stored for the booking, channel and time is left alone, so a
+        # retried confirmation cannot schedule it twice.
+        for channel, _ in items:
+            if channel not in self.senders:
+                raise ValueError(f"Unknown reminder channel: {channel}")
+        now = time.time()
+        added = []
+        with self.db.transaction() as conn:
+            for channel, payload in items:
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO reminders (booking_id, channel, payload, send_at, status, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (booking_id, channel, json.dumps(payload), send_at, PENDING, now)
+                )
+                if cur.rowcount:
+                    added.append((send_at, cur.lastrowid))
+        if added:
+            self.start()
+            self._push(added)
+        return [reminder_id for _, reminder_id in added]
+
+    def _push(self, entries):
+        with self._cond:
+            earliest = self._heap[0][0] if self._heap else None
+            for entry in entries:
+                heapq.heappush(self._heap, entry)
+            # Only an entry that moves the next wake-up earlier needs the thread.
+            if earliest is None or self._heap[0][0] < earliest:
+                self._cond.notify()
+
+    def cancel(self, booking_id):
+        # Heap entries stay behind and are skipped when they come due.
+        return self.db.connect().execute(
+            "UPDATE reminders SET status = ?, updated_at = ? WHERE booking_id = ? AND status = ?",
+            (CANCELLED, time.time(), booking_id, PENDING)
+        ).rowcount
+
+    def pending(self):
+        # Reminders still to go out, including claims a crashed process left behind.
+        return self.db.connect().execute(
+            "SELECT COUNT(*) FROM reminders WHERE status IN (?, ?)", (PENDING, SENDING)
+        ).fetchone()[0]
+
+    def status(self, booking_id):
+        rows = self.db.connect().execute(
+            "SELECT id, channel, send_at, status, attempts, last_error FROM reminders WHERE booking_id = ? ORDER BY send_at, id",
+            (booking_id,)
+        ).fetchall()
+        return [dict(zip(("id", "channel", "send_at", "status", "attempts", "last_error"), row)) for row in rows]
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stop = False
+            self._requeue_stale()
+            self._heap = [tuple(row) for row in self.db.connect().execute(
+                "SELECT send_at, id FROM reminders WHERE status = ?", (PENDING,)
+            )]
+            heapq.heapify(self._heap)
+            self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+            self._thread.start()
+
+    def _requeue_stale(self):
+        # Returns the (send_at, id) entries handed back, for the heap.
+        now = time.time()
+        self._last_requeue = now
+        with self.db.transaction() as conn:
+            rows = conn.execute(
+                "SELECT send_at, id FROM reminders WHERE status = ? AND updated_at < ?",
+                (SENDING, now - self.stale_after)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE reminders SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                [(PENDING, now, row[1], SENDING) for row in rows]
+            )
+        return [tuple(row) for row in rows]
+
+    def stop(self, timeout=5.0):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def drain(self, now=None):
+        # Sends everything due by `now` on the calling thread.
+        due_by = now or time.time()
+        while True:
+            batch = self._pop_due(due_by)
+            if not batch:
+                return
+            self._send_batch(batch, due_by)
+
+    def _pop_due(self, now):
+        with self._cond:
+            batch = []
+            while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+                batch.append(heapq.heappop(self._heap)[1])
+            return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stop:
+                    now = time.time()
+                    # Also wake to requeue claims a crashed worker left behind.
+                    requeue_in = self._last_requeue + self.stale_after / 2 - now
+                    delay = self._heap[0][0] - now if self._heap else requeue_in
+                    if min(delay, requeue_in) <= 0:
+                        break
+                    self._cond.wait(min(delay, requeue_in))
+                if self._stop:
+                    return
+            try:
+                if time.time() - self._last_requeue >= self.stale_after / 2:
+                    requeued = self._requeue_stale()
+                    if requeued:
+                        logging.warning(f"Requeued {len(requeued)} reminders left sending by another worker")
+                        self._push(requeued)
+                due_by = time.time() + self.batch_window
+                batch = self._pop_due(due_by)
+                if batch:
+                    self._send_batch(batch, due_by)
+            except Exception as e:
+                logging.error(f"Reminder scheduler error: {e}")
+
+    def _claim(self, ids, due_by):
+        # Returns the rows this process now owns. Rows another process claimed or
+        # finished are skipped; pending rows whose send time has moved past due_by
+        # (retried elsewhere) are returned separately to go back on the heap.
+        placeholders = ",".join("?" * len(ids))
+        now = time.time()
+        with self.db.transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, booking_id, channel, payload, attempts, send_at FROM reminders "
+                f"WHERE id IN ({placeholders}) AND status = ?",
+                (*ids, PENDING)
+            ).fetchall()
+            claimed = [row for row in rows if row[5] <= due_by]
+            conn.executemany(
+                "UPDATE reminders SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                [(SENDING, now, row[0], PENDING) for row in claimed]
+            )
+        return claimed, [(row[5], row[0]) for row in rows if row[5] > due_by]
+
+    def _send_batch(self, ids, due_by):
+        rows, later = self._claim(ids, due_by)
+        if later:
+            self._push(later)
+        if not rows:
+            return
+        now = time.time()
+        by_channel = {}
+        cancelled = []
+        for row in rows:
+            if self.is_active is not None and not self.is_active(row[1]):
+                cancelled.append(row)
+            else:
+                by_channel.setdefault(row[2], []).append(row)
+
+        # (status, attempts, last_error, send_at, updated_at, id) per reminder.
+        updates = [(CANCELLED, row[4], None, row[5], now, row[0]) for row in cancelled]
+        retries = []
+        for channel, channel_rows in by_channel.items():
+            try:
+                results = self.senders[channel]([json.loads(row[3]) for row in channel_rows])
+                error = "sender reported failure"
+            except Exception as e:
+                results = [False] * len(channel_rows)
+                error = str(e)
+            for row, ok in zip(channel_rows, results):
+                attempts = row[4] + 1
+                if ok:
+                    updates.append((SENT, attempts, None, row[5], now, row[0]))
+                elif attempts >= self.max_attempts:
+                    updates.append((FAILED, attempts, error, row[5], now, row[0]))
+                    logging.error(f"Gave up on {channel} reminder {row[0]} for booking {row[1]}: {error}")
+                else:
+                    updates.append((PENDING, attempts, error, now + self.retry_delay, now, row[0]))
+                    retries.append((now + self.retry_delay, row[0]))
+            sent = sum(1 for ok in results if ok)
+            logging.info(f"Sent {sent}/{len(channel_rows)} {channel} reminders")
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "UPDATE reminders SET status = ?, attempts = ?, last_error = ?, send_at = ?, updated_at = ? WHERE id = ?",
+                updates
+            )
+        if retries:
+            self._push(retries)
@@ -0,0 +1,191 @@
+import copy
+import logging
+import threading
+from collections.abc import Mapping
+
+# --- Doctor and hospital data backends ---
+# The webhook reads doctors and hospitals through a CachedRepository. It holds
+# the whole catalogue in memory, loaded once from a backend (the in-process seed
+# data or Firestore), and applies the backend's change notifications as they
+# arrive, so serving a request never needs a network read. Firestore delivers
+# those on its own watch thread, so the cached tables are copy-on-write: a change
+# builds a new dict and swaps it in under a lock, and readers (including ones
+# iterating the whole table) always see one complete version.
+
+DOCTOR = "doctor"
+HOSPITAL = "hospital"
+
+
+class InMemoryRepository:
+    # Backend over plain dicts; also serves as a local fake of Firestore.
+    def __init__(self, doctors, hospitals):
+        self._data = {DOCTOR: copy.deepcopy(doctors), HOSPITAL: copy.deepcopy(hospitals)}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def load(self, kind):
+        with self._lock:
+            return copy.deepcopy(self._data[kind])
+
+    def get(self, kind, name):
+        with self._lock:
+            return copy.deepcopy(self._data[kind].get(name))
+
+    def put(self, kind, name, details):
+        with self._lock:
+            self._data[kind][name] = copy.deepcopy(details)
+        self._notify(kind, name, details)
+
+    def delete(self, kind, name):
+        with self._lock:
+            self._data[kind].pop(name, None)
+        self._notify(kind, name, None)
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def _notify(self, kind, name, details):
+        for callback in self._listeners:
+            callback(kind, [(name, copy.deepcopy(details))])
+
+
+class FirestoreRepository:
+    # Doctors and hospitals are documents keyed by name in two collections. Set
+    # FIRESTORE_EMULATOR_HOST to run against the Firestore emulator.
+    def __init__(self, client=None, collections=None, project_id=None):
+        if client is None:
+            import firebase_admin
+            from firebase_admin import firestore
+            try:
+                app = firebase_admin.get_app()
+            except ValueError:
+                options = {"projectId": project_id} if project_id else None
+                app = firebase_admin.initialize_app(options=options)
+            client = firestore.client(app)
+        self.client = client
+        self.collections = collections or {DOCTOR: "doctors", HOSPITAL: "hospitals"}
+        self._watches = []
+
+    def load(self, kind):
+        return {doc.id: doc.to_dict() for doc in self.client.collection(self.collections[kind]).stream()}
+
+    def get(self, kind, name):
+        snapshot = self.client.collection(self.collections[kind]).document(name).get()
+        return snapshot.to_dict() if snapshot.exists else None
+
+    def put(self, kind, name, details):
+        self.client.collection(self.collections[kind]).document(name).set(details)
+
+    def delete(self, kind, name):
+        self.client.collection(self.collections[kind]).document(name).delete()
+
+    def subscribe(self, callback):
+        # callback(kind, changes) with [(name, details or None)] per snapshot.
+        for kind, collection in self.collections.items():
+            def on_snapshot(snapshots, changes, read_time, kind=kind):
+                callback(kind, [
+                    (change.document.id, None if change.type.name == "REMOVED" else change.document.to_dict())
+                    for change in changes
+                ])
+            self._watches.append(self.client.collection(collection).on_snapshot(on_snapshot))
+
+    def close(self):
+        for watch in self._watches:
+            watch.unsubscribe()
+        self._watches = []
+
+
+class CatalogueTable(Mapping):
+    # Read-only view of the current version of one cached table. The dict behind
+    # it is never modified; CachedRepository replaces it as a whole.
+    def __init__(self, data):
+        self.data = data
+
+    def __getitem__(self, name):
+        return self.data[name]
+
+    def get(self, name, default=None):
+        return self.data.get(name, default)
+
+    def __contains__(self, name):
+        return name in self.data
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def keys(self):
+        return self.data.keys()
+
+    def items(self):
+        return self.data.items()
+
+    def values(self):
+        return self.data.values()
+
+
+class CachedRepository:
+    def __init__(self, backend):
+        self.backend = backend
+        self.doctors = CatalogueTable(backend.load(DOCTOR))
+        self.hospitals = CatalogueTable(backend.load(HOSPITAL))
+        self._tables = {DOCTOR: self.doctors, HOSPITAL: self.hospitals}
+        self._lock = threading.Lock()
+        self._missing = set()
+        # Called with (kind, name) after a cached entry changes.
+        self.listeners = []
+        backend.subscribe(self._on_change)
+
+    def _on_change(self, kind, changes):
+        table = self._tables[kind]
+        with self._lock:
+            data = table.data
+            changed = []
+            for name, details in changes:
+                self._missing.discard((kind, name))
+                if data.get(name) == details:
+                    continue
+                if not changed:
+                    data = dict(data)
+                if details is None:
+                    data.pop(name, None)
+                else:
+                    data[name] = details
+                changed.append((name, details))
+            table.data = data
+        for name, details in changed:
+            logging.info(f"Catalogue {kind} '{name}' {'removed' if details is None else 'updated'}")
+            for listener in self.listeners:
+                listener(kind, name)
+
+    def _get(self, kind, name):
+        details = self._tables[kind].get(name)
+        if details is None and (kind, name) not in self._missing:
+            # Read-through for entries the change feed has not delivered yet.
+            # Misses are remembered until the feed mentions the name again.
+            details = self.backend.get(kind, name)
+            if details is None:
+                self._missing.add((kind, name))
+            else:
+                self._on_change(kind, [(name, details)])
+        return details
+
+    def get_doctor(self, name):
+        return self._get(DOCTOR, name)
+
+    def get_hospital(self, name):
+        return self._get(HOSPITAL, name)
+
+    def put_doctor(self, name, details):
+        self.backend.put(DOCTOR, name, details)
+
+    def put_hospital(self, name, details):
+        self.backend.put(HOSPITAL, name, details)
+
+    def delete_doctor(self, name):
+        self.backend.delete(DOCTOR, name)
+
+    def delete_hospital(self, name):
+        self.backend.delete(HOSPITAL, name)
@@ -0,0 +1,209 @@
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+from sqlite_store import Database
+
+# --- Slot reservations ---
+# Holds and confirmed bookings live in SQLite so that every worker process sees
+# the same state: a confirmed slot is a row in slot_bookings, whose primary key
+# makes a second booking of the same doctor at the same time fail, whichever
+# hospital it is for. A hold likewise blocks that time at every hospital. Writes
+# run under BEGIN IMMEDIATE and, within a process, under a per-doctor lock.
+# Expired holds are purged every purge_interval seconds as holds are taken.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS slot_holds (
+    doctor TEXT NOT NULL,
+    hospital TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    hold_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (doctor, hospital, slot)
+);
+CREATE INDEX IF NOT EXISTS idx_slot_holds_expiry ON slot_holds (expires_at);
+CREATE TABLE IF NOT EXISTS slot_bookings (
+    doctor TEXT NOT NULL,
+    hospital TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    booking_id TEXT NOT NULL UNIQUE,
+    session_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (doctor, slot)
+);
+-- Databases created when bookings were keyed per hospital get the same rule.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_slot_bookings_doctor_slot ON slot_bookings (doctor, slot);
+"""
+
+
+class SlotReservations:
+    def __init__(self, path, availability, hold_ttl=600.0, purge_interval=60.0):
+        self.path = path
+        self.availability = availability
+        self.hold_ttl = hold_ttl
+        self.purge_interval = purge_interval
+        self.db = Database(path, SCHEMA)
+        self._last_purge = 0.0
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _doctor_lock(self, doctor):
+        with self._locks_lock:
+            lock = self._locks.get(doctor)
+            if lock is None:
+                lock = self._locks[doctor] = threading.Lock()
+            return lock
+
+    def _transaction(self, doctor, work):
+        with self._doctor_lock(doctor), self.db.transaction() as conn:
+            return work(conn)
+
+    def _holder(self, conn, doctor, slot, now):
+        # (hold_id, session_id, expires_at, hospital) of a live hold on the
+        # doctor's time at any hospital.
+        conn.execute("DELETE FROM slot_holds WHERE doctor = ? AND slot = ? AND expires_at <= ?", (doctor, slot, now))
+        return conn.execute(
+            "SELECT hold_id, session_id, expires_at, hospital FROM slot_holds WHERE doctor = ? AND slot = ?",
+            (doctor, slot)
+        ).fetchone()
+
+    def _booked(self, conn, doctor, slot):
+        return conn.execute(
+            "SELECT 1 FROM slot_bookings WHERE doctor = ? AND slot = ?", (doctor, slot)
+        ).fetchone() is not None
+
+    def _maybe_purge(self):
+        now = time.time()
+        if now - self._last_purge > self.purge_interval:
+            self._last_purge = now
+            self.purge_expired()
+
+    def _withdraw(self, doctor, slot):
+        # A booked time is no longer offered at any of the doctor's hospitals.
+        for hospital in self.availability.hospitals_with_slot(doctor, slot):
+            self.availability.remove_slot(doctor, hospital, slot)
+
+    def hold(self, doctor, hospital, slot, session_id, ttl=None):
+        # Returns a hold id, or None if the slot is not free for this session.
+        if not self.availability.has_slot(doctor, hospital, slot):
+            return None
+        self._maybe_purge()
+        expires_at = time.time() + (ttl or self.hold_ttl)
+
+        def work(conn):
+            now = time.time()
+            if self._booked(conn, doctor, slot):
+                return None
+            holder = self._holder(conn, doctor, slot, now)
+            if holder is not None:
+                if holder[1] != session_id:
+                    return None
+                if holder[3] == hospital:
+                    conn.execute(
+                        "UPDATE slot_holds SET expires_at = ? WHERE doctor = ? AND hospital = ? AND slot = ?",
+                        (expires_at, doctor, hospital, slot)
+                    )
+                    return holder[0]
+            # A session holds at most one slot; picking a new time frees the old one.
+            conn.execute("DELETE FROM slot_holds WHERE session_id = ?", (session_id,))
+            hold_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO slot_holds (doctor, hospital, slot, hold_id, session_id, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (doctor, hospital, slot, hold_id, session_id, expires_at)
+            )
+            return hold_id
+
+        return self._transaction(doctor, work)
+
+    def confirm(self, doctor, hospital, slot, session_id, booking_id):
+        # Atomically turns a free (or own-held) slot into a booking.
+        if not self.availability.has_slot(doctor, hospital, slot):
+            return False
+        self._maybe_purge()
+
+        def work(conn):
+            now = time.time()
+            holder = self._holder(conn, doctor, slot, now)
+            if holder is not None and holder[1] != session_id:
+                return False
+            try:
+                conn.execute(
+                    "INSERT INTO slot_bookings (doctor, hospital, slot, booking_id, session_id, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (doctor, hospital, slot, booking_id, session_id, now)
+                )
+            except sqlite3.IntegrityError:
+                # Confirming the same booking again (a retried request) succeeds.
+                existing = conn.execute(
+                    "SELECT booking_id FROM slot_bookings WHERE doctor = ? AND slot = ?", (doctor, slot)
+                ).fetchone()
+                return True if existing and existing[0] == booking_id else None
+            conn.execute("DELETE FROM slot_holds WHERE doctor = ? AND slot = ?", (doctor, slot))
+            return True
+
+        confirmed = self._transaction(doctor, work)
+        if confirmed is None:
+            # Booked by another process; stop offering it from this one too.
+            self._withdraw(doctor, slot)
+            return False
+        if confirmed:
+            self._withdraw(doctor, slot)
+            logging.info(f"Booked {doctor} at {hospital}, slot {slot}, booking {booking_id}")
+        return confirmed
+
+    def release(self, doctor, hospital, slot, session_id):
+        def work(conn):
+            return conn.execute(
+                "DELETE FROM slot_holds WHERE doctor = ? AND hospital = ? AND slot = ? AND session_id = ?",
+                (doctor, hospital, slot, session_id)
+            ).rowcount > 0
+
+        return self._transaction(doctor, work)
+
+    def session_hold(self, session_id):
+        # (doctor, hospital, slot) currently held by the session, if any.
+        return self.db.connect().execute(
+            "SELECT doctor, hospital, slot FROM slot_holds WHERE session_id = ? AND expires_at > ?",
+            (session_id, time.time())
+        ).fetchone()
+
+    def booking(self, booking_id):
+        # (doctor, hospital, slot) of a confirmed booking, if any.
+        return self.db.connect().execute(
+            "SELECT doctor, hospital, slot FROM slot_bookings WHERE booking_id = ?", (booking_id,)
+        ).fetchone()
+
+    def cancel(self, booking_id):
+        row = self.booking(booking_id)
+        if row is None:
+            return False
+        doctor, hospital, slot = row
+
+        def work(conn):
+            return conn.execute("DELETE FROM slot_bookings WHERE booking_id = ?", (booking_id,)).rowcount > 0
+
+        if self._transaction(doctor, work):
+            # The same time at the doctor's other hospitals comes back when
+            # availability is next reloaded from the catalogue or schedules.
+            self.availability.add_slot(doctor, hospital, slot)
+            return True
+        return False
+
+    def exclude_booked(self, doctor=None):
+        # Removes already-booked slots from the in-memory availability, e.g. after
+        # it has been (re)loaded from the source data.
+        if doctor is None:
+            rows = self.db.connect().execute("SELECT doctor, hospital, slot FROM slot_bookings").fetchall()
+        else:
+            rows = self.db.connect().execute(
+                "SELECT doctor, hospital, slot FROM slot_bookings WHERE doctor = ?", (doctor,)
+            ).fetchall()
+        for doctor_name, _, slot in rows:
+            self._withdraw(doctor_name, slot)
+
+    def purge_expired(self):
+        return self.db.connect().execute(
+            "DELETE FROM slot_holds WHERE expires_at <= ?", (time.time(),)
+        ).rowcount
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+
+# --- Webhook response cache ---
+# Rendered fulfillment payloads keyed by tag and the parameters that shape them.
+# Entries expire after a TTL, the least recently used entry is evicted once the
+# cache is full, and entries are dropped as soon as data they depend on changes.
+
+
+class ResponseCache:
+    def __init__(self, max_entries=1024, ttl=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._dependents = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            payload, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key, payload, depends_on=()):
+        # depends_on names the data this payload was built from, e.g.
+        # ("doctor", name), ("hospital", name) or ("doctors", None) for anything
+        # that would change if any doctor were added, removed or edited.
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (payload, time.monotonic() + self.ttl, tuple(depends_on))
+            for dependency in depends_on:
+                self._dependents.setdefault(dependency, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return payload
+
+    def _drop(self, key):
+        _, _, depends_on = self._entries.pop(key)
+        for dependency in depends_on:
+            keys = self._dependents.get(dependency)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._dependents[dependency]
+
+    def invalidate(self, *dependencies):
+        with self._lock:
+            for dependency in dependencies:
+                for key in list(self._dependents.get(dependency, ())):
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._dependents.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
@@ -0,0 +1,286 @@
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from availability import EPOCH_ORDINAL, MINUTES_PER_DAY
+
+# --- Recurring schedules ---
+# Availability generated from rules instead of hand-written dates: a weekly
+# template per doctor and hospital, dated exceptions (a day off or different
+# hours) and hospital holidays. Slots are materialized into the AvailabilityStore
+# for a rolling window of days. Changing a rule recomputes only the days it
+# touches, and each day is spliced into the existing slot table.
+#
+# Rules load from a JSON file or from CSV files with the same fields:
+#   templates.csv   doctor,hospital,weekday,start,end,every   (or times="09:00;09:30")
+#   exceptions.csv  doctor,hospital,date,start,end,every      (no start/times = day off)
+#   holidays.csv    hospital,date
+
+WEEKDAYS = {name: i for i, name in enumerate(["mon", "tue", "wed", "thu", "fri", "sat", "sun"])}
+
+
+def _minute_of_day(text):
+    hours, minutes = str(text).split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def parse_offsets(row):
+    # Minutes after midnight for one rule row: explicit times, or every N minutes
+    # from start up to (not including) end.
+    times = row.get("times")
+    if times:
+        if isinstance(times, str):
+            times = [t for t in times.replace(",", ";").split(";") if t.strip()]
+        return tuple(sorted({_minute_of_day(t.strip()) for t in times}))
+    if not row.get("start"):
+        return ()
+    start, end = _minute_of_day(row["start"]), _minute_of_day(row["end"])
+    every = int(row.get("every") or 15)
+    return tuple(range(start, end, every))
+
+
+def parse_weekday(value):
+    value = str(value).strip().lower()
+    return int(value) if value.isdigit() else WEEKDAYS[value[:3]]
+
+
+def day_number(value):
+    # Days since the Unix epoch, the unit AvailabilityStore minutes divide into.
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+def weekday_of(day):
+    # 1970-01-01 was a Thursday.
+    return (day + 3) % 7
+
+
+class ScheduleEngine:
+    def __init__(self, availability, window_days=28, start=None):
+        self.availability = availability
+        self.window_days = window_days
+        self.start_day = day_number(start or date.today())
+        self._templates = {}
+        self._exceptions = {}
+        self._holidays = {}
+        self._by_hospital = {}
+        self._materialized = False
+        self._lock = threading.RLock()
+        self._timer = None
+        # Called with a doctor name (None for all) after slots were regenerated.
+        self.listeners = []
+
+    # Rules -----------------------------------------------------------------
+
+    def _track(self, doctor, hospital):
+        self._by_hospital.setdefault(hospital, set()).add((doctor, hospital))
+
+    def _template(self, doctor, hospital):
+        key = (doctor, hospital)
+        template = self._templates.get(key)
+        if template is None:
+            template = self._templates[key] = [() for _ in range(7)]
+            self._track(doctor, hospital)
+        return template
+
+    def set_template(self, doctor, hospital, weekday, offsets):
+        with self._lock:
+            self._template(doctor, hospital)[weekday] = tuple(offsets)
+            days = [d for d in self._window() if weekday_of(d) == weekday]
+            self._recompute([(doctor, hospital)], days)
+
+    def set_exception(self, doctor, hospital, day, offsets):
+        # offsets=() marks a day off; None removes the exception again.
+        with self._lock:
+            exceptions = self._exceptions.setdefault((doctor, hospital), {})
+            if offsets is None:
+                exceptions.pop(day, None)
+            else:
+                exceptions[day] = tuple(offsets)
+            self._track(doctor, hospital)
+            self._recompute([(doctor, hospital)], [day])
+
+    def set_holiday(self, hospital, day, closed=True):
+        with self._lock:
+            holidays = self._holidays.setdefault(hospital, set())
+            if closed:
+                holidays.add(day)
+            else:
+                holidays.discard(day)
+            self._recompute(self._by_hospital.get(hospital, ()), [day])
+
+    def _add_template_row(self, row):
+        self._template(row["doctor"], row["hospital"])[parse_weekday(row["weekday"])] = parse_offsets(row)
+
+    def _add_exception_row(self, row):
+        exceptions = self._exceptions.setdefault((row["doctor"], row["hospital"]), {})
+        day = day_number(row["date"])
+        offsets = parse_offsets(row)
+        # Several rows for one day add up, so a split day is two rows.
+        exceptions[day] = tuple(sorted(set(exceptions.get(day, ())) | set(offsets)))
+        self._track(row["doctor"], row["hospital"])
+
+    def _add_holiday_row(self, row):
+        self._holidays.setdefault(row["hospital"], set()).add(day_number(row["date"]))
+
+    def load_json(self, path):
+        with open(path) as f:
+            rules = json.load(f)
+        with self._lock:
+            for row in rules.get("templates", []):
+                self._add_template_row(row)
+            for row in rules.get("exceptions", []):
+                self._add_exception_row(row)
+            for row in rules.get("holidays", []):
+                self._add_holiday_row(row)
+            if self._materialized:
+                self.materialize()
+
+    def load_csv(self, templates=None, exceptions=None, holidays=None):
+        with self._lock:
+            for path, add in ((templates, self._add_template_row), (exceptions, self._add_exception_row),
+                              (holidays, self._add_holiday_row)):
+                if path and os.path.exists(path):
+                    with open(path, newline="") as f:
+                        for row in csv.DictReader(f):
+                            add(row)
+            if self._materialized:
+                self.materialize()
+
+    def load(self, path):
+        # A .json file, or a directory holding templates/exceptions/holidays.csv.
+        if os.path.isdir(path):
+            self.load_csv(*(os.path.join(path, f"{name}.csv") for name in ("templates", "exceptions", "holidays")))
+        else:
+            self.load_json(path)
+
+    # Materialization -------------------------------------------------------
+
+    def _window(self):
+        return range(self.start_day, self.start_day + self.window_days)
+
+    def keys(self):
+        return set(self._templates) | set(self._exceptions)
+
+    def day_slots(self, doctor, hospital, day):
+        if day in self._holidays.get(hospital, ()):
+            return []
+        offsets = self._exceptions.get((doctor, hospital), {}).get(day)
+        if offsets is None:
+            template = self._templates.get((doctor, hospital))
+            offsets = template[weekday_of(day)] if template else ()
+        base = day * MINUTES_PER_DAY
+        return [base + offset for offset in offsets]
+
+    def _window_slots(self, doctor, hospital, days):
+        # day_slots over a run of days, with the per-key lookups hoisted out.
+        holidays = self._holidays.get(hospital, ())
+        exceptions = self._exceptions.get((doctor, hospital), {})
+        template = self._templates.get((doctor, hospital)) or [()] * 7
+        minutes = []
+        for day in days:
+            if day in holidays:
+                continue
+            offsets = exceptions.get(day)
+            if offsets is None:
+                offsets = template[(day + 3) % 7]
+            base = day * MINUTES_PER_DAY
+            minutes.extend([base + offset for offset in offsets])
+        return minutes
+
+    def materialize(self):
+        # Regenerates every rule-driven table for the whole window in one go.
+        started = time.perf_counter()
+        with self._lock:
+            tables = {}
+            window = self._window()
+            for doctor, hospital in self.keys():
+                tables.setdefault(doctor, {})[hospital] = self._window_slots(doctor, hospital, window)
+            self.availability.set_many(tables)
+            self._materialized = True
+        logging.info(f"Materialized {sum(len(t) for t in tables.values())} schedule tables "
+                     f"for {self.window_days} days in {time.perf_counter() - started:.2f}s")
+        self._notify(None)
+
+    def _recompute(self, keys, days):
+        if not self._materialized:
+            return
+        window = self._window()
+        days = [day for day in days if day in window]
+        doctors = set()
+        for doctor, hospital in keys:
+            for day in days:
+                self.availability.replace_range(
+                    doctor, hospital, day * MINUTES_PER_DAY, (day + 1) * MINUTES_PER_DAY,
+                    self.day_slots(doctor, hospital, day)
+                )
+            doctors.add(doctor)
+        for doctor in doctors:
+            self._notify(doctor)
+
+    def reapply(self, doctor):
+        # Puts a doctor's rule-driven tables back, e.g. after the doctor's
+        # catalogue entry was reloaded over them.
+        with self._lock:
+            if not self._materialized:
+                return
+            hospitals = [hospital for name, hospital in self.keys() if name == doctor]
+            window = self._window()
+            for hospital in hospitals:
+                self.availability.set_slots(doctor, hospital, self._window_slots(doctor, hospital, window))
+        if hospitals:
+            self._notify(doctor)
+
+    def roll(self, start=None):
+        # Moves the window forward: days that have passed are dropped and the
+        # newly covered days are computed; everything in between is untouched.
+        with self._lock:
+            new_start = day_number(start or date.today())
+            if new_start <= self.start_day:
+                return
+            old_start, old_end = self.start_day, self.start_day + self.window_days
+            self.start_day = new_start
+            if not self._materialized:
+                return
+            new_end = new_start + self.window_days
+            for doctor, hospital in self.keys():
+                self.availability.replace_range(
+                    doctor, hospital, old_start * MINUTES_PER_DAY, min(new_start, old_end) * MINUTES_PER_DAY, []
+                )
+                first_new = max(old_end, new_start)
+                self.availability.replace_range(
+                    doctor, hospital, first_new * MINUTES_PER_DAY, new_end * MINUTES_PER_DAY,
+                    self._window_slots(doctor, hospital, range(first_new, new_end))
+                )
+        self._notify(None)
+
+    def _notify(self, doctor):
+        for listener in self.listeners:
+            listener(doctor)
+
+    # Daily roll --------------------------------------------------------------
+
+    def start(self):
+        # Rolls the window forward just after each midnight.
+        now = datetime.now()
+        next_midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        self._timer = threading.Timer((next_midnight - now).total_seconds() + 1, self._tick)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _tick(self):
+        try:
+            self.roll()
+        except Exception as e:
+            logging.error(f"Schedule roll failed: {e}")
+        self.start()
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
@@ -0,0 +1,345 @@
+import logging
+import os
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from availability import AvailabilityStore
+from data import DOCTORS, HOSPITALS
+from doctor_index import DoctorIndex
+from geo import KM_PER_MILE, HospitalLocator, PostcodeLookup
+from idempotency import IdempotencyStore
+from logging_pipeline import mask_phone_number
+from mailer import SMTPConnectionPool, build_message
+from metrics import FIND_DOCTOR_LATENCY
+from name_match import NameResolver
+from outbox import Outbox
+from reminders import ReminderScheduler
+from repository import DOCTOR, CachedRepository, FirestoreRepository, InMemoryRepository
+from reservations import SlotReservations
+from response_cache import ResponseCache
+from schedules import ScheduleEngine
+from snapshot import load_snapshot
+from uploads import UploadStore
+from whatsapp import FakeTransport, TwilioTransport, WhatsAppDispatcher
+
+# --- Shared services ---
+# The catalogue, its derived lookup structures and the notification channels,
+# created once per process and used by the webhook handlers.
+
+DATA_BACKEND = os.environ.get("DATA_BACKEND", "memory")
+
+if DATA_BACKEND == "firestore":
+    data_backend = FirestoreRepository(project_id=os.environ.get("GOOGLE_CLOUD_PROJECT"))
+else:
+    data_backend = InMemoryRepository(DOCTORS, HOSPITALS)
+
+# From here on DOCTORS and HOSPITALS are the catalogue's in-memory cache, kept in
+# step with the backend by its change listener.
+catalogue = CachedRepository(data_backend)
+DOCTORS = catalogue.doctors
+HOSPITALS = catalogue.hospitals
+
+# A snapshot written by `python snapshot.py` skips rebuilding the derived
+# structures at cold start; it is ignored unless it matches this catalogue.
+CATALOGUE_SNAPSHOT = os.environ.get("CATALOGUE_SNAPSHOT")
+
+snapshot = load_snapshot(CATALOGUE_SNAPSHOT, DOCTORS, HOSPITALS) if CATALOGUE_SNAPSHOT else None
+
+doctor_index = DoctorIndex(DOCTORS, HOSPITALS, state=snapshot and snapshot.index)
+postcodes = PostcodeLookup()
+hospital_locator = HospitalLocator(HOSPITALS, postcodes)
+name_resolver = NameResolver(DOCTORS, state=snapshot and snapshot.names)
+availability = AvailabilityStore(DOCTORS, tables=snapshot and snapshot.slots)
+
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 1024))
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", 300))
+
+response_cache = ResponseCache(max_entries=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+
+def on_availability_change(doctor_name):
+    if doctor_name is None:
+        response_cache.clear()
+    else:
+        response_cache.invalidate(("doctor", doctor_name))
+
+availability.listeners.append(on_availability_change)
+
+RESERVATIONS_DB_PATH = os.environ.get("RESERVATIONS_DB_PATH", "reservations.db")
+SLOT_HOLD_SECONDS = float(os.environ.get("SLOT_HOLD_SECONDS", 600))
+
+reservations = SlotReservations(RESERVATIONS_DB_PATH, availability, hold_ttl=SLOT_HOLD_SECONDS)
+reservations.exclude_booked()
+
+# Rule-driven availability (weekly templates, exceptions and holidays), when a
+# rules file or directory is configured. Its tables take the place of the
+# catalogue's available_dates for the doctors and hospitals it covers.
+SCHEDULES_PATH = os.environ.get("SCHEDULES_PATH")
+SCHEDULE_WINDOW_DAYS = int(os.environ.get("SCHEDULE_WINDOW_DAYS", 28))
+
+schedules = ScheduleEngine(availability, window_days=SCHEDULE_WINDOW_DAYS)
+schedules.listeners.append(reservations.exclude_booked)
+if SCHEDULES_PATH:
+    schedules.load(SCHEDULES_PATH)
+    schedules.materialize()
+    schedules.start()
+
+# Called for every catalogue change so derived lookup structures stay in step
+# with the data.
+def refresh_doctor(doctor_name):
+    doctor_index.update_doctor(doctor_name)
+    name_resolver.update_doctor(doctor_name)
+    availability.update_doctor(doctor_name)
+    schedules.reapply(doctor_name)
+    reservations.exclude_booked(doctor_name)
+    response_cache.invalidate(("doctor", doctor_name), ("doctors", None))
+
+def refresh_hospital(hospital_name):
+    doctor_index.update_hospital(hospital_name)
+    hospital_locator.update_hospital(hospital_name)
+    response_cache.invalidate(("hospitals", None))
+
+def on_catalogue_change(kind, name):
+    if kind == DOCTOR:
+        refresh_doctor(name)
+    else:
+        refresh_hospital(name)
+
+catalogue.listeners.append(on_catalogue_change)
+
+NEARBY_RADIUS_MILES = float(os.environ.get("NEARBY_RADIUS_MILES", 20))
+
+def hospitals_near(place, radius_miles=None):
+    # {hospital: miles} nearest first, or None when place is not a postcode.
+    distances = hospital_locator.near(place, (radius_miles or NEARBY_RADIUS_MILES) * KM_PER_MILE)
+    if distances is None:
+        return None
+    return {name: km / KM_PER_MILE for name, km in distances.items()}
+
+def find_doctors(specialty=None, city=None, postcode=None, location=None, start=0):
+    # Lazy (doctor, locations) results from position `start`, plus {hospital:
+    # miles} when the place is a postcode, in which case doctors are ranked by
+    # distance instead of matched by name. A city given alongside the postcode
+    # still narrows the nearby hospitals.
+    place = location or postcode
+    distances = hospitals_near(place) if place else None
+    if distances is not None:
+        if city:
+            in_city = doctor_index.hospitals_in(city)
+            distances = {name: miles for name, miles in distances.items() if name in in_city}
+        return doctor_index.iter_nearby(specialty, distances, start), distances
+    return doctor_index.iter_search(specialty, city, postcode, location, start), None
+
+def earliest_available(specialty=None, city=None, postcode=None, location=None, after=None):
+    return availability.earliest(find_doctors(specialty, city, postcode, location)[0], after)
+
+TWILIO_ACCOUNT_SID = os.environ.get("TWILIO_ACCOUNT_SID")
+TWILIO_AUTH_TOKEN = os.environ.get("TWILIO_AUTH_TOKEN")
+TWILIO_PHONE_NUMBER = os.environ.get("TWILIO_PHONE_NUMBER")
+
+def format_phone_number(phone_number):
+    phone_number = phone_number.replace(' ', '').replace('-', '')
+    if not phone_number.startswith('+'):
+        if phone_number.startswith('0'):
+            return f'+44{phone_number[1:]}'
+        elif phone_number.startswith('44'):
+            return f'+{phone_number}'
+        else:
+            logging.warning(f"Could not reliably format phone number: {mask_phone_number(phone_number)}")
+            return f'+{phone_number}'
+    return phone_number
+
+TWILIO_MESSAGES_PER_SECOND = float(os.environ.get("TWILIO_MESSAGES_PER_SECOND", 10))
+TWILIO_DISPATCH_WORKERS = int(os.environ.get("TWILIO_DISPATCH_WORKERS", 8))
+WHATSAPP_TRANSPORT = os.environ.get("WHATSAPP_TRANSPORT", "twilio")
+
+_whatsapp_dispatcher = None
+_whatsapp_dispatcher_lock = threading.Lock()
+
+def get_whatsapp_dispatcher():
+    global _whatsapp_dispatcher
+    if _whatsapp_dispatcher is None:
+        with _whatsapp_dispatcher_lock:
+            if _whatsapp_dispatcher is None:
+                if WHATSAPP_TRANSPORT == "fake":
+                    transport = FakeTransport()
+                else:
+                    transport = TwilioTransport(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+                _whatsapp_dispatcher = WhatsAppDispatcher(
+                    transport,
+                    TWILIO_PHONE_NUMBER,
+                    max_workers=TWILIO_DISPATCH_WORKERS,
+                    messages_per_second=TWILIO_MESSAGES_PER_SECOND
+                )
+    return _whatsapp_dispatcher
+
+def send_whatsapp_message(to_number, body):
+    try:
+        formatted_to_number = format_phone_number(to_number)
+        logging.info(f"Attempting to send message from {TWILIO_PHONE_NUMBER} to {mask_phone_number(formatted_to_number)}")
+        sid = get_whatsapp_dispatcher().send(formatted_to_number, body)
+        logging.info(f"WhatsApp message sent to {mask_phone_number(formatted_to_number)}: {sid}")
+        return sid
+    except Exception as e:
+        logging.error(f"Failed to send WhatsApp message to {mask_phone_number(to_number)}: {e}")
+        return None
+
+def send_whatsapp_messages(messages):
+    return get_whatsapp_dispatcher().send_many(
+        [(format_phone_number(to_number), body) for to_number, body in messages]
+    )
+
+SMTP_HOST = os.environ.get("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", 587))
+SMTP_STARTTLS = os.environ.get("SMTP_STARTTLS", "1") == "1"
+SMTP_POOL_SIZE = int(os.environ.get("SMTP_POOL_SIZE", 2))
+
+_smtp_pool = None
+_smtp_pool_lock = threading.Lock()
+
+def get_smtp_pool():
+    global _smtp_pool
+    if _smtp_pool is None:
+        with _smtp_pool_lock:
+            if _smtp_pool is None:
+                _smtp_pool = SMTPConnectionPool(
+                    SMTP_HOST,
+                    SMTP_PORT,
+                    username=os.environ.get("SENDER_EMAIL"),
+                    password=os.environ.get("SENDER_PASSWORD"),
+                    starttls=SMTP_STARTTLS,
+                    size=SMTP_POOL_SIZE
+                )
+    return _smtp_pool
+
+def send_email(to_email, subject, plain_body, html_body):
+    sender_email = os.environ.get("SENDER_EMAIL")
+    sender_password = os.environ.get("SENDER_PASSWORD")
+    if not sender_email or not sender_password:
+        logging.error("Email credentials not found.")
+        return False
+    msg = build_message(sender_email, to_email, subject, plain_body, html_body)
+    try:
+        if not get_smtp_pool().send_message(msg):
+            return False
+    except Exception as e:
+        logging.error(f"Failed to send email: {e}")
+        return False
+    return True
+
+OUTBOX_DB_PATH = os.environ.get("OUTBOX_DB_PATH", "outbox.db")
+OUTBOX_WORKERS = int(os.environ.get("OUTBOX_WORKERS", 2))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 5))
+
+outbox = Outbox(
+    OUTBOX_DB_PATH,
+    handlers={"email": send_email, "whatsapp": send_whatsapp_message},
+    workers=OUTBOX_WORKERS,
+    max_attempts=OUTBOX_MAX_ATTEMPTS
+)
+# Deliver what a previous process left queued or half-sent without waiting for
+# the next booking to start the workers.
+if outbox.pending():
+    outbox.start()
+
+IDEMPOTENCY_DB_PATH = os.environ.get("IDEMPOTENCY_DB_PATH", "idempotency.db")
+IDEMPOTENCY_TTL_SECONDS = float(os.environ.get("IDEMPOTENCY_TTL_SECONDS", 86400))
+IDEMPOTENCY_RETRY_WAIT_SECONDS = float(os.environ.get("IDEMPOTENCY_RETRY_WAIT_SECONDS", 4))
+
+idempotency = IdempotencyStore(IDEMPOTENCY_DB_PATH, ttl=IDEMPOTENCY_TTL_SECONDS)
+
+# Batch senders for reminders: one pooled SMTP session per batch of emails and
+# one dispatcher fan-out per batch of WhatsApp messages.
+def send_email_batch(payloads):
+    sender_email = os.environ.get("SENDER_EMAIL")
+    if not sender_email or not os.environ.get("SENDER_PASSWORD"):
+        logging.error("Email credentials not found.")
+        return [False] * len(payloads)
+    messages = [
+        build_message(sender_email, p["to_email"], p["subject"], p["plain_body"], p["html_body"])
+        for p in payloads
+    ]
+    return get_smtp_pool().send_messages(messages)
+
+def send_whatsapp_batch(payloads):
+    sids = send_whatsapp_messages([(p["to_number"], p["body"]) for p in payloads])
+    return [sid is not None for sid in sids]
+
+REMINDERS_DB_PATH = os.environ.get("REMINDERS_DB_PATH", "reminders.db")
+REMINDER_LEAD_HOURS = [float(h) for h in os.environ.get("REMINDER_LEAD_HOURS", "24").split(",") if h.strip()]
+REMINDER_BATCH_SIZE = int(os.environ.get("REMINDER_BATCH_SIZE", 200))
+# Appointment times are wall-clock times at the clinics; reminders are timed
+# against this zone rather than the server's.
+CLINIC_TIMEZONE = ZoneInfo(os.environ.get("CLINIC_TIMEZONE", "Europe/London"))
+
+reminders = ReminderScheduler(
+    REMINDERS_DB_PATH,
+    senders={"email": send_email_batch, "whatsapp": send_whatsapp_batch},
+    batch_size=REMINDER_BATCH_SIZE,
+    is_active=lambda booking_id: reservations.booking(booking_id) is not None
+)
+if reminders.pending():
+    reminders.start()
+
+UPLOADS_DIR = os.environ.get("UPLOADS_DIR", "uploads")
+UPLOADS_DB_PATH = os.environ.get("UPLOADS_DB_PATH", "uploads.db")
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", 100 * 1024 ** 2))
+# Must be types uploads.SIGNATURES can verify.
+UPLOAD_CONTENT_TYPES = [t.strip() for t in os.environ.get("UPLOAD_CONTENT_TYPES", "application/pdf,application/dicom").split(",") if t.strip()]
+UPLOAD_TOKEN_TTL_SECONDS = float(os.environ.get("UPLOAD_TOKEN_TTL_SECONDS", 86400))
+UPLOAD_MAX_OPEN = int(os.environ.get("UPLOAD_MAX_OPEN", 5))
+
+uploads = UploadStore(
+    UPLOADS_DIR,
+    UPLOADS_DB_PATH,
+    max_bytes=UPLOAD_MAX_BYTES,
+    content_types=UPLOAD_CONTENT_TYPES,
+    token_ttl=UPLOAD_TOKEN_TTL_SECONDS,
+    max_open=UPLOAD_MAX_OPEN
+)
+
+# Insurer terms; defaults to insurer_rules.csv next to the code. The engine (and
+# NumPy with it) is loaded on the first quote, not at process start.
+PRICING_RULES_PATH = os.environ.get("PRICING_RULES_PATH")
+
+_pricing_engine = None
+_pricing_engine_lock = threading.Lock()
+
+def get_pricing_engine():
+    global _pricing_engine
+    if _pricing_engine is None:
+        with _pricing_engine_lock:
+            if _pricing_engine is None:
+                from pricing import PricingEngine
+                _pricing_engine = PricingEngine(PRICING_RULES_PATH) if PRICING_RULES_PATH else PricingEngine()
+    return _pricing_engine
+
+@FIND_DOCTOR_LATENCY.timed()
+def find_doctor_key(user_input):
+    return name_resolver.resolve(user_input)
+
+def parse_appointment_datetime(appointment_datetime):
+    if not appointment_datetime:
+        return None
+    try:
+        if isinstance(appointment_datetime, dict):
+            year = int(appointment_datetime.get("year", 0))
+            month = int(appointment_datetime.get("month", 1))
+            day = int(appointment_datetime.get("day", 1))
+            hours = int(appointment_datetime.get("hours", 0))
+            minutes = int(appointment_datetime.get("minutes", 0))
+            seconds = int(appointment_datetime.get("seconds", 0))
+            return datetime(year, month, day, hours, minutes, seconds)
+        return datetime.fromisoformat(appointment_datetime)
+    except Exception as e:
+        logging.warning(f"Failed to parse appointment_datetime: {appointment_datetime}, error: {e}")
+        return None
+
+def slot_hospital(doctor_name, slot, session_id, preferred=None):
+    held = reservations.session_hold(session_id) if session_id else None
+    if held and held[0] == doctor_name and held[2] == slot:
+        return held[1]
+    hospitals = availability.hospitals_with_slot(doctor_name, slot)
+    if preferred in hospitals:
+        return preferred
+    return hospitals[0] if hospitals else None
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+import marshal
+import mmap
+import os
+import pickle
+import struct
+import sys
+import time
+from array import array
+
+from availability import AvailabilityStore
+from doctor_index import DoctorIndex
+from name_match import NameResolver
+
+# --- Startup snapshot of the prepared catalogue ---
+# Building the doctor index, the name-match tables and the compiled slot arrays
+# from DOCTORS/HOSPITALS dominates cold start once the catalogue is large. A build
+# step writes them into one versioned binary file that a new process maps
+# instead of rebuilding:
+#
+#   header   magic, format version, SHA-256 of the catalogue it was built from,
+#            and the offsets of the two sections below
+#   slots    every slot table back to back as little-endian int64 minutes; the
+#            store serves them as views of the mapped file, so the pages are
+#            only read when touched and are shared by workers on one host
+#   meta     pickled index and name-match tables, plus where each doctor and
+#            hospital's slots sit in the slots section
+#
+# A snapshot is only used when its version and catalogue hash match; otherwise
+# the structures are built as usual. It is a trusted build artefact (the meta
+# section is a pickle), so only load files produced by this build step.
+#
+#   python snapshot.py catalogue.snap     # then set CATALOGUE_SNAPSHOT=catalogue.snap
+
+MAGIC = b"DRSNAP\r\n"
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct("<8sI32sQQQQ")
+
+
+def catalogue_fingerprint(doctors, hospitals):
+    # marshal is much faster than JSON for plain data. Format version 0 writes
+    # no back-references or interning flags, so equal data always gives equal
+    # bytes. Documents holding other types (e.g. Firestore timestamps) fall back
+    # to JSON.
+    doctors, hospitals = dict(doctors), dict(hospitals)
+    try:
+        data = marshal.dumps((doctors, hospitals), 0)
+    except ValueError:
+        data = json.dumps([doctors, hospitals], default=str).encode()
+    return hashlib.sha256(data).digest()
+
+
+class Snapshot:
+    def __init__(self, index, names, slots):
+        self.index = index
+        self.names = names
+        self.slots = slots
+
+
+def write_snapshot(path, doctors, hospitals):
+    # Builds the structures from the catalogue alone (no bookings or rule-driven
+    # schedules, which are applied on top at startup) and writes them atomically.
+    index = DoctorIndex(doctors, hospitals)
+    names = NameResolver(doctors)
+    availability = AvailabilityStore(doctors)
+
+    slots = array("q")
+    directory = {}
+    for doctor, tables in availability.tables().items():
+        placed = directory[doctor] = {}
+        for hospital, minutes in tables.items():
+            placed[hospital] = (len(slots), len(minutes))
+            slots.extend(array("q", minutes))
+    if sys.byteorder != "little":
+        slots.byteswap()
+    meta = pickle.dumps(
+        {"index": index.snapshot(), "names": names.snapshot(), "slots": directory},
+        protocol=pickle.HIGHEST_PROTOCOL
+    )
+
+    slots_offset = (HEADER.size + 7) // 8 * 8
+    meta_offset = slots_offset + len(slots) * slots.itemsize
+    header = HEADER.pack(
+        MAGIC, SNAPSHOT_VERSION, catalogue_fingerprint(doctors, hospitals),
+        slots_offset, len(slots), meta_offset, len(meta)
+    )
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(b"\0" * (slots_offset - len(header)))
+        slots.tofile(f)
+        f.write(meta)
+    os.replace(tmp_path, path)
+    return meta_offset + len(meta)
+
+
+def load_snapshot(path, doctors, hospitals):
+    # Returns a Snapshot for this catalogue, or None if the file is missing,
+    # from another format version or built from different data.
+    started = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Catalogue snapshot {path} not loaded: {e}")
+        return None
+    if len(mapped) < HEADER.size:
+        logging.warning(f"Catalogue snapshot {path} is truncated")
+        return None
+    magic, version, fingerprint, slots_offset, slot_count, meta_offset, meta_length = HEADER.unpack_from(mapped)
+    if magic != MAGIC or version != SNAPSHOT_VERSION:
+        logging.warning(f"Catalogue snapshot {path} has an unsupported format (version {version})")
+        return None
+    if fingerprint != catalogue_fingerprint(doctors, hospitals):
+        logging.warning(f"Catalogue snapshot {path} was built from different data; rebuilding")
+        return None
+    if sys.byteorder != "little":
+        logging.warning(f"Catalogue snapshot {path} needs a little-endian host")
+        return None
+
+    meta = pickle.loads(mapped[meta_offset:meta_offset + meta_length])
+    view = memoryview(mapped)[slots_offset:slots_offset + slot_count * 8].cast("q")
+    slots = {
+        doctor: {hospital: view[start:start + count] for hospital, (start, count) in placed.items()}
+        for doctor, placed in meta["slots"].items()
+    }
+    logging.info(f"Loaded catalogue snapshot {path} in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return Snapshot(meta["index"], meta["names"], slots)
+
+
+if __name__ == "__main__":
+    # Build step: snapshot the catalogue the service would load.
+    from repository import CachedRepository, FirestoreRepository, InMemoryRepository
+
+    target = sys.argv[1] if len(sys.argv) > 1 else os.environ.get("CATALOGUE_SNAPSHOT", "catalogue.snap")
+    if os.environ.get("DATA_BACKEND", "memory") == "firestore":
+        backend = FirestoreRepository(project_id=os.environ.get("GOOGLE_CLOUD_PROJECT"))
+    else:
+        from data import DOCTORS, HOSPITALS
+        backend = InMemoryRepository(DOCTORS, HOSPITALS)
+    catalogue = CachedRepository(backend)
+    size = write_snapshot(target, catalogue.doctors, catalogue.hospitals)
+    print(f"Wrote {target} ({size} bytes, {len(catalogue.doctors)} doctors, {len(catalogue.hospitals)} hospitals)")
@@ -0,0 +1,41 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# --- Local SQLite stores ---
+# The outbox, reservations, idempotency keys, reminders and uploads each keep
+# their state in a SQLite file shared by every worker process on the host. Each
+# thread gets its own connection in autocommit mode with WAL, so reads never
+# wait on a writer; writes that must be atomic run in transaction(), which takes
+# the write lock up front (BEGIN IMMEDIATE) so concurrent writers queue instead
+# of failing at commit.
+
+
+class Database:
+    def __init__(self, path, schema=None, row_factory=None):
+        self.path = path
+        self.row_factory = row_factory
+        self._local = threading.local()
+        if schema:
+            self.connect().executescript(schema)
+
+    def connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            if self.row_factory is not None:
+                conn.row_factory = self.row_factory
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self.connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
@@ -0,0 +1,13 @@
+import os
+import tempfile
+
+
+def import_services():
+    # services opens its SQLite stores and upload directory at import; point
+    # them at a temporary directory so tests never write into the tree.
+    workdir = tempfile.mkdtemp(prefix="webhook-tests-")
+    for name in ("OUTBOX", "RESERVATIONS", "IDEMPOTENCY", "REMINDERS", "UPLOADS"):
+        os.environ.setdefault(f"{name}_DB_PATH", os.path.join(workdir, f"{name.lower()}.db"))
+    os.environ.setdefault("UPLOADS_DIR", os.path.join(workdir, "uploads"))
+    import services
+    return services
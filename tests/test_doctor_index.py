@@ -0,0 +1,40 @@
+import unittest
+
+from doctor_index import DoctorIndex
+
+DOCTORS = {
+    f"Dr. {i}": {"specialty": "Cardiology" if i % 2 else "Dermatology", "locations": [f"Site {i % 4}", f"Site {(i + 1) % 4}"]}
+    for i in range(20)
+}
+HOSPITALS = {f"Site {i}": {"city": "London" if i < 2 else "Leeds", "postcode": f"LS{i} 1AA"} for i in range(4)}
+
+
+class ResumeTest(unittest.TestCase):
+    # A "Show more" page resumes the generators at the cursor; it must give the
+    # same results as slicing the full list.
+    def setUp(self):
+        self.index = DoctorIndex(DOCTORS, HOSPITALS)
+
+    def test_iter_search_resumes_at_start(self):
+        for specialty, city in ((None, None), ("cardio", None), (None, "london"), ("derm", "leeds")):
+            full = self.index.search(specialty, city)
+            for start in (0, 1, 3, len(full), len(full) + 1):
+                self.assertEqual(list(self.index.iter_search(specialty, city, start=start)), full[start:])
+
+    def test_iter_nearby_resumes_at_start(self):
+        distances = {"Site 2": 1.0, "Site 0": 2.5, "Site 3": 4.0}
+        for specialty in (None, "cardio"):
+            full = self.index.nearby(specialty, distances)
+            for start in (0, 2, 7, len(full) + 1):
+                self.assertEqual(list(self.index.iter_nearby(specialty, distances, start=start)), full[start:])
+
+    def test_iter_search_is_lazy(self):
+        results = self.index.iter_search()
+        self.assertEqual(next(results)[0], "Dr. 0")
+        del DOCTORS["Dr. 19"]
+        try:
+            self.index.update_doctor("Dr. 19")
+            # Doctors already ordered but not yet taken are read as they come.
+            self.assertNotIn("Dr. 19", [name for name, _ in results])
+        finally:
+            DOCTORS["Dr. 19"] = {"specialty": "Cardiology", "locations": ["Site 3", "Site 0"]}
@@ -0,0 +1,118 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from idempotency import ABANDONED, DONE, NEW, PENDING, IdempotencyStore, fingerprint
+from tests.support import import_services
+
+final_confirmation = None
+
+
+def setUpModule():
+    global final_confirmation
+    import_services()
+    from handlers import final_confirmation as module
+    final_confirmation = module
+
+
+def later(delay, fn, *args):
+    timer = threading.Timer(delay, fn, args)
+    timer.start()
+    return timer
+
+
+class IdempotencyStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.store = IdempotencyStore(os.path.join(self.workdir, "idempotency.db"), lease=30.0)
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir)
+
+    def test_retry_gets_the_stored_response(self):
+        self.assertEqual(self.store.begin("k"), (NEW, None))
+        self.assertEqual(self.store.begin("k"), (PENDING, None))
+        self.store.complete("k", {"ok": 1})
+        self.assertEqual(self.store.begin("k"), (DONE, {"ok": 1}))
+
+    def test_wait_reports_each_outcome(self):
+        self.store.begin("done")
+        later(0.1, self.store.complete, "done", {"ok": 1}).join()
+        self.assertEqual(self.store.wait("done", 2.0), (DONE, {"ok": 1}))
+
+        self.store.begin("dropped")
+        later(0.1, self.store.abandon, "dropped")
+        self.assertEqual(self.store.wait("dropped", 2.0), (ABANDONED, None))
+        # An abandoned key can be claimed again.
+        self.assertEqual(self.store.begin("dropped"), (NEW, None))
+
+        self.assertEqual(self.store.wait("dropped", 0.1), (PENDING, None))
+
+    def test_expired_lease_is_taken_over(self):
+        store = IdempotencyStore(os.path.join(self.workdir, "short.db"), lease=0.05)
+        store.begin("k")
+        time.sleep(0.1)
+        self.assertEqual(store.begin("k"), (NEW, None))
+
+
+class RetriedConfirmationTest(unittest.TestCase):
+    # Dialogflow retries a slow send_final_confirmation while the first call is
+    # still running; the retry must rerun the booking if that call gives up.
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.store = IdempotencyStore(os.path.join(self.workdir, "idempotency.db"))
+        self.request = final_confirmation.WebhookRequest.from_json({
+            "fulfillmentInfo": {"tag": "send_final_confirmation"},
+            "sessionInfo": {
+                "session": "projects/p/sessions/retry",
+                "parameters": {"doctor_name": "Dr. Alice Smith", "person_name": "Pat", "email": "pat@example.com"}
+            }
+        })
+        params = self.request.params
+        self.key = fingerprint(
+            self.request.session, "Dr. Alice Smith", [params.get(name) for name in final_confirmation.BOOKING_PARAMETERS]
+        )
+        self.confirm = mock.Mock(return_value=(final_confirmation.WebhookResponse.text("Booked"), "b1"))
+        patches = [
+            mock.patch.object(final_confirmation, "idempotency", self.store),
+            mock.patch.object(final_confirmation, "confirm_booking", self.confirm),
+            mock.patch.object(final_confirmation, "IDEMPOTENCY_RETRY_WAIT_SECONDS", 2.0)
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir)
+
+    def reply(self, response):
+        return response.to_dict()["fulfillment_response"]["messages"][0]["text"]["text"]
+
+    def test_retry_reruns_after_first_attempt_abandons(self):
+        self.store.begin(self.key)
+        later(0.1, self.store.abandon, self.key)
+        response = final_confirmation.send_final_confirmation(self.request)
+        self.assertEqual(self.reply(response), ["Booked"])
+        self.confirm.assert_called_once()
+        self.assertEqual(self.store.begin(self.key)[0], DONE)
+
+    def test_retry_replays_a_finished_first_attempt(self):
+        self.store.begin(self.key)
+        stored = final_confirmation.WebhookResponse.text("Booked first time").to_dict()
+        later(0.1, self.store.complete, self.key, stored)
+        response = final_confirmation.send_final_confirmation(self.request)
+        self.assertEqual(self.reply(response), ["Booked first time"])
+        self.confirm.assert_not_called()
+
+    def test_failed_booking_leaves_the_key_free(self):
+        self.confirm.return_value = (final_confirmation.WebhookResponse.text("Slot taken"), None)
+        final_confirmation.send_final_confirmation(self.request)
+        self.assertEqual(self.store.begin(self.key), (NEW, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
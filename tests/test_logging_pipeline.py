@@ -0,0 +1,67 @@
+import logging
+import unittest
+from unittest import mock
+
+from logging_pipeline import REDACTED, mask_phone_number, scrub
+from tests.support import import_services
+from whatsapp import FakeTransport, WhatsAppDispatcher
+
+services = None
+
+
+def setUpModule():
+    global services
+    services = import_services()
+
+
+class ScrubTest(unittest.TestCase):
+    def test_phone_shaped_numbers_are_redacted(self):
+        for number in ("+44 7700 900123", "07700 900123", "020-7946-0000", "(020) 7946 0000", "555-123-4567"):
+            self.assertEqual(scrub(f"call {number} now"), f"call {REDACTED} now")
+
+    def test_opaque_ids_are_left_alone(self):
+        message = "Replaying stored confirmation for retried booking request 123456789012"
+        self.assertEqual(scrub(message), message)
+
+    def test_mask_keeps_the_last_three_digits(self):
+        self.assertEqual(mask_phone_number("+44 7700-900123"), "***123")
+
+
+class PhoneLogLinesTest(unittest.TestCase):
+    # Bare digit runs are not phone-shaped, so these call sites mask the number
+    # themselves; scrub() must not be what keeps it out of the log.
+    def assertMasked(self, logs, number):
+        self.assertTrue(logs.output)
+        for line in logs.output:
+            self.assertNotIn(number, scrub(line))
+            self.assertIn("***123", line)
+
+    def test_unformattable_number(self):
+        with self.assertLogs(level=logging.WARNING) as logs:
+            services.format_phone_number("7700900123")
+        self.assertMasked(logs, "7700900123")
+        self.assertIn("Could not reliably format phone number: ***123", logs.output[0])
+
+    def test_failed_whatsapp_send(self):
+        dispatcher = mock.Mock()
+        dispatcher.send.side_effect = RuntimeError("connection reset")
+        with mock.patch.object(services, "get_whatsapp_dispatcher", return_value=dispatcher):
+            with self.assertLogs(level=logging.INFO) as logs:
+                self.assertIsNone(services.send_whatsapp_message("447700900123", "Reminder"))
+        self.assertMasked(logs, "447700900123")
+        self.assertIn("Failed to send WhatsApp message to ***123: connection reset", logs.output[-1])
+
+    def test_failed_batch_send(self):
+        # The transport's own error names the (formatted) number; scrub covers that.
+        dispatcher = WhatsAppDispatcher(FakeTransport(fail_numbers={"whatsapp:+447700900123"}), "+440000000000")
+        try:
+            with self.assertLogs(level=logging.ERROR) as logs:
+                self.assertEqual(dispatcher.send_many([("+447700900123", "Reminder")]), [None])
+        finally:
+            dispatcher.close()
+        self.assertMasked(logs, "447700900123")
+        self.assertIn("Failed to send WhatsApp message to ***123", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import smtplib
+import unittest
+
+from mailer import SMTPConnectionPool, build_message
+
+
+class FakeSMTP:
+    # smtplib.SMTP stand-in. Each recipient address decides what the server
+    # does with its message: "reject@" -> 550 on DATA, "refuse@" -> refused
+    # recipient, "drop@" -> the connection goes away (once per address).
+    opened = []
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        FakeSMTP.opened.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, username, password):
+        pass
+
+    def noop(self):
+        return (250, b"OK")
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_message(self, msg):
+        to = msg["To"]
+        if to.startswith("reject@"):
+            raise smtplib.SMTPDataError(550, b"Message rejected")
+        if to.startswith("refuse@"):
+            raise smtplib.SMTPRecipientsRefused({to: (550, b"No such user")})
+        if to.startswith("drop@") and to not in FakeSMTP.dropped:
+            FakeSMTP.dropped.add(to)
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        self.sent.append(to)
+
+
+class SendMessagesTest(unittest.TestCase):
+    def setUp(self):
+        FakeSMTP.opened = []
+        FakeSMTP.dropped = set()
+        self.pool = SMTPConnectionPool("smtp.example.com", 587, transport=FakeSMTP)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def batch(self, *recipients):
+        return [build_message("clinic@example.com", to, "Reminder", "text", "<p>html</p>") for to in recipients]
+
+    def test_rejected_messages_do_not_stop_the_batch(self):
+        with self.assertLogs(level="ERROR"):
+            results = self.pool.send_messages(self.batch("a@x.com", "reject@x.com", "refuse@x.com", "b@x.com"))
+        self.assertEqual(results, [True, False, False, True])
+        # A per-message rejection keeps the session; no reconnect.
+        self.assertEqual(len(FakeSMTP.opened), 1)
+        self.assertEqual(FakeSMTP.opened[0].sent, ["a@x.com", "b@x.com"])
+
+    def test_dropped_session_reconnects_and_resumes(self):
+        with self.assertLogs(level="WARNING"):
+            results = self.pool.send_messages(self.batch("a@x.com", "drop@x.com", "reject@x.com", "b@x.com"))
+        self.assertEqual(results, [True, True, False, True])
+        self.assertEqual(len(FakeSMTP.opened), 2)
+        self.assertEqual(FakeSMTP.opened[1].sent, ["drop@x.com", "b@x.com"])
+
+    def test_second_drop_reports_the_rest_as_not_sent(self):
+        with self.assertLogs(level="WARNING"):
+            results = self.pool.send_messages(self.batch("a@x.com", "drop@x.com", "drop@y.com", "b@x.com"))
+        self.assertEqual(results, [True, True, False, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
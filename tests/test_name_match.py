@@ -0,0 +1,33 @@
+import unittest
+
+from name_match import NameResolver
+
+DOCTORS = {
+    "Dr. Alice Smith": {},
+    "Dr. Ben Carter": {},
+    "Miss Tasha Gandamihardja": {},
+    "Mr Md Zaker Ullah": {},
+}
+
+
+class ResolveTest(unittest.TestCase):
+    def setUp(self):
+        self.resolver = NameResolver(DOCTORS)
+
+    def test_exact_and_normalised_names(self):
+        self.assertEqual(self.resolver.resolve(" dr. alice smith "), "Dr. Alice Smith")
+        self.assertEqual(self.resolver.resolve("Alice Smith"), "Dr. Alice Smith")
+        self.assertEqual(self.resolver.resolve("Prof Ben Carter"), "Dr. Ben Carter")
+
+    def test_close_spelling_matches(self):
+        self.assertEqual(self.resolver.resolve("Alice Smyth"), "Dr. Alice Smith")
+        self.assertEqual(self.resolver.resolve("Tasha Gandamihardia"), "Miss Tasha Gandamihardja")
+
+    def test_surname_with_title_is_not_enough(self):
+        # A booking must not bind to whichever doctor shares a title and surname.
+        self.assertIsNone(self.resolver.resolve("Dr. Smith"))
+        self.assertIsNone(self.resolver.resolve("Smith"))
+
+    def test_unknown_name(self):
+        self.assertIsNone(self.resolver.resolve("Dr. Nobody"))
+        self.assertIsNone(self.resolver.resolve("Dr."))
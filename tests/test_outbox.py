@@ -0,0 +1,109 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from outbox import PENDING, SENDING, SENT, Outbox
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class OutboxTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.workdir, "outbox.db")
+        self.delivered = []
+        self.lock = threading.Lock()
+        self.outboxes = []
+
+    def tearDown(self):
+        for outbox in self.outboxes:
+            outbox.stop()
+        shutil.rmtree(self.workdir)
+
+    def deliver(self, n):
+        with self.lock:
+            self.delivered.append(n)
+        return True
+
+    def outbox(self, **kwargs):
+        outbox = Outbox(self.path, {"email": self.deliver}, poll_interval=0.05, **kwargs)
+        self.outboxes.append(outbox)
+        return outbox
+
+    def wait_for(self, condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return condition()
+
+    def leave_claim(self, booking_id, n):
+        # A row as a worker that died mid-send leaves it: claimed just now.
+        outbox = Outbox(self.path, {"email": self.deliver})
+        with outbox.db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO notifications (booking_id, channel, payload, status, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, 'email', ?, ?, 0, ?, ?)",
+                (booking_id, f'{{"n": {n}}}', SENDING, time.time(), time.time())
+            )
+
+    def test_leftover_work_counts_as_pending(self):
+        outbox = self.outbox()
+        self.leave_claim("b1", 1)
+        with outbox.db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO notifications (booking_id, channel, payload, status, next_attempt_at, created_at, updated_at) "
+                "VALUES ('b2', 'email', '{\"n\": 2}', ?, 0, 0, 0)", (PENDING,)
+            )
+        self.assertEqual(outbox.pending(), 2)
+
+    def test_fresh_claim_from_a_crashed_worker_is_delivered_once_stale(self):
+        # The claim is too young to requeue when the replacement starts, so a
+        # running worker has to pick it up later.
+        self.leave_claim("b1", 1)
+        outbox = self.outbox(stale_after=0.5)
+        outbox.start()
+        self.assertTrue(self.wait_for(lambda: self.delivered == [1]))
+        self.assertEqual([row["status"] for row in outbox.status("b1")], [SENT])
+        self.assertEqual(outbox.pending(), 0)
+
+    def test_workers_sharing_a_database_deliver_each_notification_once(self):
+        first, second = self.outbox(workers=4), self.outbox(workers=4)
+        for i in range(40):
+            first.enqueue(f"b{i}", "email", {"n": i})
+        second.start()
+        self.assertTrue(self.wait_for(lambda: len(self.delivered) >= 40 and first.pending() == 0))
+        time.sleep(0.1)
+        self.assertEqual(sorted(self.delivered), list(range(40)))
+
+    def test_services_import_starts_the_outbox_for_leftover_work(self):
+        # Nothing is enqueued in the new process, so only the startup check can
+        # get the leftover notification delivered.
+        Outbox(self.path, {}).db.connect().execute(
+            "INSERT INTO notifications (booking_id, channel, payload, status, next_attempt_at, created_at, updated_at) "
+            "VALUES ('b1', 'whatsapp', ?, ?, 0, 0, 0)",
+            ('{"to_number": "+447700900123", "body": "Reminder"}', PENDING)
+        )
+        env = dict(os.environ, OUTBOX_DB_PATH=self.path, WHATSAPP_TRANSPORT="fake")
+        for name in ("RESERVATIONS", "IDEMPOTENCY", "REMINDERS", "UPLOADS"):
+            env[f"{name}_DB_PATH"] = os.path.join(self.workdir, f"{name.lower()}.db")
+        env["UPLOADS_DIR"] = os.path.join(self.workdir, "uploads")
+        script = (
+            "import time, services\n"
+            "deadline = time.monotonic() + 5\n"
+            "while services.outbox.pending() and time.monotonic() < deadline:\n"
+            "    time.sleep(0.05)\n"
+            "print(services.outbox.status('b1')[0]['status'])\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True, timeout=60
+        )
+        self.assertEqual(result.stdout.strip().splitlines()[-1], SENT, result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from reminders import PENDING, SENDING, SENT, ReminderScheduler
+
+
+class RemindersTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.workdir, "reminders.db")
+        self.sent = []
+        self.lock = threading.Lock()
+        self.schedulers = []
+
+    def tearDown(self):
+        for scheduler in self.schedulers:
+            scheduler.stop()
+        shutil.rmtree(self.workdir)
+
+    def send(self, payloads):
+        with self.lock:
+            self.sent.extend(payload["n"] for payload in payloads)
+        return [True] * len(payloads)
+
+    def scheduler(self, **kwargs):
+        scheduler = ReminderScheduler(self.path, {"email": self.send}, **kwargs)
+        self.schedulers.append(scheduler)
+        return scheduler
+
+    def wait_for(self, condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return condition()
+
+    def test_workers_sharing_a_database_send_each_reminder_once(self):
+        # Every worker process loads all pending reminders into its own heap;
+        # the claim must leave each one to exactly one of them.
+        first, second = self.scheduler(), self.scheduler()
+        send_at = time.time() + 3600
+        for i in range(50):
+            first.schedule(f"booking-{i}", [("email", {"n": i})], send_at)
+        first.stop()
+        second.start()
+        second.stop()
+        first.start()
+        first.stop()
+        workers = [threading.Thread(target=s.drain, args=(send_at + 1,)) for s in (first, second)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(sorted(self.sent), list(range(50)))
+        self.assertEqual(first.pending(), 0)
+
+    def test_claim_left_by_a_crashed_worker_is_sent_later(self):
+        # The claim is still fresh when the replacement worker starts, so the
+        # running scheduler has to pick it up once it goes stale.
+        crashed = self.scheduler()
+        crashed.schedule("booking-1", [("email", {"n": 1})], time.time())
+        crashed.stop()
+        crashed.db.connect().execute("UPDATE reminders SET status = ?, updated_at = ?", (SENDING, time.time()))
+
+        replacement = self.scheduler(stale_after=0.5)
+        replacement.start()
+        self.assertTrue(self.wait_for(lambda: self.sent == [1]))
+        self.assertEqual([r["status"] for r in replacement.status("booking-1")], [SENT])
+
+    def test_future_reminder_is_not_claimed_early(self):
+        scheduler = self.scheduler()
+        scheduler.schedule("booking-1", [("email", {"n": 1})], time.time() + 3600)
+        scheduler.stop()
+        scheduler.drain()
+        self.assertEqual(self.sent, [])
+        self.assertEqual([r["status"] for r in scheduler.status("booking-1")], [PENDING])
+
+
+if __name__ == "__main__":
+    unittest.main()
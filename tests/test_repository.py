@@ -0,0 +1,180 @@
+import queue
+import sys
+import threading
+import unittest
+from types import SimpleNamespace
+
+from repository import DOCTOR, HOSPITAL, CachedRepository, FirestoreRepository
+
+# --- Fake Firestore client ---
+# Just enough of google.cloud.firestore for FirestoreRepository: collections of
+# documents keyed by id, and on_snapshot watches whose callbacks run on a
+# background thread, one call per committed batch, as the real watch does.
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocument:
+    def __init__(self, collection, doc_id):
+        self.collection = collection
+        self.id = doc_id
+
+    def get(self):
+        return FakeSnapshot(self.id, self.collection.docs.get(self.id))
+
+    def set(self, data):
+        self.collection.commit({self.id: data})
+
+    def delete(self):
+        self.collection.commit({self.id: None})
+
+
+class FakeWatch:
+    def __init__(self, callback):
+        self.callback = callback
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            changes = self.queue.get()
+            try:
+                if changes is None:
+                    return
+                self.callback([], changes, None)
+            finally:
+                self.queue.task_done()
+
+    def unsubscribe(self):
+        self.queue.put(None)
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = {}
+        self.watches = []
+        self.lock = threading.Lock()
+
+    def stream(self):
+        with self.lock:
+            return [FakeSnapshot(doc_id, data) for doc_id, data in self.docs.items()]
+
+    def document(self, doc_id):
+        return FakeDocument(self, doc_id)
+
+    def on_snapshot(self, callback):
+        watch = FakeWatch(callback)
+        self.watches.append(watch)
+        return watch
+
+    def commit(self, writes):
+        # Applies {doc_id: data or None} and delivers it as one snapshot.
+        changes = []
+        with self.lock:
+            for doc_id, data in writes.items():
+                if data is None:
+                    kind = "REMOVED"
+                    data = self.docs.pop(doc_id, {})
+                else:
+                    kind = "MODIFIED" if doc_id in self.docs else "ADDED"
+                    self.docs[doc_id] = dict(data)
+                changes.append(SimpleNamespace(type=SimpleNamespace(name=kind), document=FakeSnapshot(doc_id, data)))
+        for watch in self.watches:
+            watch.queue.put(changes)
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.collections = {}
+
+    def collection(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+    def flush(self):
+        for collection in self.collections.values():
+            for watch in collection.watches:
+                watch.queue.join()
+
+
+class CachedFirestoreTest(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeFirestore()
+        self.client.collection("doctors").commit({"Dr. A": {"specialty": "Cardiology"}})
+        self.client.collection("hospitals").commit({"North": {"city": "London"}})
+        self.backend = FirestoreRepository(client=self.client)
+        self.catalogue = CachedRepository(self.backend)
+        self.changes = []
+        self.catalogue.listeners.append(lambda kind, name: self.changes.append((kind, name)))
+
+    def tearDown(self):
+        self.backend.close()
+
+    def test_watch_changes_reach_the_cache(self):
+        doctors = self.catalogue.doctors
+        self.catalogue.put_doctor("Dr. B", {"specialty": "Dermatology"})
+        self.catalogue.put_hospital("South", {"city": "Brighton"})
+        self.catalogue.delete_doctor("Dr. A")
+        self.client.flush()
+        self.assertIs(self.catalogue.doctors, doctors)
+        self.assertEqual(dict(doctors), {"Dr. B": {"specialty": "Dermatology"}})
+        self.assertEqual(self.catalogue.get_hospital("South"), {"city": "Brighton"})
+        self.assertCountEqual(self.changes, [(DOCTOR, "Dr. B"), (HOSPITAL, "South"), (DOCTOR, "Dr. A")])
+
+    def test_unchanged_document_does_not_notify(self):
+        self.catalogue.put_doctor("Dr. A", {"specialty": "Cardiology"})
+        self.client.flush()
+        self.assertEqual(self.changes, [])
+
+    def test_readers_see_whole_batches_while_the_watch_thread_writes(self):
+        # Each batch adds or removes a pair of doctors together; a reader
+        # iterating the table must never fail or see half a batch.
+        doctors = self.catalogue.doctors
+        collection = self.client.collection("doctors")
+        failures = []
+        done = threading.Event()
+
+        def read():
+            while not done.is_set():
+                try:
+                    names = [name for name, _ in doctors.items()]
+                except RuntimeError as e:
+                    failures.append(e)
+                    return
+                pairs = sum(name.startswith("Pair A") for name in names)
+                if pairs != sum(name.startswith("Pair B") for name in names):
+                    failures.append(names)
+                    return
+
+        # Switch threads far more often than the default so the race shows up.
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        try:
+            for reader in readers:
+                reader.start()
+            for i in range(300):
+                collection.commit({f"Pair A{i}": {"specialty": "GP"}, f"Pair B{i}": {"specialty": "GP"}})
+                if i % 3 == 0:
+                    collection.commit({f"Pair A{i}": None, f"Pair B{i}": None})
+            self.client.flush()
+        finally:
+            done.set()
+            for reader in readers:
+                reader.join()
+            sys.setswitchinterval(interval)
+
+        self.assertEqual(failures, [])
+        self.assertEqual(len(doctors), 1 + 2 * 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from availability import AvailabilityStore, parse_slot
+from reservations import SlotReservations
+
+DATES = [{"date": "2030-01-07", "times": ["09:00", "09:30"]}]
+DOCTORS = {"Dr. A": {"available_dates": {"North": DATES, "South": DATES}}}
+SLOT = parse_slot("2030-01-07", "09:00")
+
+
+class ReservationsTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.workdir, "reservations.db")
+        self.availability = AvailabilityStore(DOCTORS)
+        self.reservations = SlotReservations(self.path, self.availability)
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir)
+
+    def test_doctor_cannot_be_booked_twice_at_the_same_time(self):
+        self.assertTrue(self.reservations.confirm("Dr. A", "North", SLOT, "s1", "b1"))
+        self.assertFalse(self.reservations.confirm("Dr. A", "South", SLOT, "s2", "b2"))
+        self.assertEqual(self.availability.hospitals_with_slot("Dr. A", SLOT), [])
+        self.assertEqual(self.reservations.booking("b1"), ("Dr. A", "North", SLOT))
+
+    def test_concurrent_bookings_at_different_hospitals(self):
+        results = []
+        workers = [
+            threading.Thread(target=lambda h, i: results.append(
+                SlotReservations(self.path, AvailabilityStore(DOCTORS)).confirm("Dr. A", h, SLOT, f"s{i}", f"b{i}")
+            ), args=(hospital, i))
+            for i, hospital in enumerate(["North", "South"] * 4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(results.count(True), 1)
+        count = sqlite3.connect(self.path).execute("SELECT COUNT(*) FROM slot_bookings").fetchone()[0]
+        self.assertEqual(count, 1)
+
+    def test_hold_blocks_the_time_at_every_hospital(self):
+        self.assertIsNotNone(self.reservations.hold("Dr. A", "North", SLOT, "s1"))
+        self.assertIsNone(self.reservations.hold("Dr. A", "South", SLOT, "s2"))
+        self.assertFalse(self.reservations.confirm("Dr. A", "South", SLOT, "s2", "b2"))
+        # The holder can move its hold to the other hospital.
+        self.assertIsNotNone(self.reservations.hold("Dr. A", "South", SLOT, "s1"))
+        self.assertEqual(self.reservations.session_hold("s1"), ("Dr. A", "South", SLOT))
+
+    def test_expired_holds_are_purged(self):
+        reservations = SlotReservations(self.path, self.availability, purge_interval=0.0)
+        reservations.hold("Dr. A", "North", SLOT, "s1", ttl=0.01)
+        time.sleep(0.02)
+        reservations.hold("Dr. A", "North", SLOT + 30, "s2")
+        rows = sqlite3.connect(self.path).execute("SELECT session_id FROM slot_holds").fetchall()
+        self.assertEqual(rows, [("s2",)])
+
+    def test_database_keyed_per_hospital_gets_the_same_rule(self):
+        path = os.path.join(self.workdir, "old.db")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE slot_bookings (doctor TEXT NOT NULL, hospital TEXT NOT NULL, slot INTEGER NOT NULL, "
+            "booking_id TEXT NOT NULL UNIQUE, session_id TEXT NOT NULL, created_at REAL NOT NULL, "
+            "PRIMARY KEY (doctor, hospital, slot))"
+        )
+        conn.close()
+        reservations = SlotReservations(path, AvailabilityStore(DOCTORS))
+        self.assertTrue(reservations.confirm("Dr. A", "North", SLOT, "s1", "b1"))
+        self.assertFalse(SlotReservations(path, AvailabilityStore(DOCTORS)).confirm("Dr. A", "South", SLOT, "s2", "b2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,401 @@
+import fcntl
+import hashlib
+import os
+import re
+import secrets
+import threading
+import time
+import uuid
+
+from sqlite_store import Database
+
+# --- Resumable report uploads ---
+# Patients upload PDFs and DICOM images in chunks: an upload is created with its
+# final size, then its bytes arrive as ranges (Content-Range: bytes start-end/size)
+# that are written straight into a part file as they stream in, so nothing is
+# buffered in memory beyond one read. Each chunk must start where the previous
+# one ended; after a dropped connection the client asks for the offset and
+# resumes from there. The SHA-256 is updated as bytes are written (and rebuilt
+# from the part file if a chunk lands in a process that has not seen the upload).
+# Finished files are stored once per content hash under blobs/ and attached to
+# the conversation's session.
+#
+# Every call carries a bearer token the webhook issued to the conversation; the
+# token names the session, so a caller only sees and adds to its own session's
+# uploads. Only a hash of each token is stored. Declared types must be on the
+# allow-list, and a finished file must start with its type's signature. While
+# a chunk is written its part file holds an exclusive flock, which keeps chunks
+# of one upload apart across worker processes as well as threads.
+
+UPLOADING = "uploading"
+COMPLETE = "complete"
+
+READ_SIZE = 1024 * 1024
+
+# Types an upload may declare, with the (offset, leading bytes) that identify them.
+SIGNATURES = {
+    "application/pdf": (0, b"%PDF-"),
+    "application/dicom": (128, b"DICM"),
+    "image/jpeg": (0, b"\xff\xd8\xff"),
+    "image/png": (0, b"\x89PNG\r\n\x1a\n")
+}
+DEFAULT_CONTENT_TYPES = ("application/pdf", "application/dicom")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    received INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    sha256 TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_uploads_status ON uploads (status, updated_at);
+CREATE INDEX IF NOT EXISTS idx_uploads_session ON uploads (session_id, status);
+CREATE TABLE IF NOT EXISTS attachments (
+    session_id TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    UNIQUE (session_id, sha256)
+);
+CREATE TABLE IF NOT EXISTS upload_tokens (
+    token_hash TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_upload_tokens_expiry ON upload_tokens (expires_at);
+"""
+
+_CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+UPLOAD_FIELDS = ("id", "session_id", "filename", "content_type", "size", "received", "status", "sha256")
+
+
+class UploadError(ValueError):
+    def __init__(self, message, status=400, received=None):
+        super().__init__(message)
+        self.status = status
+        self.received = received
+
+    def to_dict(self):
+        body = {"error": str(self)}
+        if self.received is not None:
+            body["received"] = self.received
+        return body
+
+
+def parse_content_range(header, size):
+    # (start, end exclusive) of a chunk; a missing header means the whole file.
+    if not header:
+        return 0, size
+    match = _CONTENT_RANGE.match(header.strip())
+    if match is None:
+        raise UploadError(f"Malformed Content-Range: {header}")
+    start, last, total = (int(g) for g in match.groups())
+    if total != size or last < start or last >= size:
+        raise UploadError(f"Content-Range {header} does not fit an upload of {size} bytes", 416)
+    return start, last + 1
+
+
+def bearer_token(header):
+    # The token from an "Authorization: Bearer <token>" header, if any.
+    scheme, _, token = (header or "").partition(" ")
+    return token.strip() if scheme.lower() == "bearer" else None
+
+
+def _token_hash(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class UploadStore:
+    def __init__(self, root, db_path, max_bytes=100 * 1024 ** 2, content_types=DEFAULT_CONTENT_TYPES,
+                 ttl=86400.0, purge_interval=600.0, token_ttl=86400.0, max_open=5):
+        # max_open caps the unfinished uploads a session can hold at once, so a
+        # token cannot be used to reserve space without bound.
+        unknown = set(content_types) - set(SIGNATURES)
+        if unknown:
+            raise ValueError(f"No signature known for upload types: {', '.join(sorted(unknown))}")
+        self.root = root
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.content_types = set(content_types)
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self.token_ttl = token_ttl
+        self.max_open = max_open
+        self._hashers = {}
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        os.makedirs(os.path.join(root, "parts"), exist_ok=True)
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+        self.db = Database(db_path, SCHEMA)
+
+    def part_path(self, upload_id):
+        return os.path.join(self.root, "parts", f"{upload_id}.part")
+
+    def blob_path(self, sha256):
+        return os.path.join(self.root, "blobs", sha256[:2], sha256)
+
+    def issue_token(self, session_id):
+        # A new token for the session's upload calls, valid for token_ttl.
+        token = secrets.token_urlsafe(32)
+        self.db.connect().execute(
+            "INSERT INTO upload_tokens (token_hash, session_id, expires_at) VALUES (?, ?, ?)",
+            (_token_hash(token), session_id, time.time() + self.token_ttl)
+        )
+        return token
+
+    def authorize(self, token):
+        # The session a live token was issued to.
+        if token:
+            row = self.db.connect().execute(
+                "SELECT session_id FROM upload_tokens WHERE token_hash = ? AND expires_at > ?",
+                (_token_hash(token), time.time())
+            ).fetchone()
+            if row is not None:
+                return row[0]
+        raise UploadError("A valid upload token is required", 401)
+
+    def create(self, session_id, filename, content_type, size):
+        if not session_id:
+            raise UploadError("An upload needs the session it belongs to")
+        if not isinstance(size, int) or size <= 0:
+            raise UploadError("Upload size must be a positive number of bytes")
+        if size > self.max_bytes:
+            raise UploadError(f"Uploads are limited to {self.max_bytes} bytes", 413)
+        content_type = (content_type or "application/octet-stream").split(";")[0].strip().lower()
+        if content_type not in self.content_types:
+            raise UploadError(f"Unsupported file type: {content_type}", 415)
+        now = time.time()
+        if now - self._last_purge > self.purge_interval:
+            self._last_purge = now
+            self.purge_expired()
+        upload_id = uuid.uuid4().hex
+        filename = os.path.basename(filename or "report")
+        with self.db.transaction() as conn:
+            unfinished = conn.execute(
+                "SELECT COUNT(*) FROM uploads WHERE session_id = ? AND status = ?", (session_id, UPLOADING)
+            ).fetchone()[0]
+            if unfinished >= self.max_open:
+                raise UploadError(f"At most {self.max_open} unfinished uploads are allowed per conversation", 429)
+            conn.execute(
+                "INSERT INTO uploads (id, session_id, filename, content_type, size, received, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?)",
+                (upload_id, session_id, filename, content_type, size, UPLOADING, now, now)
+            )
+        open(self.part_path(upload_id), "wb").close()
+        return self.get(upload_id)
+
+    def get(self, upload_id, session_id=None):
+        # With session_id, another session's upload is reported as missing.
+        row = self.db.connect().execute(
+            f"SELECT {', '.join(UPLOAD_FIELDS)} FROM uploads WHERE id = ?", (upload_id,)
+        ).fetchone()
+        if row is None or (session_id is not None and row[1] != session_id):
+            return None
+        return dict(zip(UPLOAD_FIELDS, row))
+
+    def attachments(self, session_id):
+        rows = self.db.connect().execute(
+            "SELECT sha256, filename, content_type, size, created_at FROM attachments WHERE session_id = ? ORDER BY created_at",
+            (session_id,)
+        ).fetchall()
+        return [dict(zip(("sha256", "filename", "content_type", "size", "created_at"), row)) for row in rows]
+
+    def open_chunk(self, upload_id, content_range, session_id=None):
+        # Returns a ChunkWriter for one request's body. Only one chunk per upload
+        # is written at a time, in any process.
+        upload = self.get(upload_id, session_id)
+        if upload is None:
+            raise UploadError("Upload not found", 404)
+        if upload["status"] == COMPLETE:
+            raise UploadError("Upload is already complete", 409, upload["received"])
+        start, end = parse_content_range(content_range, upload["size"])
+        if start != upload["received"]:
+            raise UploadError(f"Chunk starts at {start} but {upload['received']} bytes were received",
+                              409, upload["received"])
+        try:
+            part = open(self.part_path(upload_id), "r+b")
+        except FileNotFoundError:
+            raise UploadError("Upload not found", 404)
+        try:
+            try:
+                fcntl.flock(part, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadError("Another chunk of this upload is in progress", 409, upload["received"])
+            # Checked again under the lock: a chunk that just finished elsewhere
+            # may have moved the offset or completed the upload.
+            upload = self.get(upload_id)
+            if upload is None or upload["status"] == COMPLETE or upload["received"] != start:
+                received = upload["received"] if upload else None
+                raise UploadError("Upload changed while waiting for this chunk", 409, received)
+            with self._lock:
+                hasher = self._hashers.pop(upload_id, None)
+            if hasher is None or hasher[0] != start:
+                hasher = (start, self._rehash(upload_id, start))
+            return ChunkWriter(self, upload, start, end, hasher[1], part)
+        except Exception:
+            part.close()
+            raise
+
+    def write_chunk(self, upload_id, content_range, stream, session_id=None):
+        # Streams one chunk from a file-like body straight into the part file.
+        writer = self.open_chunk(upload_id, content_range, session_id)
+        try:
+            writer.copy_from(stream)
+        except Exception as e:
+            writer.abort()
+            if isinstance(e, UploadError):
+                e.received = writer.position
+            raise
+        return writer.finish()
+
+    def _rehash(self, upload_id, length):
+        hasher = hashlib.sha256()
+        with open(self.part_path(upload_id), "rb") as f:
+            remaining = length
+            while remaining:
+                data = f.read(min(READ_SIZE, remaining))
+                if not data:
+                    raise UploadError("Stored part is shorter than the received offset", 500)
+                hasher.update(data)
+                remaining -= len(data)
+        return hasher
+
+    def _record(self, upload, received, hasher):
+        now = time.time()
+        self.db.connect().execute(
+            "UPDATE uploads SET received = ?, updated_at = ? WHERE id = ?", (received, now, upload["id"])
+        )
+        upload["received"] = received
+        if received < upload["size"]:
+            with self._lock:
+                self._hashers[upload["id"]] = (received, hasher)
+            return upload
+        return self._finalize(upload, hasher.hexdigest())
+
+    def _matches_type(self, upload):
+        offset, magic = SIGNATURES[upload["content_type"]]
+        with open(self.part_path(upload["id"]), "rb") as f:
+            f.seek(offset)
+            return f.read(len(magic)) == magic
+
+    def _finalize(self, upload, sha256):
+        # Identical content is kept once: a second copy's part file is dropped
+        # and the session is attached to the existing blob. A file that is not
+        # what its declared type says is discarded.
+        part, blob = self.part_path(upload["id"]), self.blob_path(sha256)
+        if not self._matches_type(upload):
+            os.remove(part)
+            self.db.connect().execute("DELETE FROM uploads WHERE id = ?", (upload["id"],))
+            raise UploadError(f"File content is not {upload['content_type']}", 415)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        deduplicated = os.path.exists(blob)
+        if deduplicated:
+            os.remove(part)
+        else:
+            os.replace(part, blob)
+        now = time.time()
+        with self.db.transaction() as conn:
+            conn.execute(
+                "UPDATE uploads SET status = ?, sha256 = ?, updated_at = ? WHERE id = ?",
+                (COMPLETE, sha256, now, upload["id"])
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO attachments (session_id, sha256, filename, content_type, size, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (upload["session_id"], sha256, upload["filename"], upload["content_type"], upload["size"], now)
+            )
+        upload.update(status=COMPLETE, sha256=sha256, deduplicated=deduplicated)
+        return upload
+
+    def purge_expired(self):
+        # Unfinished uploads untouched for longer than the TTL are dropped, along
+        # with expired tokens. A part file being written (locked) is left alone.
+        now = time.time()
+        conn = self.db.connect()
+        conn.execute("DELETE FROM upload_tokens WHERE expires_at <= ?", (now,))
+        ids = [row[0] for row in conn.execute(
+            "SELECT id FROM uploads WHERE status = ? AND updated_at < ?", (UPLOADING, now - self.ttl)
+        )]
+        purged = 0
+        for upload_id in ids:
+            try:
+                part = open(self.part_path(upload_id), "r+b")
+            except FileNotFoundError:
+                part = None
+            try:
+                if part is not None:
+                    try:
+                        fcntl.flock(part, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue
+                    os.remove(self.part_path(upload_id))
+                with self._lock:
+                    self._hashers.pop(upload_id, None)
+                conn.execute("DELETE FROM uploads WHERE id = ? AND status = ?", (upload_id, UPLOADING))
+                purged += 1
+            finally:
+                if part is not None:
+                    part.close()
+        return purged
+
+
+class ChunkWriter:
+    # Writes one chunk into the part file that open_chunk opened and locked. The
+    # lock is held until the new offset is recorded, so the next chunk cannot
+    # start from a stale offset.
+    def __init__(self, store, upload, start, end, hasher, part):
+        self.store = store
+        self.upload = upload
+        self.start = start
+        self.end = end
+        self.hasher = hasher
+        self.position = start
+        self._file = part
+        # Bytes past the offset are left over from a chunk that failed midway.
+        self._file.truncate(start)
+        self._file.seek(start)
+
+    def write(self, data):
+        if self.position + len(data) > self.end:
+            raise UploadError(f"Chunk is longer than its Content-Range ({self.end - self.start} bytes)")
+        self._file.write(data)
+        self.hasher.update(data)
+        self.position += len(data)
+
+    def copy_from(self, stream):
+        while True:
+            data = stream.read(READ_SIZE)
+            if not data:
+                break
+            self.write(data)
+
+    def finish(self):
+        # Commits what was written. A short body still counts up to the bytes
+        # that arrived, so the client can resume from there.
+        try:
+            self._file.flush()
+            upload = self.store._record(self.upload, self.position, self.hasher)
+        finally:
+            self._file.close()
+        if self.position < self.end:
+            raise UploadError(f"Chunk ended after {self.position - self.start} of {self.end - self.start} bytes",
+                              400, self.position)
+        return upload
+
+    def abort(self):
+        # Keeps the bytes received so far, as a dropped connection would.
+        try:
+            self._file.flush()
+            self._file.truncate(self.position)
+            self.store._record(self.upload, self.position, self.hasher)
+        finally:
+            self._file.close()
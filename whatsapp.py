@@ -0,0 +1,115 @@
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from logging_pipeline import mask_phone_number
+from metrics import TWILIO_SEND_LATENCY
+
+# --- Shared Twilio client and bounded WhatsApp dispatch ---
+# One Twilio client (and its keep-alive HTTP session) is shared by the whole
+# process. Bulk sends fan out over a small thread pool while a token bucket per
+# sender number keeps us inside Twilio's per-number throughput.
+
+
+class TwilioTransport:
+    def __init__(self, account_sid, auth_token, timeout=10.0):
+        # twilio.rest is slow to import, so it is only loaded once a real
+        # transport is created rather than at process start.
+        from twilio.http.http_client import TwilioHttpClient
+        from twilio.rest import Client
+
+        http_client = TwilioHttpClient(pool_connections=True, timeout=timeout)
+        self.client = Client(account_sid, auth_token, http_client=http_client)
+
+    def send(self, from_, to, body):
+        return self.client.messages.create(from_=from_, body=body, to=to).sid
+
+
+class FakeTransport:
+    # Offline stand-in that records messages instead of calling Twilio.
+    def __init__(self, latency=0.0, fail_numbers=()):
+        self.latency = latency
+        self.fail_numbers = set(fail_numbers)
+        self.sent = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def send(self, from_, to, body):
+        if self.latency:
+            time.sleep(self.latency)
+        if to in self.fail_numbers:
+            raise RuntimeError(f"Fake delivery failure for {to}")
+        with self._lock:
+            sid = f"SMfake{next(self._ids):026d}"
+            self.sent.append({"sid": sid, "from": from_, "to": to, "body": body})
+        return sid
+
+
+class RateLimiter:
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(sender, rate):
+    # Limiters are shared per sender number so every dispatcher using the same
+    # number draws from the same budget.
+    with _limiters_lock:
+        limiter = _limiters.get(sender)
+        if limiter is None:
+            limiter = _limiters[sender] = RateLimiter(rate)
+        return limiter
+
+
+class WhatsAppDispatcher:
+    def __init__(self, transport, from_number, max_workers=8, messages_per_second=10.0):
+        self.transport = transport
+        self.from_number = from_number
+        self.limiter = get_rate_limiter(from_number, messages_per_second)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="whatsapp")
+
+    def send(self, to_number, body):
+        self.limiter.acquire()
+        start = time.perf_counter()
+        try:
+            sid = self.transport.send(f'whatsapp:{self.from_number}', f'whatsapp:{to_number}', body)
+        except Exception:
+            TWILIO_SEND_LATENCY.observe(time.perf_counter() - start, "failed")
+            raise
+        TWILIO_SEND_LATENCY.observe(time.perf_counter() - start, "sent")
+        return sid
+
+    def _send_quietly(self, message):
+        to_number, body = message
+        try:
+            return self.send(to_number, body)
+        except Exception as e:
+            logging.error(f"Failed to send WhatsApp message to {mask_phone_number(to_number)}: {e}")
+            return None
+
+    def send_many(self, messages):
+        # Returns one SID (or None on failure) per (to_number, body) pair, in order.
+        return list(self._executor.map(self._send_quietly, messages))
+
+    def close(self):
+        self._executor.shutdown(wait=True)